@@ -27,6 +27,10 @@ def create_app(config_name='default'):
     init_candidate_routes(app)
     init_requisition_routes(app)
     init_scheduling_routes(app)
+
+    # Register CLI commands
+    from app.commands import init_commands
+    init_commands(app)
     
     # Register error handlers
     @app.errorhandler(404)
@@ -0,0 +1,112 @@
+import os
+import tempfile
+import click
+from app.extensions import db
+from app.models import Candidate
+from app.services.ann_index import get_ann_index
+from app.services.candidate_search import install_candidate_search
+from app.services.cv_parser import parser_options_from_config
+from app.services.cv_batch import CVBatchIngestor, iter_zip_members, SUPPORTED_EXTENSIONS
+from app.services.leaderboard import get_leaderboard
+from app.services.requisition_index import get_requisition_index
+from app.services.skill_dictionary import backfill_skill_bits
+
+
+def init_commands(app):
+
+    @app.cli.command('ingest-cvs')
+    @click.argument('paths', nargs=-1, required=True, type=click.Path(exists=True))
+    @click.option('--batch-size', type=int, default=None, help='Documents per nlp.pipe batch.')
+    @click.option('--n-process', type=int, default=None, help='spaCy worker processes.')
+    def ingest_cvs(paths, batch_size, n_process):
+        """Bulk-create candidates from CV files, directories of CVs or ZIP archives."""
+        ingestor = CVBatchIngestor(
+            batch_size=batch_size or app.config['CV_BATCH_SIZE'],
+            n_process=n_process or app.config['CV_BATCH_N_PROCESS'],
+            parser_options=parser_options_from_config(app.config)
+        )
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            def cv_files():
+                for path in paths:
+                    if os.path.isdir(path):
+                        for root, _, filenames in os.walk(path):
+                            for filename in sorted(filenames):
+                                if filename.lower().endswith(SUPPORTED_EXTENSIONS):
+                                    yield filename, os.path.join(root, filename)
+                    elif path.lower().endswith('.zip'):
+                        yield from iter_zip_members(path, temp_dir)
+                    else:
+                        yield os.path.basename(path), path
+
+            summary = ingestor.ingest(cv_files())
+
+        for skipped in summary['skipped']:
+            click.echo(f"skipped {skipped['filename']}: {skipped['reason']}")
+        if summary['error']:
+            click.echo(f"stopped early: {summary['error']}")
+        click.echo(
+            f"Created {len(summary['created'])} candidates from {summary['processed']} CVs "
+            f"in {summary['elapsed_seconds']}s ({summary['cvs_per_second']} CVs/s)"
+        )
+
+    @app.cli.command('backfill-skills')
+    @click.option('--batch-size', type=int, default=1000, help='Candidates per commit.')
+    def backfill_skills(batch_size):
+        """Seed the skills table from the taxonomy and fill skill ids and bitsets for existing candidates."""
+        done = backfill_skill_bits(batch_size, progress=lambda count: click.echo(f'{count} candidates'))
+        click.echo(f'Backfilled skill bitsets for {done} candidates')
+
+    @app.cli.command('rebuild-requisition-index')
+    def rebuild_requisition_index():
+        """Rebuild the skill -> open requisitions index used for reverse matching."""
+        count = get_requisition_index().rebuild()
+        click.echo(f'Indexed {count} open requisitions')
+
+    @app.cli.command('rebuild-leaderboards')
+    @click.option('--requisition-id', type=int, default=None, help='Only rebuild this requisition.')
+    def rebuild_leaderboards(requisition_id):
+        """Resync the Redis application rankings from the database."""
+        if requisition_id is None:
+            count = get_leaderboard().rebuild_all()
+        else:
+            count = get_leaderboard().rebuild(requisition_id)
+            if count is None:
+                click.echo('Applications kept changing during the rebuild; try again')
+                return
+        click.echo(f'Ranked {count} applications')
+
+    @app.cli.command('install-candidate-search')
+    def install_candidate_search_command():
+        """Add the full-text search column and trigram indexes to an existing PostgreSQL database."""
+        if db.engine.dialect.name != 'postgresql':
+            click.echo('Candidate search indexes need PostgreSQL; other databases use ILIKE search')
+            return
+        install_candidate_search(db.engine)
+        click.echo('Installed candidate search column and indexes')
+
+    @app.cli.command('rebuild-ann-index')
+    @click.option('--batch-size', type=int, default=1000, help='CVs embedded per batch.')
+    def rebuild_ann_index(batch_size):
+        """Rebuild the whole-pool candidate similarity index from every stored CV."""
+        documents = (
+            db.session.query(Candidate.id, Candidate.cv_text)
+            .filter(Candidate.cv_text.isnot(None))
+            .order_by(Candidate.id)
+            .execution_options(yield_per=batch_size)
+        )
+        count = get_ann_index().rebuild(
+            ((candidate_id, cv_text) for candidate_id, cv_text in documents),
+            batch_size=batch_size,
+            progress=lambda done: click.echo(f'{done} candidates')
+        )
+        click.echo(f'Indexed {count} candidates')
+
+    @app.cli.command('train-ann-index')
+    def train_ann_index():
+        """Retrain the candidate similarity index's clusters on the vectors it already holds."""
+        index = get_ann_index()
+        if index.train():
+            click.echo(f'Trained {len(index)} candidates into new clusters')
+        else:
+            click.echo('Nothing to train')
@@ -34,9 +34,60 @@ class Config:
     CLOUDINARY_API_KEY = os.getenv('CLOUDINARY_API_KEY')
     CLOUDINARY_API_SECRET = os.getenv('CLOUDINARY_API_SECRET')
     
+    # CV Storage
+    CV_STORAGE_BACKEND = os.getenv('CV_STORAGE_BACKEND', 'cloudinary')  # cloudinary or local
+    CV_STORAGE_PATH = os.getenv('CV_STORAGE_PATH', 'uploads/cvs/store')  # root of the local content-addressed store
+    CV_STORAGE_BASE_URL = os.getenv('CV_STORAGE_BASE_URL')  # public URL prefix for local storage, if served
+    CV_STORAGE_TIMEOUT = int(os.getenv('CV_STORAGE_TIMEOUT', 60))  # seconds
+    CV_UPLOAD_THREADS = int(os.getenv('CV_UPLOAD_THREADS', 4))
+    CV_SPOOL_MAX_MEMORY = int(os.getenv('CV_SPOOL_MAX_MEMORY', 2 * 1024 * 1024))  # larger uploads spill to disk
+
     # CV Processing
-    CV_UPLOAD_FOLDER = os.getenv('CV_UPLOAD_FOLDER', 'uploads/cvs')
+    CV_UPLOAD_FOLDER = os.getenv('CV_UPLOAD_FOLDER', 'uploads/cvs')  # async CV jobs hand files over here; share it across worker hosts
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
+    SPACY_MODEL = os.getenv('SPACY_MODEL', 'en_core_web_sm')
+    SPACY_PIPELINE_PROFILE = os.getenv('SPACY_PIPELINE_PROFILE', 'full')  # full or fast (NER + sentencizer only)
+    CV_NLP_CHUNK_CHARS = int(os.getenv('CV_NLP_CHUNK_CHARS', 0))  # run NLP in windows of this size; 0 = whole CV
+    CV_PARSER_WORKERS = int(os.getenv('CV_PARSER_WORKERS', 0))  # 0 = parse in the request thread
+    CV_PARSER_TIMEOUT = int(os.getenv('CV_PARSER_TIMEOUT', 60))  # seconds
+    CV_PARSER_WARM_ON_START = os.getenv('CV_PARSER_WARM_ON_START', 'True').lower() == 'true'  # build the parser pool before serving
+    CV_ASYNC_INGESTION = os.getenv('CV_ASYNC_INGESTION', 'False').lower() == 'true'
+    CV_JOB_BACKEND = os.getenv('CV_JOB_BACKEND', 'redis')  # redis or local
+    CV_JOB_WORKERS = int(os.getenv('CV_JOB_WORKERS', 2))
+    CV_JOB_TTL = int(os.getenv('CV_JOB_TTL', 86400))  # seconds a finished job stays queryable
+    CV_JOB_STALE_AFTER = int(os.getenv('CV_JOB_STALE_AFTER', 900))  # seconds before a job left mid-run is requeued at startup
+    RESCORE_BACKEND = os.getenv('RESCORE_BACKEND', 'redis')  # redis or local
+    RESCORE_DEBOUNCE_SECONDS = float(os.getenv('RESCORE_DEBOUNCE_SECONDS', 5))  # quiet time after a candidate edit
+    RESCORE_BATCH_SIZE = int(os.getenv('RESCORE_BATCH_SIZE', 500))  # candidates rescored per pass
+    CV_MAX_PAGES = int(os.getenv('CV_MAX_PAGES', 50))  # PDF pages read per CV
+    CV_MAX_CHARS = int(os.getenv('CV_MAX_CHARS', 100000))  # extraction stops once this much text is collected
+    CV_EXTRACT_TIME_BUDGET = float(os.getenv('CV_EXTRACT_TIME_BUDGET', 10))  # seconds per file
+    CV_CACHE_ENABLED = os.getenv('CV_CACHE_ENABLED', 'True').lower() == 'true'
+    CV_CACHE_SIZE = int(os.getenv('CV_CACHE_SIZE', 256))  # parse results kept in process memory
+    CV_BATCH_SIZE = int(os.getenv('CV_BATCH_SIZE', 32))  # docs per nlp.pipe batch
+    CV_BATCH_N_PROCESS = int(os.getenv('CV_BATCH_N_PROCESS', 1))
+    CV_ZIP_MAX_MEMBERS = int(os.getenv('CV_ZIP_MAX_MEMBERS', 1000))  # CVs per uploaded archive
+    CV_ZIP_MAX_MEMBER_BYTES = int(os.getenv('CV_ZIP_MAX_MEMBER_BYTES', 16 * 1024 * 1024))  # uncompressed, per CV
+    CV_ZIP_MAX_TOTAL_BYTES = int(os.getenv('CV_ZIP_MAX_TOTAL_BYTES', 256 * 1024 * 1024))  # uncompressed, per archive
+
+    # Candidate similarity
+    CANDIDATE_TEXT_TTL = int(os.getenv('CANDIDATE_TEXT_TTL', 3600))  # seconds CV text stays in the Redis cache
+    SIMILARITY_INDEX_DIR = os.getenv('SIMILARITY_INDEX_DIR', 'instance/similarity')
+    SIMILARITY_N_FEATURES = int(os.getenv('SIMILARITY_N_FEATURES', 2 ** 18))  # hashed TF-IDF dimensions
+    SIMILARITY_REFIT_RATIO = float(os.getenv('SIMILARITY_REFIT_RATIO', 0.1))  # refit IDF after this much corpus growth
+    SIMILARITY_SYNC_INTERVAL = int(os.getenv('SIMILARITY_SYNC_INTERVAL', 30))  # seconds between index/database syncs
+    SIMILARITY_MAX_INDEXES = int(os.getenv('SIMILARITY_MAX_INDEXES', 32))  # indexes (global + per requisition) kept in memory
+    ANN_INDEX_DIR = os.getenv('ANN_INDEX_DIR', 'instance/ann')  # memory-mapped whole-pool index
+    ANN_DIM = int(os.getenv('ANN_DIM', 256))  # dense vector dimensions
+    ANN_NPROBE = int(os.getenv('ANN_NPROBE', 16))  # IVF lists scanned per query
+    ANN_TRAIN_MIN = int(os.getenv('ANN_TRAIN_MIN', 2048))  # vectors before the index is clustered; exhaustive below
+
+    # List endpoints
+    PAGINATION_COUNT_TTL = int(os.getenv('PAGINATION_COUNT_TTL', 60))  # seconds a ?total=cached count is reused
+    CANDIDATE_SEARCH_CHECK_TTL = int(os.getenv('CANDIDATE_SEARCH_CHECK_TTL', 300))  # seconds before re-checking for the search column
+    CANDIDATE_SEARCH_RANK_LIMIT = int(os.getenv('CANDIDATE_SEARCH_RANK_LIMIT', 1000))  # matches ranked per search; 0 = all
+    EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 1000))  # rows per server-side cursor fetch in exports
+    QUERY_BUDGET_STRICT = os.getenv('QUERY_BUDGET_STRICT', 'False').lower() == 'true'  # raise, not warn, over a @query_budget
     
 class DevelopmentConfig(Config):
     DEBUG = True
@@ -1,5 +1,6 @@
 from .user import User, VerificationCode
 from .candidate import Candidate, CandidateSkill
+from .skill import Skill, SkillAlias
 from .requisition import Requisition
 from .assessment_pack import AssessmentPack
 from .application import Application, AssessmentResult, Interview, AuditLog
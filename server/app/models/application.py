@@ -1,4 +1,5 @@
 from app.extensions import db
+from app.models.serialization import serialize
 from datetime import datetime
 
 class Application(db.Model):
@@ -6,7 +7,7 @@ class Application(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     candidate_id = db.Column(db.Integer, db.ForeignKey('candidates.id'), nullable=False)
-    requisition_id = db.Column(db.Integer, db.ForeignKey('requisitions.id'), nullable=False)
+    requisition_id = db.Column(db.Integer, db.ForeignKey('requisitions.id'), nullable=False, index=True)
     cv_match_score = db.Column(db.Float)
     assessment_score = db.Column(db.Float)
     overall_score = db.Column(db.Float)
@@ -22,27 +23,20 @@ class Application(db.Model):
     interviews = db.relationship('Interview', backref='application', lazy=True)
     audit_logs = db.relationship('AuditLog', backref='application', lazy=True)
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'candidate_id': self.candidate_id,
-            'requisition_id': self.requisition_id,
-            'cv_match_score': self.cv_match_score,
-            'assessment_score': self.assessment_score,
-            'overall_score': self.overall_score,
-            'status': self.status,
-            'recommendation': self.recommendation,
-            'applied_date': self.applied_date.isoformat() if self.applied_date else None,
-            'screened_date': self.screened_date.isoformat() if self.screened_date else None,
-            'assessed_date': self.assessed_date.isoformat() if self.assessed_date else None,
-            'shortlisted_date': self.shortlisted_date.isoformat() if self.shortlisted_date else None
-        }
+    # Attributes to_dict() returns; API clients can ask for a subset with ?fields=
+    FIELDS = (
+        'id', 'candidate_id', 'requisition_id', 'cv_match_score', 'assessment_score', 'overall_score',
+        'status', 'recommendation', 'applied_date', 'screened_date', 'assessed_date', 'shortlisted_date'
+    )
+
+    def to_dict(self, fields=None):
+        return serialize(self, fields or self.FIELDS)
 
 class AssessmentResult(db.Model):
     __tablename__ = 'assessment_results'
     
     id = db.Column(db.Integer, primary_key=True)
-    application_id = db.Column(db.Integer, db.ForeignKey('applications.id'), nullable=False)
+    application_id = db.Column(db.Integer, db.ForeignKey('applications.id'), nullable=False, index=True)
     score = db.Column(db.Float)
     answers = db.Column(db.JSON)
     time_taken = db.Column(db.Integer)
@@ -1,4 +1,5 @@
 from app.extensions import db
+from app.models.serialization import serialize
 from datetime import datetime
 
 class AssessmentPack(db.Model):
@@ -8,7 +9,7 @@ class AssessmentPack(db.Model):
     name = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text)
     type = db.Column(db.String(50))
-    questions = db.Column(db.JSON)
+    questions = db.deferred(db.Column(db.JSON))
     time_limit = db.Column(db.Integer)
     passing_score = db.Column(db.Float)
     created_by = db.Column(db.Integer, db.ForeignKey('users.id'))
@@ -19,16 +20,13 @@ class AssessmentPack(db.Model):
     # Relationships
     requisitions = db.relationship('Requisition', backref='assessment_pack', lazy=True)
     
-    def to_dict(self):
-        return {
-        'id': self.id,
-        'name': self.name,
-        'description': self.description,
-        'type': self.type,
-        'questions': self.questions,
-        'time_limit': self.time_limit,
-        'passing_score': self.passing_score,
-        'created_by': self.created_by,
-        'created_at': self.created_at.isoformat() if self.created_at else None,
-        'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+    # Attributes to_dict() returns; API clients can ask for a subset with ?fields=
+    FIELDS = (
+        'id', 'name', 'description', 'type', 'questions', 'time_limit', 'passing_score', 'created_by',
+        'created_at', 'updated_at'
+    )
+    # Listings leave the (large, deferred) questions out unless ?fields= names them
+    LIST_FIELDS = tuple(field for field in FIELDS if field != 'questions')
+
+    def to_dict(self, fields=None):
+        return serialize(self, fields or self.FIELDS)
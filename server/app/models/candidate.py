@@ -1,4 +1,5 @@
 from app.extensions import db
+from app.models.serialization import serialize
 from datetime import datetime
 
 class Candidate(db.Model):
@@ -15,7 +16,9 @@ class Candidate(db.Model):
     total_experience = db.Column(db.Float)
     summary = db.Column(db.Text)
     cv_path = db.Column(db.String(500))
-    cv_text = db.Column(db.Text)
+    cv_text = db.deferred(db.Column(db.Text))  # up to CV_MAX_CHARS; loaded only when read
+    parsing_status = db.Column(db.String(20))  # parsing, parsed, failed (None when no CV was uploaded)
+    skill_bits = db.Column(db.LargeBinary)  # bitset of Skill ids, see app.services.skill_dictionary
     consent_given = db.Column(db.Boolean, default=False)
     consent_date = db.Column(db.DateTime)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -25,31 +28,23 @@ class Candidate(db.Model):
     applications = db.relationship('Application', backref='candidate', lazy=True)
     skills = db.relationship('CandidateSkill', backref='candidate', lazy=True)
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'first_name': self.first_name,
-            'last_name': self.last_name,
-            'email': self.email,
-            'phone': self.phone,
-            'location': self.location,
-            'current_company': self.current_company,
-            'current_title': self.current_title,
-            'total_experience': self.total_experience,
-            'summary': self.summary,
-            'cv_path': self.cv_path,
-            'consent_given': self.consent_given,
-            'consent_date': self.consent_date.isoformat() if self.consent_date else None,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat()
-        }
+    # Attributes to_dict() returns; API clients can ask for a subset with ?fields=
+    FIELDS = (
+        'id', 'first_name', 'last_name', 'email', 'phone', 'location', 'current_company', 'current_title',
+        'total_experience', 'summary', 'cv_path', 'parsing_status', 'consent_given', 'consent_date',
+        'created_at', 'updated_at'
+    )
+
+    def to_dict(self, fields=None):
+        return serialize(self, fields or self.FIELDS)
 
 class CandidateSkill(db.Model):
     __tablename__ = 'candidate_skills'
     
     id = db.Column(db.Integer, primary_key=True)
-    candidate_id = db.Column(db.Integer, db.ForeignKey('candidates.id'), nullable=False)
+    candidate_id = db.Column(db.Integer, db.ForeignKey('candidates.id'), nullable=False, index=True)
     skill = db.Column(db.String(100), nullable=False)
+    skill_id = db.Column(db.Integer, db.ForeignKey('skills.id'), index=True)
     years_experience = db.Column(db.Float)
     proficiency_level = db.Column(db.String(50))  # beginner, intermediate, advanced, expert
     
@@ -58,6 +53,7 @@ class CandidateSkill(db.Model):
             'id': self.id,
             'candidate_id': self.candidate_id,
             'skill': self.skill,
+            'skill_id': self.skill_id,
             'years_experience': self.years_experience,
             'proficiency_level': self.proficiency_level
         }
@@ -1,3 +1,4 @@
+from datetime import datetime
 from app.extensions import mongo_db
 
 class CVParsingResult:
@@ -17,6 +18,26 @@ class CVParsingResult:
     def get_by_candidate_id(cls, candidate_id):
         return cls.collection.find_one({'candidate_id': candidate_id})
 
+    @classmethod
+    def ensure_cache_index(cls):
+        return cls.collection.create_index([('file_hash', 1), ('parser_version', 1)], sparse=True)
+
+    @classmethod
+    def get_cached(cls, file_hash, parser_version):
+        return cls.collection.find_one({'file_hash': file_hash, 'parser_version': parser_version})
+
+    @classmethod
+    def store_cached(cls, file_hash, parser_version, cv_text, parsed_data):
+        return cls.collection.update_one(
+            {'file_hash': file_hash, 'parser_version': parser_version},
+            {'$set': {
+                'cv_text': cv_text,
+                'parsed_data': parsed_data,
+                'created_at': datetime.utcnow()
+            }},
+            upsert=True
+        )
+
 class CVSearchIndex:
     collection = mongo_db.cv_search_index
     
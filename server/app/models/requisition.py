@@ -1,4 +1,5 @@
 from app.extensions import db
+from app.models.serialization import serialize
 from datetime import datetime
 
 class Requisition(db.Model):
@@ -24,22 +25,12 @@ class Requisition(db.Model):
     # Relationships
     applications = db.relationship('Application', backref='requisition', lazy=True)
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'title': self.title,
-            'department': self.department,
-            'description': self.description,
-            'requirements': self.requirements,
-            'required_skills': self.required_skills,
-            'min_experience': self.min_experience,
-            'location': self.location,
-            'seniority_level': self.seniority_level,
-            'status': self.status,
-            'weightings': self.weightings,
-            'knockout_rules': self.knockout_rules,
-            'assessment_pack_id': self.assessment_pack_id,
-            'created_by': self.created_by,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat()
-        }
+    # Attributes to_dict() returns; API clients can ask for a subset with ?fields=
+    FIELDS = (
+        'id', 'title', 'department', 'description', 'requirements', 'required_skills', 'min_experience',
+        'location', 'seniority_level', 'status', 'weightings', 'knockout_rules', 'assessment_pack_id',
+        'created_by', 'created_at', 'updated_at'
+    )
+
+    def to_dict(self, fields=None):
+        return serialize(self, fields or self.FIELDS)
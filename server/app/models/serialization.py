@@ -0,0 +1,10 @@
+from datetime import datetime
+
+
+def serialize(obj, fields):
+    """{field: value} for the named attributes of a model, datetimes as ISO strings."""
+    data = {}
+    for field in fields:
+        value = getattr(obj, field)
+        data[field] = value.isoformat() if isinstance(value, datetime) else value
+    return data
@@ -0,0 +1,28 @@
+from app.extensions import db
+from datetime import datetime
+
+class Skill(db.Model):
+    __tablename__ = 'skills'
+    
+    id = db.Column(db.Integer, primary_key=True)  # doubles as the bit position in skill bitsets
+    name = db.Column(db.String(100), unique=True, nullable=False)  # canonical, normalised lowercase
+    category = db.Column(db.String(50))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    aliases = db.relationship('SkillAlias', backref='skill', lazy=True)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'category': self.category,
+            'aliases': [alias.alias for alias in self.aliases]
+        }
+
+class SkillAlias(db.Model):
+    __tablename__ = 'skill_aliases'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    alias = db.Column(db.String(100), unique=True, nullable=False)  # normalised lowercase; includes the canonical name
+    skill_id = db.Column(db.Integer, db.ForeignKey('skills.id'), nullable=False, index=True)
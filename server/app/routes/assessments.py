@@ -3,6 +3,8 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.extensions import db
 from app.models import AssessmentPack, AssessmentResult, Application, Requisition
 from app.utils.decorators import role_required
+from app.utils.fieldsets import InvalidFields, load_fields, requested_fields
+from app.utils.pagination import InvalidCursor, paginate
 from datetime import datetime
 
 def init_assessment_routes(app):
@@ -11,20 +13,15 @@ def init_assessment_routes(app):
     @role_required('recruiter', 'hiring_manager', 'admin')
     def get_assessment_packs():
         try:
-            page = request.args.get('page', 1, type=int)
-            per_page = request.args.get('per_page', 10, type=int)
+            fields = requested_fields(AssessmentPack, default=AssessmentPack.LIST_FIELDS)
+            query = AssessmentPack.query.options(load_fields(AssessmentPack, fields))
+            result = paginate(query, [(AssessmentPack.id, False)])
+            packs = result.pop('items')
             
-            packs = AssessmentPack.query.paginate(
-                page=page, per_page=per_page, error_out=False
-            )
-            
-            return jsonify({
-                'assessment_packs': [pack.to_dict() for pack in packs.items],
-                'total': packs.total,
-                'pages': packs.pages,
-                'current_page': page
-            }), 200
+            return jsonify({'assessment_packs': [pack.to_dict(fields) for pack in packs], **result}), 200
             
+        except (InvalidCursor, InvalidFields) as e:
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
             current_app.logger.error(f'Get assessment packs error: {str(e)}')
             return jsonify({'error': 'Internal server error'}), 500
@@ -69,9 +66,12 @@ def init_assessment_routes(app):
     @role_required('recruiter', 'hiring_manager', 'admin')
     def get_assessment_pack(pack_id):
         try:
-            pack = AssessmentPack.query.get_or_404(pack_id)
-            return jsonify({'assessment_pack': pack.to_dict()}), 200
+            fields = requested_fields(AssessmentPack)
+            pack = AssessmentPack.query.options(load_fields(AssessmentPack, fields)).get_or_404(pack_id)
+            return jsonify({'assessment_pack': pack.to_dict(fields)}), 200
             
+        except InvalidFields as e:
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
             current_app.logger.error(f'Get assessment pack error: {str(e)}')
             return jsonify({'error': 'Internal server error'}), 500
@@ -153,6 +153,7 @@ def init_assessment_routes(app):
             
             # Calculate score
             from app.services.matching_service import MatchingService
+            from app.services.scoring_profile import get_scoring_profile
             correct_answers = [q.get('correct_answer') for q in assessment_pack.questions if 'correct_answer' in q]
             assessment_score = MatchingService().calculate_assessment_score(answers, correct_answers)
             
@@ -168,12 +169,9 @@ def init_assessment_routes(app):
             
             # Update application
             application.assessment_score = assessment_score
-            application.overall_score = MatchingService().calculate_overall_score(
-                application.cv_match_score, 
-                assessment_score, 
-                requisition.weightings
-            )
-            application.recommendation = MatchingService().get_recommendation(application.overall_score)
+            profile = get_scoring_profile(requisition)
+            application.overall_score = profile.overall_score(application.cv_match_score, assessment_score)
+            application.recommendation = profile.recommendation(application.overall_score)
             application.status = 'assessed'
             application.assessed_date = datetime.utcnow()
             
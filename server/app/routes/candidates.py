@@ -2,11 +2,26 @@ from flask import request, jsonify, current_app
 from flask_jwt_extended import jwt_required
 from app.extensions import db
 from app.models import Candidate, Application, CandidateSkill, Requisition
-from app.services.cv_parser import CVParser
-from app.utils.decorators import role_required
+from app.services.ann_index import sync_ann_index
+from app.services.candidate_search import search_candidates
+from app.services.candidate_text import invalidate_candidate_texts
+from app.services.cv_parser import candidate_fields_from_parsed, detect_file_type, parser_options_from_config
+from app.services.cv_parser_pool import get_parser_pool
+from app.services.cv_jobs import get_cv_job_queue
+from app.services.cv_batch import CVBatchIngestor, iter_zip_members
+from app.services.cv_storage import UploadBuffer, get_cv_storage, get_storage_executor
+from app.services.matching_service import MatchingService
+from app.services.requisition_index import matching_requisitions
+from app.services.rescore_queue import schedule_candidate_rescore
+from app.services.skill_dictionary import bytes_to_bits, get_skill_dictionary, refresh_candidate_skill_bits
+from app.utils.decorators import query_budget, role_required
+from app.utils.fieldsets import InvalidFields, load_fields, requested_fields
+from app.utils.pagination import InvalidCursor, paginate
 from datetime import datetime
+from sqlalchemy.orm import joinedload, selectinload
 import os
-import cloudinary.uploader
+import tempfile
+import uuid
 
 def init_candidate_routes(app):
 
@@ -16,28 +31,21 @@ def init_candidate_routes(app):
     @role_required('recruiter', 'hiring_manager', 'admin')
     def get_candidates():
         try:
-            page = request.args.get('page', 1, type=int)
-            per_page = request.args.get('per_page', 10, type=int)
             search = request.args.get('search', '')
+            fields = requested_fields(Candidate)
 
-            query = Candidate.query
-            if search:
-                query = query.filter(
-                    (Candidate.first_name.ilike(f'%{search}%')) |
-                    (Candidate.last_name.ilike(f'%{search}%')) |
-                    (Candidate.email.ilike(f'%{search}%')) |
-                    (Candidate.current_company.ilike(f'%{search}%'))
-                )
+            query = Candidate.query.options(load_fields(Candidate, fields))
+            keys = [(Candidate.id, False)]
+            if search.strip():
+                query, keys = search_candidates(query, search)
 
-            candidates = query.paginate(page=page, per_page=per_page, error_out=False)
+            result = paginate(query, keys)
+            candidates = result.pop('items')
 
-            return jsonify({
-                'candidates': [c.to_dict() for c in candidates.items],
-                'total': candidates.total,
-                'pages': candidates.pages,
-                'current_page': page
-            }), 200
+            return jsonify({'candidates': [c.to_dict(fields) for c in candidates], **result}), 200
 
+        except (InvalidCursor, InvalidFields) as e:
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
             current_app.logger.error(f'Get candidates error: {str(e)}')
             return jsonify({'error': 'Internal server error'}), 500
@@ -63,64 +71,77 @@ def init_candidate_routes(app):
             cv_path = None
             cv_text = None
             parsed_data = {}
+            cv_job = None
+            temp_path = None
             cv_file = files.get('cv')
+            async_parse = request.args.get(
+                'async', str(current_app.config.get('CV_ASYNC_INGESTION', False))
+            ).lower() == 'true'
 
-            if cv_file:
-                if cv_file.filename == "":
-                    return jsonify({"error": "CV file is empty"}), 400
+            try:
+                if cv_file:
+                    if cv_file.filename == "":
+                        return jsonify({"error": "CV file is empty"}), 400
 
-                # Cloudinary upload
-                upload_result = cloudinary.uploader.upload(
-                    cv_file,
-                    folder="recruitment/cvs",
-                    resource_type="auto"
-                )
-                cv_path = upload_result['secure_url']
+                    # Read the upload once (hashing as we go); storage and parser both work from this buffer
+                    file_ext = os.path.splitext(cv_file.filename)[1].lower()
+                    file_type = detect_file_type(cv_file.filename)
+                    with UploadBuffer(cv_file.stream, current_app.config['CV_SPOOL_MAX_MEMORY']) as upload:
+                        # Upload to storage in the background while the CV is parsed here
+                        storage_future = get_storage_executor().submit(
+                            get_cv_storage().save, upload, cv_file.filename
+                        )
 
-                # Temporary save for parsing
-                temp_path = os.path.join(current_app.config['CV_UPLOAD_FOLDER'], cv_file.filename)
-                os.makedirs(os.path.dirname(temp_path), exist_ok=True)
-                cv_file.save(temp_path)
+                        if async_parse:
+                            # The job worker may run in another process, so hand the file over on disk
+                            temp_path = os.path.join(current_app.config['CV_UPLOAD_FOLDER'], f'{uuid.uuid4().hex}{file_ext}')
+                            os.makedirs(os.path.dirname(temp_path), exist_ok=True)
+                            upload.save_to(temp_path)
+                        else:
+                            # Parse CV safely
+                            try:
+                                cv_text, parsed_data = get_parser_pool().parse_upload(upload, file_type)
+                            except Exception as e:
+                                current_app.logger.warning(f"CV parsing failed: {str(e)}")
+                                cv_text = None
+                                parsed_data = {}
 
-                file_ext = os.path.splitext(cv_file.filename)[1].lower()
-                file_type = 'pdf' if file_ext == '.pdf' else 'docx' if file_ext == '.docx' else 'txt'
+                        cv_path = storage_future.result(timeout=current_app.config['CV_STORAGE_TIMEOUT'])
 
-                # Parse CV safely
-                try:
-                    parser = CVParser()
-                    cv_text = parser.extract_text_from_file(temp_path, file_type)
-                    parsed_data = parser.parse_cv(cv_text)
-                except Exception as e:
-                    current_app.logger.warning(f"CV parsing failed: {str(e)}")
-                    cv_text = None
-                    parsed_data = {}
-
-                # Clean up temp file
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
+                # Merge parsed data
+                candidate_data = {
+                    'first_name': data['first_name'],
+                    'last_name': data['last_name'],
+                    'email': data['email'],
+                    'location': data.get('location'),
+                    'cv_path': cv_path,
+                    'cv_text': cv_text,
+                    'consent_given': data.get('consent_given', 'false').lower() == 'true',
+                    'consent_date': datetime.utcnow() if data.get('consent_given', 'false').lower() == 'true' else None
+                }
+                candidate_data.update(candidate_fields_from_parsed(parsed_data, data))
+                if cv_file and async_parse:
+                    candidate_data['parsing_status'] = 'parsing'
+                elif cv_file:
+                    candidate_data['parsing_status'] = 'parsed' if cv_text is not None else 'failed'
 
-            # Merge parsed data
-            candidate_data = {
-                'first_name': data['first_name'],
-                'last_name': data['last_name'],
-                'email': data['email'],
-                'phone': parsed_data.get('phone') or data.get('phone'),
-                'location': data.get('location'),
-                'current_company': parsed_data.get('experience', {}).get('details', [{}])[0].split(' at ')[-1] 
-                                   if parsed_data.get('experience', {}).get('details') else data.get('current_company'),
-                'current_title': parsed_data.get('experience', {}).get('details', [{}])[0].split(' at ')[0] 
-                                 if parsed_data.get('experience', {}).get('details') else data.get('current_title'),
-                'total_experience': float(parsed_data.get('experience', {}).get('total_years', 0)),
-                'summary': ' '.join(parsed_data.get('education', []))[:500] if parsed_data.get('education') else data.get('summary', ''),
-                'cv_path': cv_path,
-                'cv_text': cv_text,
-                'consent_given': data.get('consent_given', 'false').lower() == 'true',
-                'consent_date': datetime.utcnow() if data.get('consent_given', 'false').lower() == 'true' else None
-            }
+                candidate = Candidate(**candidate_data)
+                db.session.add(candidate)
+                db.session.commit()
+                if cv_text:
+                    sync_ann_index(documents=[(candidate.id, cv_text)])
 
-            candidate = Candidate(**candidate_data)
-            db.session.add(candidate)
-            db.session.commit()
+                if cv_file and async_parse:
+                    try:
+                        cv_job = get_cv_job_queue().enqueue(candidate.id, temp_path, file_type)
+                    except Exception as e:
+                        current_app.logger.error(f'CV job enqueue error: {str(e)}')
+                        candidate.parsing_status = 'failed'
+                        db.session.commit()
+            finally:
+                # Once the job is queued the worker owns the file, and deletes it when done
+                if temp_path and cv_job is None and os.path.exists(temp_path):
+                    os.remove(temp_path)
 
             # ---------- Add skills ----------
             if 'skills' in data:
@@ -134,11 +155,21 @@ def init_candidate_routes(app):
                             proficiency_level=s.get('proficiency_level')
                         )
                         db.session.add(skill)
+                    db.session.flush()
+                    refresh_candidate_skill_bits([candidate.id])
                     db.session.commit()
                 except Exception as e:
                     db.session.rollback()
                     current_app.logger.error(f'Error adding candidate skills: {str(e)}')
 
+            if cv_job:
+                return jsonify({
+                    'message': 'Candidate created, CV parsing in progress',
+                    'candidate': candidate.to_dict(),
+                    'job_id': cv_job['id'],
+                    'status_url': f"/api/cv-jobs/{cv_job['id']}"
+                }), 202
+
             return jsonify({'message': 'Candidate created successfully', 'candidate': candidate.to_dict()}), 201
 
         except Exception as e:
@@ -146,19 +177,100 @@ def init_candidate_routes(app):
             current_app.logger.error(f'Create candidate error: {str(e)}')
             return jsonify({'error': str(e)}), 500
 
+    # ---------- BATCH create candidates from CVs ----------
+    @app.route('/api/candidates/batch', methods=['POST'])
+    @jwt_required()
+    @role_required('recruiter', 'admin')
+    def create_candidates_batch():
+        try:
+            cv_files = request.files.getlist('cvs')
+            archive = request.files.get('archive')
+            if not cv_files and not archive:
+                return jsonify({'error': 'Upload CV files as "cvs" or a ZIP as "archive"'}), 400
+
+            batch_size = request.args.get('batch_size', current_app.config['CV_BATCH_SIZE'], type=int)
+            config = current_app.config
+            zip_limits = {
+                'max_members': config['CV_ZIP_MAX_MEMBERS'],
+                'max_member_bytes': config['CV_ZIP_MAX_MEMBER_BYTES'],
+                'max_total_bytes': config['CV_ZIP_MAX_TOTAL_BYTES']
+            }
+
+            with tempfile.TemporaryDirectory() as temp_dir:
+                def uploaded_files():
+                    for index, cv_file in enumerate(cv_files):
+                        if not cv_file.filename:
+                            continue
+                        if cv_file.filename.lower().endswith('.zip'):
+                            yield from iter_zip_members(cv_file, temp_dir, **zip_limits)
+                            continue
+                        path = os.path.join(temp_dir, f'{index}_{os.path.basename(cv_file.filename)}')
+                        cv_file.save(path)
+                        yield cv_file.filename, path
+                    if archive:
+                        yield from iter_zip_members(archive, temp_dir, **zip_limits)
+
+                # Worker processes are a deployment decision, never a request parameter
+                ingestor = CVBatchIngestor(
+                    batch_size=batch_size,
+                    n_process=config['CV_BATCH_N_PROCESS'],
+                    parser_options=parser_options_from_config(config)
+                )
+                summary = ingestor.ingest(uploaded_files())
+
+            if summary['error'] and not summary['created']:
+                return jsonify(summary), 400
+            return jsonify({
+                'message': f"Created {len(summary['created'])} candidates",
+                **summary
+            }), 201 if summary['created'] else 200
+
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f'Batch create candidates error: {str(e)}')
+            return jsonify({'error': 'Internal server error'}), 500
+
+    # ---------- CV parsing job status ----------
+    @app.route('/api/cv-jobs/<job_id>', methods=['GET'])
+    def get_cv_job(job_id):
+        try:
+            job = get_cv_job_queue().get(job_id)
+            if not job:
+                return jsonify({'error': 'CV job not found'}), 404
+            job.pop('file_path', None)
+            return jsonify({'job': job}), 200
+
+        except Exception as e:
+            current_app.logger.error(f'Get CV job error: {str(e)}')
+            return jsonify({'error': 'Internal server error'}), 500
+
+    # ---------- CV parser stats ----------
+    @app.route('/api/cv-parser/stats', methods=['GET'])
+    @jwt_required()
+    @role_required('admin')
+    def get_cv_parser_stats():
+        try:
+            return jsonify({'cv_parser': get_parser_pool().stats()}), 200
+        except Exception as e:
+            current_app.logger.error(f'Get CV parser stats error: {str(e)}')
+            return jsonify({'error': 'Internal server error'}), 500
+
     # ---------- GET candidate by ID ----------
     @app.route('/api/candidates/<int:candidate_id>', methods=['GET'])
     @jwt_required()
     @role_required('recruiter', 'hiring_manager', 'admin')
     def get_candidate(candidate_id):
         try:
-            candidate = Candidate.query.get_or_404(candidate_id)
-            data = candidate.to_dict()
+            fields = requested_fields(Candidate)
+            candidate = Candidate.query.options(load_fields(Candidate, fields)).get_or_404(candidate_id)
+            data = candidate.to_dict(fields)
             # Skills
             data['skills'] = [s.to_dict() for s in CandidateSkill.query.filter_by(candidate_id=candidate_id).all()]
             # Applications
             data['applications'] = [a.to_dict() for a in Application.query.filter_by(candidate_id=candidate_id).all()]
             return jsonify({'candidate': data}), 200
+        except InvalidFields as e:
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
             current_app.logger.error(f'Get candidate error: {str(e)}')
             return jsonify({'error': 'Internal server error'}), 500
@@ -177,12 +289,36 @@ def init_candidate_routes(app):
                     setattr(candidate, field, data[field])
             candidate.updated_at = datetime.utcnow()
             db.session.commit()
+            if 'total_experience' in data:
+                schedule_candidate_rescore([candidate_id])
             return jsonify({'message': 'Candidate updated successfully', 'candidate': candidate.to_dict()}), 200
         except Exception as e:
             db.session.rollback()
             current_app.logger.error(f'Update candidate error: {str(e)}')
             return jsonify({'error': 'Internal server error'}), 500
 
+    # ---------- PURGE candidate ----------
+    @app.route('/api/candidates/<int:candidate_id>', methods=['DELETE'])
+    @jwt_required()
+    @role_required('admin')
+    def delete_candidate(candidate_id):
+        try:
+            candidate = Candidate.query.get_or_404(candidate_id)
+            if Application.query.filter_by(candidate_id=candidate_id).first():
+                return jsonify({'error': 'Cannot delete candidate with applications'}), 400
+
+            CandidateSkill.query.filter_by(candidate_id=candidate_id).delete()
+            db.session.delete(candidate)
+            db.session.commit()
+            invalidate_candidate_texts([candidate_id])
+            sync_ann_index(removed=[candidate_id])
+
+            return jsonify({'message': 'Candidate deleted successfully'}), 200
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f'Delete candidate error: {str(e)}')
+            return jsonify({'error': 'Internal server error'}), 500
+
     # ---------- ADD candidate skill ----------
     @app.route('/api/candidates/<int:candidate_id>/skills', methods=['POST'])
     @jwt_required()
@@ -198,7 +334,11 @@ def init_candidate_routes(app):
                 proficiency_level=data.get('proficiency_level')
             )
             db.session.add(skill)
+            db.session.flush()
+            refresh_candidate_skill_bits([candidate_id])
             db.session.commit()
+            schedule_candidate_rescore([candidate_id])
+            db.session.refresh(skill)
             return jsonify({'message': 'Skill added successfully', 'skill': skill.to_dict()}), 201
         except Exception as e:
             db.session.rollback()
@@ -213,29 +353,96 @@ def init_candidate_routes(app):
         try:
             skill = CandidateSkill.query.filter_by(id=skill_id, candidate_id=candidate_id).first_or_404()
             db.session.delete(skill)
+            db.session.flush()
+            refresh_candidate_skill_bits([candidate_id])
             db.session.commit()
+            schedule_candidate_rescore([candidate_id])
             return jsonify({'message': 'Skill deleted successfully'}), 200
         except Exception as e:
             db.session.rollback()
             current_app.logger.error(f'Delete candidate skill error: {str(e)}')
             return jsonify({'error': 'Internal server error'}), 500
 
+    # ---------- GET open requisitions matching a candidate ----------
+    @app.route('/api/candidates/<int:candidate_id>/matching-requisitions', methods=['GET'])
+    @jwt_required()
+    @role_required('recruiter', 'hiring_manager', 'admin')
+    def get_matching_requisitions(candidate_id):
+        try:
+            candidate = Candidate.query.get_or_404(candidate_id)
+            limit = request.args.get('limit', 10, type=int)
+
+            if candidate.skill_bits is None:
+                refresh_candidate_skill_bits([candidate.id])
+                db.session.commit()
+                db.session.refresh(candidate)
+            candidate_bits = bytes_to_bits(candidate.skill_bits)
+
+            dictionary = get_skill_dictionary()
+            requisitions = []
+            for score, requisition, profile in matching_requisitions(candidate_bits, candidate.total_experience, limit):
+                requisitions.append({
+                    'requisition': requisition.to_dict(),
+                    'cv_match_score': score,
+                    'matched_skills': dictionary.skill_names(candidate_bits & profile.required_bits)
+                })
+
+            return jsonify({'candidate_id': candidate.id, 'requisitions': requisitions}), 200
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f'Get matching requisitions error: {str(e)}')
+            return jsonify({'error': 'Internal server error'}), 500
+
+    # ---------- GET similar candidates ----------
+    @app.route('/api/candidates/<int:candidate_id>/similar', methods=['GET'])
+    @jwt_required()
+    @role_required('recruiter', 'hiring_manager', 'admin')
+    def get_similar_candidates(candidate_id):
+        try:
+            Candidate.query.get_or_404(candidate_id)
+            limit = request.args.get('limit', 10, type=int)
+            requisition_id = request.args.get('requisition_id', type=int)
+
+            similar = MatchingService().find_similar_candidates(candidate_id, requisition_id, limit)
+            candidates = {
+                c.id: c for c in Candidate.query.filter(Candidate.id.in_([s['candidate_id'] for s in similar]))
+            }
+            for item in similar:
+                candidate = candidates.get(item['candidate_id'])
+                item['candidate'] = candidate.to_dict() if candidate else None
+
+            return jsonify({'candidate_id': candidate_id, 'similar_candidates': similar}), 200
+        except Exception as e:
+            current_app.logger.error(f'Get similar candidates error: {str(e)}')
+            return jsonify({'error': 'Internal server error'}), 500
+
     # ---------- GET candidates for requisition ----------
     @app.route('/api/requisitions/<int:requisition_id>/candidates', methods=['GET'])
+    @query_budget(6)
     @jwt_required()
     @role_required('recruiter', 'hiring_manager', 'admin')
     def get_candidates_for_requisition(requisition_id):
         try:
             requisition = Requisition.query.get_or_404(requisition_id)
-            applications = Application.query.filter_by(requisition_id=requisition_id).all()
+            fields = requested_fields(Candidate)
+            applications = (
+                Application.query
+                .options(joinedload(Application.candidate).options(
+                    load_fields(Candidate, fields), selectinload(Candidate.skills)
+                ))
+                .filter_by(requisition_id=requisition_id)
+                .all()
+            )
             candidates = []
             for app in applications:
                 c = app.candidate
-                c_data = c.to_dict()
+                c_data = c.to_dict(fields)
                 c_data['application'] = app.to_dict()
-                c_data['skills'] = [s.to_dict() for s in CandidateSkill.query.filter_by(candidate_id=c.id).all()]
+                c_data['skills'] = [s.to_dict() for s in c.skills]
                 candidates.append(c_data)
             return jsonify({'candidates': candidates}), 200
+        except InvalidFields as e:
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
             current_app.logger.error(f'Get candidates for requisition error: {str(e)}')
             return jsonify({'error': 'Internal server error'}), 500
@@ -1,11 +1,20 @@
-from flask import request, jsonify, current_app
+from flask import Response, request, jsonify, current_app, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.extensions import db
-from app.models import Requisition, Application, Candidate, AuditLog, CandidateSkill, AssessmentPack
+from app.models import Requisition, Application, Candidate, AuditLog, AssessmentPack
+from app.services.application_export import EXPORT_FORMATS, export_applications
+from app.services.batch_scoring import SCORING_FIELDS, rescore_requisition
+from app.services.leaderboard import ranked_applications, ranked_applications_after
 from app.services.matching_service import MatchingService
-from app.utils.decorators import role_required
+from app.services.requisition_index import sync_requisition_index
+from app.services.scoring_profile import get_scoring_profile
+from app.services.skill_dictionary import bytes_to_bits, register_requisition_skills
+from app.utils.decorators import query_budget, role_required
+from app.utils.fieldsets import InvalidFields, load_fields, requested_fields
 from app.utils.helpers import create_requisition_helper, get_or_create_default_assessment_pack
+from app.utils.pagination import InvalidCursor, encode_cursor, page_count, paginate, pagination_args
 from datetime import datetime
+from sqlalchemy.orm import joinedload
 
 def init_requisition_routes(app):
 
@@ -15,25 +24,20 @@ def init_requisition_routes(app):
     @role_required('recruiter', 'hiring_manager', 'admin')
     def get_requisitions():
         try:
-            page = request.args.get('page', 1, type=int)
-            per_page = request.args.get('per_page', 10, type=int)
             status = request.args.get('status', '')
+            fields = requested_fields(Requisition)
 
-            query = Requisition.query
+            query = Requisition.query.options(load_fields(Requisition, fields))
             if status:
                 query = query.filter_by(status=status)
 
-            requisitions = query.order_by(Requisition.created_at.desc()).paginate(
-                page=page, per_page=per_page, error_out=False
-            )
+            result = paginate(query, [(Requisition.created_at, True), (Requisition.id, True)])
+            requisitions = result.pop('items')
 
-            return jsonify({
-                'requisitions': [req.to_dict() for req in requisitions.items],
-                'total': requisitions.total,
-                'pages': requisitions.pages,
-                'current_page': page
-            }), 200
+            return jsonify({'requisitions': [req.to_dict(fields) for req in requisitions], **result}), 200
 
+        except (InvalidCursor, InvalidFields) as e:
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
             current_app.logger.error(f'Get requisitions error: {str(e)}', exc_info=True)
             return jsonify({'error': 'Internal server error'}), 500
@@ -74,6 +78,7 @@ def init_requisition_routes(app):
 
             # Create requisition
             requisition = create_requisition_helper({**data, 'assessment_pack_id': pack.id}, created_by=current_user_id)
+            sync_requisition_index(requisition)
 
             return jsonify({
                 'message': 'Requisition created successfully',
@@ -91,9 +96,12 @@ def init_requisition_routes(app):
     @role_required('recruiter', 'hiring_manager', 'admin')
     def get_requisition(requisition_id):
         try:
-            requisition = Requisition.query.get_or_404(requisition_id)
-            return jsonify({'requisition': requisition.to_dict()}), 200
+            fields = requested_fields(Requisition)
+            requisition = Requisition.query.options(load_fields(Requisition, fields)).get_or_404(requisition_id)
+            return jsonify({'requisition': requisition.to_dict(fields)}), 200
 
+        except InvalidFields as e:
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
             current_app.logger.error(f'Get requisition error: {str(e)}', exc_info=True)
             return jsonify({'error': 'Internal server error'}), 500
@@ -123,9 +131,21 @@ def init_requisition_routes(app):
                         setattr(requisition, field, data[field])
 
             requisition.updated_at = datetime.utcnow()
+            if 'required_skills' in data or 'knockout_rules' in data:
+                register_requisition_skills(requisition)
+
+            # Existing applications were scored against the old criteria
+            rescored = 0
+            if any(field in data for field in SCORING_FIELDS):
+                rescored = rescore_requisition(requisition, changed_by=get_jwt_identity())
             db.session.commit()
+            sync_requisition_index(requisition)
 
-            return jsonify({'message': 'Requisition updated successfully', 'requisition': requisition.to_dict()}), 200
+            return jsonify({
+                'message': 'Requisition updated successfully',
+                'requisition': requisition.to_dict(),
+                'rescored_applications': rescored
+            }), 200
 
         except Exception as e:
             db.session.rollback()
@@ -144,6 +164,7 @@ def init_requisition_routes(app):
 
             db.session.delete(requisition)
             db.session.commit()
+            sync_requisition_index(requisition_id=requisition_id)
 
             return jsonify({'message': 'Requisition deleted successfully'}), 200
 
@@ -170,11 +191,10 @@ def init_requisition_routes(app):
             if Application.query.filter_by(candidate_id=candidate.id, requisition_id=requisition_id).first():
                 return jsonify({'error': 'Already applied to this requisition'}), 409
 
-            match_service = MatchingService()
-            cv_match_score = match_service.calculate_cv_match_score(
+            cv_match_score = get_scoring_profile(requisition).cv_match_score(
                 [skill.skill for skill in candidate.skills],
                 candidate.total_experience,
-                requisition.to_dict()
+                bytes_to_bits(candidate.skill_bits) if candidate.skill_bits is not None else None
             )
 
             application = Application(
@@ -207,65 +227,120 @@ def init_requisition_routes(app):
 
     # ------------------- GET REQUISITION APPLICATIONS -------------------
     @app.route('/api/requisitions/<int:requisition_id>/applications', methods=['GET'])
+    @query_budget(8)
     @jwt_required()
     @role_required('recruiter', 'hiring_manager', 'admin')
     def get_requisition_applications(requisition_id):
         try:
             requisition = Requisition.query.get_or_404(requisition_id)
 
-            page = request.args.get('page', 1, type=int)
-            per_page = request.args.get('per_page', 10, type=int)
             status = request.args.get('status', '')
             recommendation = request.args.get('recommendation', '')
-
-            query = Application.query.filter_by(requisition_id=requisition_id)
-            if status:
-                query = query.filter_by(status=status)
-            if recommendation:
-                query = query.filter_by(recommendation=recommendation)
-
-            applications = query.order_by(Application.overall_score.desc()).paginate(
-                page=page, per_page=per_page, error_out=False
-            )
+            fields = requested_fields(Application)
+            candidate_fields = requested_fields(Candidate, 'candidate_fields')
+            # overall_score is the next cursor's anchor
+            options = [
+                load_fields(Application, fields, Application.overall_score),
+                joinedload(Application.candidate).options(load_fields(Candidate, candidate_fields))
+            ]
+
+            params = pagination_args(2)
+            if params['keyset']:
+                applications, next_after, total = ranked_applications_after(
+                    requisition_id, status, recommendation, params['limit'], params['after'], params['total'], options
+                )
+                result = {
+                    'next_cursor': encode_cursor(next_after) if next_after is not None else None,
+                    'limit': params['limit']
+                }
+                if params['total']:
+                    result['total'] = total
+                    result['total_type'] = params['total']
+            else:
+                page, per_page = params['page'], params['per_page']
+                applications, total = ranked_applications(requisition_id, status, recommendation, page, per_page, options)
+                result = {
+                    'total': total,
+                    'pages': page_count(total, per_page),
+                    'current_page': page
+                }
 
             applications_data = []
-            for app in applications.items:
-                app_data = app.to_dict()
-                app_data['candidate'] = app.candidate.to_dict()
+            for app in applications:
+                app_data = app.to_dict(fields)
+                app_data['candidate'] = app.candidate.to_dict(candidate_fields)
                 applications_data.append(app_data)
 
-            return jsonify({
-                'applications': applications_data,
-                'total': applications.total,
-                'pages': applications.pages,
-                'current_page': page
-            }), 200
+            return jsonify({'applications': applications_data, **result}), 200
 
+        except (InvalidCursor, InvalidFields) as e:
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
             current_app.logger.error(f'Get requisition applications error: {str(e)}', exc_info=True)
             return jsonify({'error': 'Internal server error'}), 500
 
+    # ------------------- EXPORT APPLICATIONS -------------------
+    @app.route('/api/requisitions/<int:requisition_id>/export', methods=['GET'])
+    @jwt_required()
+    @role_required('recruiter', 'hiring_manager', 'admin')
+    def export_requisition_applications(requisition_id):
+        try:
+            requisition = Requisition.query.get_or_404(requisition_id)
+
+            export_format = request.args.get('format', 'ndjson')
+            if export_format not in EXPORT_FORMATS:
+                return jsonify({'error': f"format must be one of {', '.join(EXPORT_FORMATS)}"}), 400
+            status = request.args.get('status', '')
+            recommendation = request.args.get('recommendation', '')
+            compress = 'gzip' in request.accept_encodings
+
+            chunks = export_applications(
+                requisition_id, export_format, status, recommendation,
+                current_app.config['EXPORT_BATCH_SIZE'], compress
+            )
+            response = Response(stream_with_context(chunks), mimetype=EXPORT_FORMATS[export_format])
+            response.headers['Content-Disposition'] = (
+                f'attachment; filename=requisition-{requisition_id}-applications.{export_format}'
+            )
+            response.headers['Vary'] = 'Accept-Encoding'
+            if compress:
+                response.headers['Content-Encoding'] = 'gzip'
+            return response
+
+        except Exception as e:
+            current_app.logger.error(f'Export requisition applications error: {str(e)}', exc_info=True)
+            return jsonify({'error': 'Internal server error'}), 500
+
     # ------------------- SHORTLIST -------------------
     @app.route('/api/requisitions/<int:requisition_id>/shortlist', methods=['GET'])
+    @query_budget(8)
     @jwt_required()
     @role_required('recruiter', 'hiring_manager', 'admin')
     def get_requisition_shortlist(requisition_id):
         try:
             requisition = Requisition.query.get_or_404(requisition_id)
 
-            applications = Application.query.filter_by(
-                requisition_id=requisition_id,
-                recommendation='proceed'
-            ).order_by(Application.overall_score.desc()).all()
+            applications, _ = ranked_applications(
+                requisition_id, recommendation='proceed',
+                options=[joinedload(Application.candidate).selectinload(Candidate.skills)]
+            )
 
             shortlist = []
             for app in applications:
                 app_data = app.to_dict()
                 app_data['candidate'] = app.candidate.to_dict()
-                skills = CandidateSkill.query.filter_by(candidate_id=app.candidate_id).all()
-                app_data['candidate']['skills'] = [skill.to_dict() for skill in skills]
+                app_data['candidate']['skills'] = [skill.to_dict() for skill in app.candidate.skills]
                 shortlist.append(app_data)
 
+            # "Similar candidates" panels: one batched query for the whole shortlist
+            similar_limit = request.args.get('similar', 0, type=int)
+            if similar_limit and shortlist:
+                similar = MatchingService().find_similar_candidates_batch(
+                    [app_data['candidate_id'] for app_data in shortlist], requisition_id, similar_limit
+                )
+                for app_data in shortlist:
+                    app_data['similar_candidates'] = similar.get(app_data['candidate_id'], [])
+
             return jsonify({'shortlist': shortlist}), 200
 
         except Exception as e:
@@ -2,23 +2,24 @@ from flask import request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.extensions import db, socketio
 from app.models import Interview, Application, User
-from app.utils.decorators import role_required
+from app.utils.decorators import query_budget, role_required
+from app.utils.pagination import InvalidCursor, paginate
 from datetime import datetime, timedelta
+from sqlalchemy.orm import joinedload
 import json
 
 def init_scheduling_routes(app):
     @app.route('/api/interviews', methods=['GET'])
+    @query_budget(8)
     @jwt_required()
     @role_required('recruiter', 'hiring_manager', 'admin')
     def get_interviews():
         try:
-            page = request.args.get('page', 1, type=int)
-            per_page = request.args.get('per_page', 10, type=int)
             status = request.args.get('status', '')
             start_date = request.args.get('start_date', '')
             end_date = request.args.get('end_date', '')
             
-            query = Interview.query
+            query = Interview.query.options(joinedload(Interview.application).joinedload(Application.candidate))
             
             if status:
                 query = query.filter_by(status=status)
@@ -31,30 +32,31 @@ def init_scheduling_routes(app):
                 end_datetime = datetime.fromisoformat(end_date) + timedelta(days=1)
                 query = query.filter(Interview.scheduled_date < end_datetime)
             
-            interviews = query.order_by(Interview.scheduled_date.asc()).paginate(
-                page=page, per_page=per_page, error_out=False
-            )
+            result = paginate(query, [(Interview.scheduled_date, False), (Interview.id, False)])
+            interviews = result.pop('items')
+            
+            # One lookup for every interviewer on the page
+            interviewer_ids = {user_id for interview in interviews for user_id in interview.interviewers or []}
+            users = {str(user.id): user for user in User.query.filter(User.id.in_(interviewer_ids))} if interviewer_ids else {}
             
             interviews_data = []
-            for interview in interviews.items:
+            for interview in interviews:
                 interview_data = interview.to_dict()
                 interview_data['application'] = interview.application.to_dict()
                 interview_data['application']['candidate'] = interview.application.candidate.to_dict()
                 
                 # Get interviewer details
                 if interview.interviewers:
-                    interviewers = User.query.filter(User.id.in_(interview.interviewers)).all()
-                    interview_data['interviewer_details'] = [user.to_dict() for user in interviewers]
+                    interview_data['interviewer_details'] = [
+                        users[str(user_id)].to_dict() for user_id in interview.interviewers if str(user_id) in users
+                    ]
                 
                 interviews_data.append(interview_data)
             
-            return jsonify({
-                'interviews': interviews_data,
-                'total': interviews.total,
-                'pages': interviews.pages,
-                'current_page': page
-            }), 200
+            return jsonify({'interviews': interviews_data, **result}), 200
             
+        except InvalidCursor as e:
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
             current_app.logger.error(f'Get interviews error: {str(e)}')
             return jsonify({'error': 'Internal server error'}), 500
@@ -0,0 +1,481 @@
+import fcntl
+import json
+import logging
+import os
+import threading
+import numpy as np
+import scipy.sparse as sp
+from flask import current_app
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+from sklearn.random_projection import SparseRandomProjection
+
+META_FILE = 'meta.json'
+LOCK_FILE = '.lock'
+TRAIN_LOCK_FILE = '.train.lock'
+ASSIGN_CHUNK = 65536
+MAX_LISTS = 4096
+KMEANS_SAMPLE = 100000
+KMEANS_ITERATIONS = 10
+# Retrain the coarse quantizer once the index has grown this much since the last training
+RETRAIN_GROWTH = 4
+
+
+class CandidateEmbedder:
+    """
+    Turns CV texts into fixed-size dense vectors: hashed, log-scaled term
+    counts projected down with a seeded sparse random projection and
+    L2-normalised. It is stateless, so every worker process (and every
+    rebuild) embeds the same text to the same vector.
+    """
+
+    def __init__(self, dim=256, n_features=2 ** 18, seed=42):
+        self.dim = dim
+        self.vectorizer = HashingVectorizer(
+            stop_words='english', n_features=n_features, alternate_sign=False, norm=None
+        )
+        # The projection matrix only depends on the shapes and the seed
+        self.projection = SparseRandomProjection(n_components=dim, dense_output=True, random_state=seed)
+        self.projection.fit(sp.csr_matrix((1, n_features), dtype=np.float32))
+
+    def embed(self, texts):
+        counts = self.vectorizer.transform([text or '' for text in texts]).astype(np.float32)
+        counts.data = np.log1p(counts.data)
+        vectors = self.projection.transform(normalize(counts))
+        return normalize(vectors).astype(np.float32)
+
+
+def _nearest_lists(vectors, centroids):
+    """Index of the closest centroid (by inner product) for every vector."""
+    assign = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), ASSIGN_CHUNK):
+        chunk = vectors[start:start + ASSIGN_CHUNK]
+        assign[start:start + len(chunk)] = np.argmax(chunk @ centroids.T, axis=1)
+    return assign
+
+
+def train_centroids(vectors, nlist, seed=0):
+    """Spherical k-means over (a sample of) the vectors. Returns an (nlist, dim) float32 array."""
+    rng = np.random.default_rng(seed)
+    if len(vectors) > KMEANS_SAMPLE:
+        vectors = vectors[np.sort(rng.choice(len(vectors), KMEANS_SAMPLE, replace=False))]
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    centroids = vectors[rng.choice(len(vectors), nlist, replace=False)].copy()
+    for _ in range(KMEANS_ITERATIONS):
+        assign = _nearest_lists(vectors, centroids)
+        members = sp.csr_matrix(
+            (np.ones(len(vectors), dtype=np.float32), (assign, np.arange(len(vectors)))),
+            shape=(nlist, len(vectors))
+        )
+        sums = np.asarray(members @ vectors)
+        filled = np.asarray(members.sum(axis=1)).ravel() > 0
+        # Empty lists keep their previous centroid
+        centroids[filled] = normalize(sums[filled])
+    return centroids
+
+
+class ANNIndex:
+    """
+    Inverted-file (IVF) nearest-neighbour index over candidate vectors, kept
+    on disk and memory-mapped so every worker process shares one copy
+    through the page cache.
+
+    Vectors, candidate ids and list assignments are flat files with room to
+    grow; meta.json records how many rows are in use. Writers append rows
+    (and tombstone deleted ones) under an exclusive file lock and publish
+    them by rewriting meta.json, which readers watch to remap. Queries probe
+    the nprobe lists whose centroids are closest and score only their rows;
+    until there are train_min vectors the index is searched exhaustively.
+
+    Inserts only append: new rows join the list of their nearest existing
+    centroid. Once the index has grown past train_min (or RETRAIN_GROWTH
+    times its last training) the centroids are retrained off the request
+    path, in a background thread when background_train is set and otherwise
+    by calling train(), and swapped in as a new quantizer generation.
+    """
+
+    def __init__(self, path, dim=256, n_features=2 ** 18, nprobe=16, train_min=2048, background_train=True):
+        self.path = path
+        self.dim = dim
+        self.nprobe = nprobe
+        self.train_min = train_min
+        self.background_train = background_train
+        self.embedder = CandidateEmbedder(dim, n_features)
+        self.lock = threading.Lock()
+        self.loaded_stamp = None
+        self._view = None
+        self._trainer = None
+
+    # ---------- Files ----------
+    def _file(self, name, meta):
+        return os.path.join(self.path, f"{name}-{meta['generation']}")
+
+    def _list_file(self, name, meta):
+        """Centroids and list assignments are also versioned by quantizer, so a retrain can swap them alone."""
+        quantizer = meta.get('quantizer', 0)
+        return self._file(name, meta) + (f'.{quantizer}' if quantizer else '')
+
+    def _read_meta(self):
+        try:
+            with open(os.path.join(self.path, META_FILE)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {
+                'dim': self.dim, 'count': 0, 'live': 0, 'capacity': 0, 'generation': 0,
+                'nlist': 0, 'trained_count': 0, 'quantizer': 0, 'version': 0
+            }
+
+    def _write_meta(self, meta):
+        meta['version'] += 1
+        temp_path = os.path.join(self.path, f'{META_FILE}.{os.getpid()}.tmp')
+        with open(temp_path, 'w') as f:
+            json.dump(meta, f)
+        os.replace(temp_path, os.path.join(self.path, META_FILE))
+
+    def _exclusive(self):
+        os.makedirs(self.path, exist_ok=True)
+        handle = open(os.path.join(self.path, LOCK_FILE), 'a')
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        return handle
+
+    def _map(self, meta, mode, rows=None):
+        """Memory-map (vectors, ids, lists) for the first rows rows (default: the whole capacity)."""
+        rows = meta['capacity'] if rows is None else rows
+        if rows == 0:
+            return (
+                np.empty((0, meta['dim']), dtype=np.float32), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int32)
+            )
+        return (
+            np.memmap(self._file('vectors', meta), dtype=np.float32, mode=mode, shape=(rows, meta['dim'])),
+            np.memmap(self._file('ids', meta), dtype=np.int64, mode=mode, shape=(rows,)),
+            np.memmap(self._list_file('lists', meta), dtype=np.int32, mode=mode, shape=(rows,))
+        )
+
+    def _reserve(self, meta, rows):
+        """Grow the files (doubling) so they hold at least rows rows."""
+        if rows <= meta['capacity']:
+            return
+        capacity = max(rows, 2 * meta['capacity'], 1024)
+        for path, itemsize in (
+            (self._file('vectors', meta), 4 * meta['dim']), (self._file('ids', meta), 8),
+            (self._list_file('lists', meta), 4)
+        ):
+            with open(path, 'ab') as f:
+                f.truncate(capacity * itemsize)
+        meta['capacity'] = capacity
+
+    # ---------- Reads ----------
+    def _refresh(self):
+        """Remap the files when another process (or this one) has published changes."""
+        try:
+            stat = os.stat(os.path.join(self.path, META_FILE))
+            stamp = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        except FileNotFoundError:
+            stamp = None
+        if stamp == self.loaded_stamp and self._view is not None:
+            return self._view
+
+        with self.lock:
+            if stamp == self.loaded_stamp and self._view is not None:
+                return self._view
+            meta = self._read_meta()
+            vectors, ids, lists = self._map(meta, 'r', meta['count'])
+            centroids = None
+            if meta['nlist']:
+                centroids = np.fromfile(self._list_file('centroids', meta), dtype=np.float32).reshape(meta['nlist'], -1)
+
+            # Rows grouped by list: rows of list l are order[starts[l]:starts[l + 1]]
+            assign = np.array(lists)
+            order = np.argsort(assign, kind='stable')
+            starts = np.searchsorted(assign[order], np.arange(max(meta['nlist'], 1) + 1))
+            id_order = np.argsort(ids, kind='stable')
+            self._view = {
+                'meta': meta, 'vectors': vectors, 'ids': ids, 'lists': lists, 'centroids': centroids,
+                'order': order, 'starts': starts, 'id_order': id_order, 'sorted_ids': np.asarray(ids)[id_order]
+            }
+            self.loaded_stamp = stamp
+            return self._view
+
+    def __len__(self):
+        return self._refresh()['meta']['live']
+
+    def _row(self, view, candidate_id):
+        """Live row holding candidate_id, or None."""
+        lo, hi = np.searchsorted(view['sorted_ids'], [candidate_id, candidate_id + 1])
+        for row in view['id_order'][lo:hi]:
+            if view['lists'][row] >= 0:
+                return int(row)
+        return None
+
+    def vector(self, candidate_id):
+        view = self._refresh()
+        row = self._row(view, candidate_id)
+        return None if row is None else np.array(view['vectors'][row])
+
+    def search(self, vector, limit=10, nprobe=None, exclude=None):
+        """
+        (candidate_id, score) pairs for the vectors with the highest inner
+        product with vector. nprobe=0 searches every row exactly.
+        """
+        view = self._refresh()
+        nprobe = self.nprobe if nprobe is None else nprobe
+        centroids = view['centroids']
+        vectors, ids, lists = view['vectors'], view['ids'], view['lists']
+        if centroids is None or nprobe == 0 or nprobe >= len(centroids):
+            rows = np.arange(view['meta']['count'])
+            scores = vectors @ vector
+        else:
+            probed = np.argpartition(-(centroids @ vector), nprobe - 1)[:nprobe]
+            starts = view['starts']
+            rows = np.sort(np.concatenate([view['order'][starts[l]:starts[l + 1]] for l in probed]))
+            scores = vectors[rows] @ vector
+
+        # Assignments are re-read: rows deleted since the last remap are tombstoned in place
+        keep = lists[rows] >= 0
+        if exclude is not None:
+            keep &= ids[rows] != exclude
+        rows, scores = rows[keep], scores[keep]
+        if not len(rows):
+            return []
+        if len(rows) > limit:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+        else:
+            top = np.arange(len(rows))
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(int(ids[rows[i]]), float(scores[i])) for i in top]
+
+    def similar(self, candidate_id, text=None, limit=10, nprobe=None):
+        """Candidates closest to a candidate's indexed vector, or to text when it is not indexed."""
+        vector = self.vector(candidate_id)
+        if vector is None:
+            vector = self.embedder.embed([text or ''])[0]
+        return self.search(vector, limit, nprobe, exclude=candidate_id)
+
+    # ---------- Writes ----------
+    def insert(self, documents):
+        """Add or replace documents given as (candidate_id, text) pairs."""
+        documents = list(documents)
+        if not documents:
+            return
+        vectors = self.embedder.embed([text for _, text in documents])
+        self.insert_vectors([candidate_id for candidate_id, _ in documents], vectors)
+
+    def insert_vectors(self, candidate_ids, vectors):
+        with self._exclusive():
+            meta = self._read_meta()
+            self._tombstone(meta, candidate_ids)
+            start = meta['count']
+            self._reserve(meta, start + len(candidate_ids))
+            stored_vectors, ids, lists = self._map(meta, 'r+')
+            stored_vectors[start:start + len(candidate_ids)] = vectors
+            ids[start:start + len(candidate_ids)] = candidate_ids
+            if meta['nlist']:
+                centroids = np.fromfile(self._list_file('centroids', meta), dtype=np.float32).reshape(meta['nlist'], -1)
+                lists[start:start + len(candidate_ids)] = _nearest_lists(vectors, centroids)
+            else:
+                lists[start:start + len(candidate_ids)] = 0
+            for mapped in (stored_vectors, ids, lists):
+                mapped.flush()
+            meta['count'] += len(candidate_ids)
+            meta['live'] += len(candidate_ids)
+            self._write_meta(meta)
+
+        if self.background_train and self._needs_training(meta):
+            self._train_in_background()
+
+    def remove(self, candidate_ids):
+        candidate_ids = list(candidate_ids)
+        if not candidate_ids:
+            return
+        with self._exclusive():
+            meta = self._read_meta()
+            if self._tombstone(meta, candidate_ids):
+                self._write_meta(meta)
+
+    def _tombstone(self, meta, candidate_ids):
+        if not meta['count']:
+            return 0
+        _, ids, lists = self._map(meta, 'r+', meta['count'])
+        rows = np.flatnonzero(np.isin(ids, candidate_ids) & (lists >= 0))
+        if len(rows):
+            lists[rows] = -1
+            lists.flush()
+            meta['live'] -= len(rows)
+        return len(rows)
+
+    # ---------- Training ----------
+    def _needs_training(self, meta):
+        return meta['live'] >= self.train_min and (
+            not meta['nlist'] or meta['live'] >= RETRAIN_GROWTH * meta['trained_count']
+        )
+
+    def _train_in_background(self):
+        with self.lock:
+            if self._trainer is not None and self._trainer.is_alive():
+                return
+            self._trainer = threading.Thread(target=self._background_train, name='ann-index-train', daemon=True)
+            self._trainer.start()
+
+    def _background_train(self):
+        try:
+            self.train(wait=False)
+        except Exception:
+            logging.warning('Candidate ANN index training failed', exc_info=True)
+
+    def _write_centroids(self, meta, centroids):
+        temp_path = f"{self._list_file('centroids', meta)}.{os.getpid()}.tmp"
+        np.asarray(centroids, dtype=np.float32).tofile(temp_path)
+        os.replace(temp_path, self._list_file('centroids', meta))
+
+    def train(self, wait=True):
+        """
+        Retrain the centroids on a snapshot of the live vectors and reassign
+        the snapshot's rows without holding the writers' lock, then swap the
+        new centroids and assignments in as the next quantizer generation.
+        Rows appended or tombstoned meanwhile are carried over at the swap.
+        Returns False when another process is training (and wait is unset),
+        there is nothing to train, or the index was rebuilt meanwhile.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        with open(os.path.join(self.path, TRAIN_LOCK_FILE), 'a') as handle:
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX if wait else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+            with self._exclusive():
+                meta = self._read_meta()
+                if not meta['live'] or (not wait and not self._needs_training(meta)):
+                    return False
+                vectors, _, lists = self._map(meta, 'r', meta['count'])
+
+            live = np.flatnonzero(lists >= 0)
+            nlist = int(min(MAX_LISTS, max(1, np.sqrt(len(live)))))
+            centroids = train_centroids(vectors[live], nlist)
+            assign = _nearest_lists(vectors, centroids)
+
+            with self._exclusive():
+                current = self._read_meta()
+                if (current['generation'], current.get('quantizer', 0)) != (meta['generation'], meta.get('quantizer', 0)):
+                    return False
+                stored_vectors, _, current_lists = self._map(current, 'r', current['count'])
+                swapped = dict(
+                    current, quantizer=current.get('quantizer', 0) + 1, nlist=nlist, trained_count=len(live)
+                )
+                self._write_centroids(swapped, centroids)
+                new_lists = np.memmap(
+                    self._list_file('lists', swapped), dtype=np.int32, mode='w+', shape=(current['capacity'],)
+                )
+                new_lists[:meta['count']] = assign
+                if current['count'] > meta['count']:
+                    new_lists[meta['count']:current['count']] = _nearest_lists(
+                        stored_vectors[meta['count']:current['count']], centroids
+                    )
+                new_lists[np.flatnonzero(np.asarray(current_lists) < 0)] = -1
+                new_lists.flush()
+                self._write_meta(swapped)
+
+                # Readers keep their mapped copies until they remap
+                for name in ('lists', 'centroids'):
+                    try:
+                        os.remove(self._list_file(name, current))
+                    except FileNotFoundError:
+                        pass
+            return True
+
+    def _train(self, meta):
+        """Train the centroids on the live vectors and assign every row, in place. Only rebuild uses this."""
+        vectors, _, lists = self._map(meta, 'r+', meta['count'])
+        live = np.flatnonzero(lists >= 0)
+        nlist = int(min(MAX_LISTS, max(1, np.sqrt(len(live)))))
+        centroids = train_centroids(vectors[live], nlist)
+        self._write_centroids(meta, centroids)
+        for start in range(0, len(live), ASSIGN_CHUNK):
+            chunk = live[start:start + ASSIGN_CHUNK]
+            lists[chunk] = _nearest_lists(vectors[chunk], centroids)
+        lists.flush()
+        meta['nlist'] = nlist
+        meta['trained_count'] = len(live)
+
+    def rebuild(self, documents, batch_size=1000, progress=None):
+        """
+        Replace the whole index with documents ((candidate_id, text) pairs),
+        written as a new generation of files so readers keep using the old
+        ones until meta.json points at the new set. Returns the number indexed.
+        """
+        with self._exclusive():
+            old = self._read_meta()
+            meta = {
+                'dim': self.dim, 'count': 0, 'live': 0, 'capacity': 0, 'generation': old['generation'] + 1,
+                'nlist': 0, 'trained_count': 0, 'quantizer': 0, 'version': old['version']
+            }
+            batch = []
+
+            def flush():
+                vectors = self.embedder.embed([text for _, text in batch])
+                start = meta['count']
+                self._reserve(meta, start + len(batch))
+                stored_vectors, ids, lists = self._map(meta, 'r+')
+                stored_vectors[start:start + len(batch)] = vectors
+                ids[start:start + len(batch)] = [candidate_id for candidate_id, _ in batch]
+                lists[start:start + len(batch)] = 0
+                for mapped in (stored_vectors, ids, lists):
+                    mapped.flush()
+                meta['count'] += len(batch)
+                meta['live'] += len(batch)
+                batch.clear()
+                if progress:
+                    progress(meta['count'])
+
+            for document in documents:
+                batch.append(document)
+                if len(batch) >= batch_size:
+                    flush()
+            if batch:
+                flush()
+            if meta['live'] >= self.train_min:
+                self._train(meta)
+            self._write_meta(meta)
+
+            # Mapped copies stay readable after unlinking, so other processes finish their queries
+            for path in (
+                self._file('vectors', old), self._file('ids', old),
+                self._list_file('lists', old), self._list_file('centroids', old)
+            ):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            return meta['count']
+
+
+_ann_index = None
+_ann_index_lock = threading.Lock()
+
+
+def get_ann_index():
+    """Return the process-wide ANNIndex over ANN_INDEX_DIR."""
+    global _ann_index
+    if _ann_index is None:
+        with _ann_index_lock:
+            if _ann_index is None:
+                config = current_app.config
+                _ann_index = ANNIndex(
+                    path=config['ANN_INDEX_DIR'],
+                    dim=config['ANN_DIM'],
+                    n_features=config['SIMILARITY_N_FEATURES'],
+                    nprobe=config['ANN_NPROBE'],
+                    train_min=config['ANN_TRAIN_MIN']
+                )
+    return _ann_index
+
+
+def sync_ann_index(documents=None, removed=None):
+    """Index new or re-parsed CVs ((candidate_id, text) pairs) and drop purged candidates; failures only log."""
+    try:
+        index = get_ann_index()
+        if removed:
+            index.remove(removed)
+        if documents:
+            index.insert([(candidate_id, text) for candidate_id, text in documents if text])
+    except Exception:
+        logging.warning('Candidate ANN index update failed', exc_info=True)
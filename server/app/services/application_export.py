@@ -0,0 +1,144 @@
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from sqlalchemy import select
+from app.extensions import db
+from app.models import Application, AssessmentResult, Candidate, CandidateSkill
+from app.services.leaderboard import RANKING_KEYS
+from app.utils.pagination import order_clauses
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+EXPORT_COLUMNS = [
+    Application.id.label('application_id'),
+    Application.status,
+    Application.recommendation,
+    Application.cv_match_score,
+    Application.assessment_score,
+    Application.overall_score,
+    Application.applied_date,
+    Candidate.id.label('candidate_id'),
+    Candidate.first_name,
+    Candidate.last_name,
+    Candidate.email,
+    Candidate.phone,
+    Candidate.location,
+    Candidate.current_company,
+    Candidate.current_title,
+    Candidate.total_experience
+]
+FIELDS = [column.key for column in EXPORT_COLUMNS] + ['skills', 'latest_assessment_score', 'latest_assessment_at']
+
+
+def _skills(candidate_ids):
+    skills = {}
+    rows = (
+        db.session.query(CandidateSkill.candidate_id, CandidateSkill.skill)
+        .filter(CandidateSkill.candidate_id.in_(candidate_ids))
+        .order_by(CandidateSkill.candidate_id, CandidateSkill.id)
+    )
+    for candidate_id, skill in rows:
+        skills.setdefault(candidate_id, []).append(skill)
+    return skills
+
+
+def _latest_assessments(application_ids):
+    latest = {}
+    rows = (
+        db.session.query(AssessmentResult.application_id, AssessmentResult.score, AssessmentResult.completed_at)
+        .filter(AssessmentResult.application_id.in_(application_ids))
+        .order_by(AssessmentResult.application_id, AssessmentResult.completed_at, AssessmentResult.id)
+    )
+    for application_id, score, completed_at in rows:
+        latest[application_id] = (score, completed_at)
+    return latest
+
+
+def export_batches(requisition_id, status=None, recommendation=None, batch_size=1000):
+    """
+    Yield lists of export rows (dicts keyed by FIELDS) for a requisition's
+    applications in ranking order, batch_size at a time. Rows come off a
+    server-side cursor (yield_per), and each batch's skills and latest
+    assessment results are fetched with one IN query apiece, so memory stays
+    flat however many applications there are.
+    """
+    statement = (
+        select(*EXPORT_COLUMNS)
+        .join(Candidate, Candidate.id == Application.candidate_id)
+        .where(Application.requisition_id == requisition_id)
+        .order_by(*order_clauses(RANKING_KEYS))
+        .execution_options(yield_per=batch_size)
+    )
+    if status:
+        statement = statement.where(Application.status == status)
+    if recommendation:
+        statement = statement.where(Application.recommendation == recommendation)
+
+    result = db.session.execute(statement)
+    try:
+        for partition in result.partitions():
+            skills = _skills({row.candidate_id for row in partition})
+            assessments = _latest_assessments([row.application_id for row in partition])
+            batch = []
+            for row in partition:
+                data = row._asdict()
+                data['skills'] = skills.get(row.candidate_id, [])
+                data['latest_assessment_score'], data['latest_assessment_at'] = (
+                    assessments.get(row.application_id, (None, None))
+                )
+                batch.append(data)
+            yield batch
+    finally:
+        result.close()
+
+
+def _value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def iter_ndjson(batches):
+    for batch in batches:
+        yield ''.join(
+            json.dumps({key: _value(value) for key, value in row.items()}, separators=(',', ':')) + '\n'
+            for row in batch
+        ).encode('utf-8')
+
+
+def iter_csv(batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(FIELDS)
+    for batch in batches:
+        for row in batch:
+            writer.writerow([
+                ';'.join(row['skills']) if field == 'skills' else _value(row[field])
+                for field in FIELDS
+            ])
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def gzip_chunks(chunks, level=6):
+    """Compress a stream of byte chunks into a single gzip stream as it goes."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_applications(requisition_id, export_format='ndjson', status=None, recommendation=None,
+                        batch_size=1000, compress=False):
+    """Byte chunks of a requisition's application export in export_format, gzipped when compress is set."""
+    batches = export_batches(requisition_id, status, recommendation, batch_size)
+    chunks = iter_csv(batches) if export_format == 'csv' else iter_ndjson(batches)
+    return gzip_chunks(chunks) if compress else chunks
@@ -0,0 +1,226 @@
+from datetime import datetime
+import numpy as np
+from sqlalchemy import insert, update
+from app.extensions import db
+from app.models import Application, AuditLog, Candidate, Requisition
+from app.services.leaderboard import record_rankings
+from app.services.scoring_profile import (
+    EXPERIENCE_WEIGHT, HOLD_THRESHOLD, PROCEED_THRESHOLD, SKILL_WEIGHT, cached_scoring_profile, get_scoring_profile
+)
+from app.services.skill_dictionary import bytes_to_bits, overlap_counts, pack_bitsets, refresh_candidate_skill_bits
+
+# Requisition fields that feed into application scores
+SCORING_FIELDS = ('required_skills', 'min_experience', 'knockout_rules', 'weightings')
+# Applications that are no longer in play keep the scores they were decided on
+CLOSED_APPLICATION_STATUSES = ('rejected', 'hired', 'withdrawn')
+
+
+class BatchScorer:
+    """
+    Scores many candidates against one requisition's ScoringProfile with array
+    operations. Produces the same numbers as ScoringProfile.cv_match_score,
+    overall_score and recommendation, one row per candidate.
+    """
+
+    def __init__(self, profile):
+        self.profile = profile
+
+    def cv_scores(self, packed_skills, experience):
+        """packed_skills is the candidates' skill bitsets packed with pack_bitsets."""
+        profile = self.profile
+        if profile.required_count:
+            skill_ratio = overlap_counts(packed_skills, profile.required_bits) / profile.required_count
+        else:
+            skill_ratio = np.zeros(len(experience))
+
+        min_experience = profile.min_experience
+        if min_experience:
+            experience_match = np.where(experience >= min_experience, 1.0, experience / min_experience)
+        else:
+            experience_match = np.ones(len(experience))
+
+        scores = (skill_ratio * SKILL_WEIGHT) + (experience_match * EXPERIENCE_WEIGHT)
+
+        # An unknown knockout skill is held by nobody
+        knocked_out = np.full(len(experience), bool(profile.knockout_unresolved))
+        if profile.knockout_bits:
+            knocked_out |= overlap_counts(packed_skills, profile.knockout_bits) < profile.knockout_bits.bit_count()
+        for value in profile.knockout_experience:
+            knocked_out |= experience < value
+        scores[knocked_out] = 0
+
+        return np.minimum(scores * 100, 100)
+
+    def overall_scores(self, cv_scores, assessment_scores):
+        """NaN where the application has no assessment score yet."""
+        return (cv_scores * self.profile.cv_weight) + (assessment_scores * self.profile.assessment_weight)
+
+    @staticmethod
+    def recommendations(cv_scores, overall_scores):
+        """Assessed applications follow get_recommendation; the rest keep the screening rule used on apply."""
+        assessed = np.select(
+            [overall_scores >= PROCEED_THRESHOLD, overall_scores >= HOLD_THRESHOLD],
+            ['proceed', 'hold'],
+            'reject'
+        )
+        screened = np.where(cv_scores > 0, 'hold', 'reject')
+        return np.where(np.isnan(overall_scores), screened, assessed)
+
+
+def candidate_skill_bits(rows):
+    """
+    Skill bitsets for rows carrying candidate_id and skill_bits, in row order.
+    Candidates not backfilled yet get their bitsets computed (and stored) first.
+    """
+    pending = {row.candidate_id for row in rows if row.skill_bits is None}
+    computed = {}
+    if pending:
+        refresh_candidate_skill_bits(pending)
+        computed = {
+            candidate_id: bytes_to_bits(skill_bits) for candidate_id, skill_bits in
+            db.session.query(Candidate.id, Candidate.skill_bits).filter(Candidate.id.in_(pending))
+        }
+    return [
+        computed[row.candidate_id] if row.skill_bits is None else bytes_to_bits(row.skill_bits)
+        for row in rows
+    ]
+
+
+def _optional(value):
+    return None if np.isnan(value) else float(value)
+
+
+def _rescore(applications, profiles, action, changed_by):
+    """
+    Recompute the scores of application rows (with requisition_id, candidate
+    and score columns) against profiles ({requisition_id: ScoringProfile}),
+    one BatchScorer pass per requisition. Changes are written with a single
+    bulk UPDATE and one bulk insert of audit entries; the caller commits.
+    Returns the number of applications whose values changed.
+    """
+    skill_bits = candidate_skill_bits(applications)
+    groups = {}
+    for row, application in enumerate(applications):
+        groups.setdefault(application.requisition_id, []).append(row)
+
+    changed_at = datetime.utcnow()
+    updates = []
+    changed_rows = []
+    audit_logs = []
+    for requisition_id, rows in groups.items():
+        scorer = BatchScorer(profiles[requisition_id])
+        packed_skills = pack_bitsets([skill_bits[row] for row in rows])
+        experience = np.array([applications[row].total_experience or 0 for row in rows], dtype=np.float64)
+        assessment = np.array(
+            [np.nan if applications[row].assessment_score is None else applications[row].assessment_score
+             for row in rows],
+            dtype=np.float64
+        )
+        cv_scores = scorer.cv_scores(packed_skills, experience)
+        overall_scores = scorer.overall_scores(cv_scores, assessment)
+        recommendations = scorer.recommendations(cv_scores, overall_scores)
+
+        for position, row in enumerate(rows):
+            application = applications[row]
+            new_values = {
+                'cv_match_score': float(cv_scores[position]),
+                'overall_score': _optional(overall_scores[position]),
+                'recommendation': str(recommendations[position])
+            }
+            old_values = {
+                'cv_match_score': application.cv_match_score,
+                'overall_score': application.overall_score,
+                'recommendation': application.recommendation
+            }
+            if new_values == old_values:
+                continue
+            changed_rows.append(row)
+            updates.append({'id': application.id, **new_values})
+            audit_logs.append({
+                'application_id': application.id,
+                'action': action,
+                'changed_by': changed_by,
+                'changed_at': changed_at,
+                'old_values': old_values,
+                'new_values': new_values
+            })
+
+    if updates:
+        db.session.execute(update(Application), updates)
+        db.session.execute(insert(AuditLog), audit_logs)
+        # Bulk updates bypass the unit of work, so hand the new scores to the leaderboards directly
+        record_rankings(db.session, [
+            (values['id'], applications[row].requisition_id, values['overall_score'],
+             applications[row].status, values['recommendation'], False)
+            for row, values in zip(changed_rows, updates)
+        ])
+    return len(updates)
+
+
+def _application_rows(*criteria):
+    return (
+        db.session.query(
+            Application.id,
+            Application.requisition_id,
+            Application.candidate_id,
+            Application.status,
+            Application.cv_match_score,
+            Application.assessment_score,
+            Application.overall_score,
+            Application.recommendation,
+            Candidate.total_experience,
+            Candidate.skill_bits
+        )
+        .join(Candidate, Candidate.id == Application.candidate_id)
+        .filter(*criteria)
+        .order_by(Application.id)
+        .all()
+    )
+
+
+def rescore_requisition(requisition, changed_by=None):
+    """
+    Recompute cv_match_score, overall_score and recommendation for the
+    requisition's applications that are still open; closed ones (hired,
+    rejected, withdrawn) keep their scores. The caller commits.
+    Returns the number of applications whose values changed.
+    """
+    applications = _application_rows(
+        Application.requisition_id == requisition.id,
+        Application.status.notin_(CLOSED_APPLICATION_STATUSES)
+    )
+    if not applications:
+        return 0
+    return _rescore(
+        applications, {requisition.id: get_scoring_profile(requisition)}, 'Rescored after requisition update', changed_by
+    )
+
+
+def rescore_candidates(candidate_ids, changed_by=None):
+    """
+    Recompute the scores of the candidates' open applications (open
+    requisitions, application not closed) after their skills or experience
+    changed; the caller commits. Returns the number of applications changed.
+    """
+    applications = _application_rows(
+        Application.candidate_id.in_(list(candidate_ids)),
+        Application.status.notin_(CLOSED_APPLICATION_STATUSES),
+        Application.requisition_id.in_(
+            db.session.query(Requisition.id).filter(Requisition.status == 'open')
+        )
+    )
+    if not applications:
+        return 0
+
+    requisition_ids = {application.requisition_id for application in applications}
+    profiles = {}
+    for requisition_id, updated_at in (
+        db.session.query(Requisition.id, Requisition.updated_at).filter(Requisition.id.in_(requisition_ids))
+    ):
+        profiles[requisition_id] = cached_scoring_profile(requisition_id, updated_at)
+    missing = [requisition_id for requisition_id, profile in profiles.items() if profile is None]
+    if missing:
+        for requisition in Requisition.query.filter(Requisition.id.in_(missing)):
+            profiles[requisition.id] = get_scoring_profile(requisition)
+
+    return _rescore(applications, profiles, 'Rescored after candidate update', changed_by)
@@ -0,0 +1,155 @@
+import re
+import threading
+import time
+from flask import current_app
+from sqlalchemy import DDL, bindparam, event, func, inspect, literal_column, or_, select, text
+from app.extensions import db
+from app.models import Candidate
+
+SEARCH_COLUMN = 'search_vector'
+# Only the start of very long CVs is indexed; tsvector values are capped at 1MB
+CV_TEXT_INDEXED_CHARS = 100000
+
+# Names and emails are matched as written ('simple'); prose is stemmed ('english')
+SEARCH_COLUMN_DDL = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    f"""
+    ALTER TABLE candidates ADD COLUMN IF NOT EXISTS {SEARCH_COLUMN} tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(first_name, '') || ' ' || coalesce(last_name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(email, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(current_title, '') || ' ' || coalesce(current_company, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(summary, '')), 'C') ||
+        setweight(to_tsvector('english', left(coalesce(cv_text, ''), {CV_TEXT_INDEXED_CHARS})), 'D')
+    ) STORED
+    """
+]
+SEARCH_INDEXES = {
+    'ix_candidates_search_vector': f'USING gin ({SEARCH_COLUMN})',
+    'ix_candidates_name_trgm': "USING gin ((lower(first_name || ' ' || last_name)) gin_trgm_ops)",
+    'ix_candidates_email_trgm': 'USING gin ((lower(email)) gin_trgm_ops)'
+}
+
+
+def _index_ddl(name, concurrently=False):
+    keyword = 'CONCURRENTLY ' if concurrently else ''
+    return f'CREATE INDEX {keyword}IF NOT EXISTS {name} ON candidates {SEARCH_INDEXES[name]}'
+
+
+for _statement in SEARCH_COLUMN_DDL + [_index_ddl(name) for name in SEARCH_INDEXES]:
+    event.listen(Candidate.__table__, 'after_create', DDL(_statement).execute_if(dialect='postgresql'))
+
+
+def install_candidate_search(engine):
+    """
+    Add the search column and indexes to an existing PostgreSQL database.
+    Adding the column rewrites the table; the indexes are then built
+    CONCURRENTLY, so writes carry on while they build. Safe to re-run, and
+    rebuilds any index a failed concurrent build left invalid.
+    """
+    with engine.begin() as connection:
+        for statement in SEARCH_COLUMN_DDL:
+            connection.exec_driver_sql(statement)
+    with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+        invalid = connection.execute(
+            text(
+                'SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid '
+                'WHERE NOT i.indisvalid AND c.relname IN :names'
+            ).bindparams(bindparam('names', expanding=True)),
+            {'names': list(SEARCH_INDEXES)}
+        ).scalars().all()
+        for name in invalid:
+            connection.exec_driver_sql(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+        for name in SEARCH_INDEXES:
+            connection.exec_driver_sql(_index_ddl(name, concurrently=True))
+    invalidate_search_enabled()
+
+
+# engine -> (search column installed, monotonic time of the check)
+_enabled = {}
+_enabled_lock = threading.Lock()
+
+
+def invalidate_search_enabled():
+    """Forget whether the search column is installed, so the next search checks again."""
+    with _enabled_lock:
+        _enabled.clear()
+
+
+def search_enabled():
+    """
+    True when the database is PostgreSQL and the search column is installed.
+    The answer is cached per engine for CANDIDATE_SEARCH_CHECK_TTL seconds, so
+    running workers pick up `flask install-candidate-search` without a restart.
+    """
+    engine = db.engine
+    ttl = current_app.config.get('CANDIDATE_SEARCH_CHECK_TTL', 300)
+    cached = _enabled.get(engine)
+    if cached is None or time.monotonic() - cached[1] > ttl:
+        with _enabled_lock:
+            cached = _enabled.get(engine)
+            if cached is None or time.monotonic() - cached[1] > ttl:
+                enabled = engine.dialect.name == 'postgresql' and any(
+                    column['name'] == SEARCH_COLUMN for column in inspect(engine).get_columns('candidates')
+                )
+                cached = _enabled[engine] = (enabled, time.monotonic())
+    return cached[0]
+
+
+def _prefix_tsquery(term):
+    """'jane sm' -> 'jane & sm:*': every word must match, the last one as a prefix (search-as-you-type)."""
+    words = re.findall(r'\w+', term.lower())
+    if not words:
+        return None
+    return ' & '.join(words[:-1] + [f'{words[-1]}:*'])
+
+
+def search_candidates(query, term, rank_limit=None):
+    """
+    Filter a Candidate query by a search box term. Returns the filtered
+    query and its sort keys ((expression, descending) pairs for
+    app.utils.pagination), best matches first.
+
+    On PostgreSQL this matches the weighted tsvector (name and email, then
+    title and company, summary, CV text) and falls back to trigram similarity
+    on name and email for typos and partial emails, ranking by both. Ranking
+    reads every match's tsvector, so only the first rank_limit matches the
+    index scan finds (CANDIDATE_SEARCH_RANK_LIMIT; 0 for all) are ranked and
+    returned: a common term then costs about as much as a rare one. Other
+    databases get the ILIKE filter over name, email and company.
+    """
+    term = term.strip()
+    if not search_enabled():
+        return query.filter(
+            (Candidate.first_name.ilike(f'%{term}%')) |
+            (Candidate.last_name.ilike(f'%{term}%')) |
+            (Candidate.email.ilike(f'%{term}%')) |
+            (Candidate.current_company.ilike(f'%{term}%'))
+        ), [(Candidate.id, False)]
+
+    if rank_limit is None:
+        rank_limit = current_app.config.get('CANDIDATE_SEARCH_RANK_LIMIT', 1000)
+    lowered = term.lower()
+    # Same expressions as the trigram indexes (a bound ' ' would stop the planner matching them)
+    full_name = func.lower(Candidate.first_name + literal_column("' '") + Candidate.last_name)
+    email = func.lower(Candidate.email)
+    search_vector = literal_column(f'candidates.{SEARCH_COLUMN}')
+
+    conditions = [full_name.op('%')(lowered), email.startswith(lowered, autoescape=True)]
+    rank = func.greatest(func.similarity(full_name, lowered), func.similarity(email, lowered))
+    tsquery_text = _prefix_tsquery(term)
+    if tsquery_text:
+        # Names were indexed unstemmed and prose stemmed, so accept either reading of the term
+        tsquery = func.to_tsquery('simple', tsquery_text).op('||')(func.to_tsquery('english', tsquery_text))
+        conditions.append(search_vector.op('@@')(tsquery))
+        rank = rank + func.ts_rank_cd(search_vector, tsquery)
+
+    if rank_limit:
+        # No ORDER BY here: sorting the matches (say newest first) makes the planner walk the
+        # primary key hoping for early hits, which is seconds on rare terms. Unordered, the
+        # index scan stops after rank_limit rows, in the same table order from page to page
+        matches = select(Candidate.id).where(or_(*conditions)).limit(rank_limit)
+        query = query.filter(Candidate.id.in_(matches))
+    else:
+        query = query.filter(or_(*conditions))
+    return query, [(rank, True), (Candidate.id, True)]
@@ -0,0 +1,89 @@
+import zlib
+from flask import current_app
+from redis.exceptions import RedisError
+from app.extensions import db, redis_client
+from app.models import Candidate
+
+TEXT_KEY = 'candidate_text:{}'
+# Cached values are zlib-compressed and tagged, so entries written before
+# compression was introduced (plain UTF-8) are still readable
+COMPRESSED_PREFIX = b'z1:'
+SQL_IN_CHUNK = 1000
+
+
+def compress_text(text):
+    return COMPRESSED_PREFIX + zlib.compress((text or '').encode('utf-8'), 6)
+
+
+def decompress_text(value):
+    if value is None:
+        return None
+    if value.startswith(COMPRESSED_PREFIX):
+        return zlib.decompress(value[len(COMPRESSED_PREFIX):]).decode('utf-8')
+    return value.decode('utf-8')
+
+
+def load_candidate_texts(candidate_ids, decompress=True):
+    """
+    Return {candidate_id: cv_text} for many candidates in three round trips:
+    one Redis MGET, one SELECT ... WHERE id IN (...) for the cache misses and
+    one pipelined batch of SETEX to backfill them. Candidates without a CV map
+    to ''; unknown ids are left out. With decompress=False the values are the
+    compressed cache payloads (see decompress_text).
+    """
+    candidate_ids = list(dict.fromkeys(candidate_ids))
+    if not candidate_ids:
+        return {}
+
+    found = {}
+    try:
+        cached = redis_client.mget([TEXT_KEY.format(candidate_id) for candidate_id in candidate_ids])
+    except RedisError as e:
+        current_app.logger.warning(f'Candidate text cache unavailable: {str(e)}')
+        cached = None
+
+    if cached is not None:
+        for candidate_id, value in zip(candidate_ids, cached):
+            if value is not None:
+                found[candidate_id] = value
+    misses = [candidate_id for candidate_id in candidate_ids if candidate_id not in found]
+
+    loaded = {}
+    for start in range(0, len(misses), SQL_IN_CHUNK):
+        chunk = misses[start:start + SQL_IN_CHUNK]
+        rows = db.session.query(Candidate.id, Candidate.cv_text).filter(Candidate.id.in_(chunk))
+        for candidate_id, cv_text in rows:
+            loaded[candidate_id] = compress_text(cv_text)
+
+    if loaded and cached is not None:
+        ttl = current_app.config['CANDIDATE_TEXT_TTL']
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            for candidate_id, value in loaded.items():
+                pipe.setex(TEXT_KEY.format(candidate_id), ttl, value)
+            pipe.execute()
+        except RedisError as e:
+            current_app.logger.warning(f'Candidate text cache backfill failed: {str(e)}')
+
+    found.update(loaded)
+    if not decompress:
+        return {
+            candidate_id: value if value.startswith(COMPRESSED_PREFIX) else compress_text(value.decode('utf-8'))
+            for candidate_id, value in found.items()
+        }
+    return {candidate_id: decompress_text(value) for candidate_id, value in found.items()}
+
+
+def load_candidate_text(candidate_id):
+    return load_candidate_texts([candidate_id]).get(candidate_id, '')
+
+
+def invalidate_candidate_texts(candidate_ids):
+    """Drop cached texts after a candidate's CV text changes."""
+    keys = [TEXT_KEY.format(candidate_id) for candidate_id in candidate_ids]
+    if not keys:
+        return
+    try:
+        redis_client.delete(*keys)
+    except RedisError as e:
+        current_app.logger.warning(f'Candidate text cache invalidation failed: {str(e)}')
@@ -0,0 +1,196 @@
+import os
+import time
+import zipfile
+import zlib
+from itertools import islice
+from app.extensions import db
+from app.models import Candidate, CandidateSkill
+from app.services.ann_index import sync_ann_index
+from app.services.cv_parser import get_cv_parser, candidate_fields_from_parsed, detect_file_type
+from app.services.skill_dictionary import refresh_candidate_skill_bits
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx', '.txt')
+COPY_CHUNK = 1024 * 1024
+
+
+class InvalidArchive(ValueError):
+    pass
+
+
+def iter_zip_members(zip_source, target_dir, max_members=None, max_member_bytes=None, max_total_bytes=None):
+    """
+    Extract supported CV files from a ZIP into target_dir, yielding (filename,
+    path) pairs. Archives with more than max_members CVs, or whose CVs declare
+    more than max_member_bytes each or max_total_bytes in all, are refused
+    before anything is extracted; the same caps bound the bytes actually
+    written, whatever the headers claim. Raises InvalidArchive for those and
+    for corrupt archives, possibly after earlier members were yielded.
+    """
+    try:
+        with zipfile.ZipFile(zip_source) as archive:
+            members = [
+                (index, member) for index, member in enumerate(archive.infolist())
+                if not member.is_dir() and os.path.basename(member.filename).lower().endswith(SUPPORTED_EXTENSIONS)
+            ]
+            if max_members is not None and len(members) > max_members:
+                raise InvalidArchive(f'Archive holds {len(members)} CVs; the limit is {max_members}')
+            if max_member_bytes is not None and any(member.file_size > max_member_bytes for _, member in members):
+                raise InvalidArchive(f'Archive holds a CV over {max_member_bytes} bytes uncompressed')
+            if max_total_bytes is not None and sum(member.file_size for _, member in members) > max_total_bytes:
+                raise InvalidArchive(f'Archive expands to more than {max_total_bytes} bytes')
+
+            remaining = max_total_bytes
+            for index, member in members:
+                filename = os.path.basename(member.filename)
+                limit = min(limit for limit in (max_member_bytes, remaining, member.file_size) if limit is not None)
+                # Never trust archive paths; write under a generated name
+                path = os.path.join(target_dir, f'{index}_{filename}')
+                written = 0
+                with archive.open(member) as source, open(path, 'wb') as target:
+                    while True:
+                        chunk = source.read(COPY_CHUNK)
+                        if not chunk:
+                            break
+                        written += len(chunk)
+                        if written > limit:
+                            raise InvalidArchive(f'{filename} expands past its declared size')
+                        target.write(chunk)
+                if remaining is not None:
+                    remaining -= written
+                yield filename, path
+    except (zipfile.BadZipFile, zlib.error, EOFError):
+        raise InvalidArchive('Archive is not a valid ZIP file')
+    except (RuntimeError, NotImplementedError) as e:
+        # Encrypted members and unsupported compression methods
+        raise InvalidArchive(f'Archive could not be read: {str(e)}')
+
+
+class CVBatchIngestor:
+    """
+    Bulk-creates candidates from many CV files: text extraction is streamed into
+    nlp.pipe, and the resulting Candidate/CandidateSkill rows are inserted one
+    batch at a time.
+    """
+
+    def __init__(self, batch_size=32, n_process=1, parser_options=None):
+        self.batch_size = batch_size
+        self.n_process = n_process
+        self.parser = get_cv_parser(**(parser_options or {}))
+
+    def ingest(self, files):
+        """
+        files is an iterable of (filename, path). Returns a summary of the run;
+        if files raises InvalidArchive part way, the CVs read up to then are
+        still ingested and summary['error'] says why the rest were not.
+        """
+        start = time.perf_counter()
+        skipped = []
+        created = []
+        errors = []
+
+        def texts():
+            try:
+                yield from extracted()
+            except InvalidArchive as e:
+                # Keep what was already read and committed; the rest of the upload is dropped
+                errors.append(str(e))
+
+        def extracted():
+            for filename, path in files:
+                try:
+                    cv_text = self.parser.extract_text_from_file(path, detect_file_type(filename))
+                except Exception as e:
+                    skipped.append({'filename': filename, 'reason': str(e)})
+                    continue
+                if not cv_text or not cv_text.strip():
+                    skipped.append({'filename': filename, 'reason': 'No text could be extracted'})
+                    continue
+                yield cv_text, filename
+
+        parsed = self.parser.parse_many(texts(), batch_size=self.batch_size, n_process=self.n_process)
+        while True:
+            chunk = list(islice(parsed, self.batch_size))
+            if not chunk:
+                break
+            created.extend(self._insert_chunk(chunk, skipped))
+
+        elapsed = time.perf_counter() - start
+        processed = len(created) + len(skipped)
+        return {
+            'created': created,
+            'skipped': skipped,
+            'processed': processed,
+            'elapsed_seconds': round(elapsed, 3),
+            'cvs_per_second': round(processed / elapsed, 2) if elapsed > 0 else None,
+            'error': errors[0] if errors else None
+        }
+
+    def _insert_chunk(self, chunk, skipped):
+        rows = []
+        emails = set()
+        for parsed_data, filename in chunk:
+            email = parsed_data.get('email')
+            if not email:
+                skipped.append({'filename': filename, 'reason': 'No email address found'})
+                continue
+            if email in emails:
+                skipped.append({'filename': filename, 'reason': f'Duplicate email {email} in batch'})
+                continue
+            emails.add(email)
+            rows.append((parsed_data, filename))
+
+        if not rows:
+            return []
+
+        existing = {
+            email for (email,) in
+            db.session.query(Candidate.email).filter(Candidate.email.in_(emails)).all()
+        }
+
+        candidates = []
+        for parsed_data, filename in rows:
+            email = parsed_data['email']
+            if email in existing:
+                skipped.append({'filename': filename, 'reason': f'Candidate with email {email} already exists'})
+                continue
+
+            name_parts = parsed_data.get('name', '').split()
+            first_name = name_parts[0] if name_parts else email.split('@')[0]
+            last_name = ' '.join(name_parts[1:])
+
+            candidate = Candidate(
+                first_name=first_name[:50],
+                last_name=last_name[:50],
+                email=email,
+                cv_text=parsed_data['raw_text'],
+                parsing_status='parsed',
+                consent_given=False,
+                **candidate_fields_from_parsed(parsed_data, {})
+            )
+            candidates.append((candidate, parsed_data, filename))
+
+        try:
+            db.session.add_all([candidate for candidate, _, _ in candidates])
+            db.session.flush()
+
+            skills = [
+                CandidateSkill(candidate_id=candidate.id, skill=skill)
+                for candidate, parsed_data, _ in candidates
+                for skill in parsed_data.get('skills', [])
+            ]
+            db.session.add_all(skills)
+            db.session.flush()
+            refresh_candidate_skill_bits([candidate.id for candidate, _, _ in candidates])
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            for _, _, filename in candidates:
+                skipped.append({'filename': filename, 'reason': f'Database error: {str(e)}'})
+            return []
+
+        sync_ann_index(documents=[(candidate.id, parsed_data['raw_text']) for candidate, parsed_data, _ in candidates])
+
+        return [
+            {'filename': filename, 'candidate_id': candidate.id, 'email': candidate.email}
+            for candidate, _, filename in candidates
+        ]
@@ -0,0 +1,94 @@
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from pymongo.errors import PyMongoError
+from app.models.mongo_models import CVParsingResult
+
+
+def hash_file(file_path, chunk_size=1024 * 1024):
+    """SHA-256 of a file's bytes, read in chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class CVResultCache:
+    """
+    Content-addressed cache of (cv_text, parsed_data) keyed by the SHA-256 of
+    the uploaded file. An in-process LRU sits in front of the Mongo
+    cv_parsing_results collection; entries are scoped to a parser version so
+    changing the parser, model or skill dictionary invalidates them.
+    """
+
+    def __init__(self, version, max_entries=256, use_mongo=True):
+        self.version = version
+        self.max_entries = max_entries
+        self.use_mongo = use_mongo
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {'memory_hits': 0, 'mongo_hits': 0, 'misses': 0}
+
+        if self.use_mongo:
+            try:
+                CVParsingResult.ensure_cache_index()
+            except PyMongoError:
+                logging.warning('Could not create CV cache index, Mongo cache disabled', exc_info=True)
+                self.use_mongo = False
+
+    def lookup(self, file_hash):
+        """Return (cv_text, parsed_data) for file_hash, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(file_hash)
+            if entry is not None:
+                self._entries.move_to_end(file_hash)
+                self._counters['memory_hits'] += 1
+                return entry
+
+        if self.use_mongo:
+            try:
+                document = CVParsingResult.get_cached(file_hash, self.version)
+            except PyMongoError:
+                logging.warning('CV cache lookup failed', exc_info=True)
+                document = None
+            if document is not None:
+                entry = (document['cv_text'], document['parsed_data'])
+                self._remember(file_hash, entry)
+                with self._lock:
+                    self._counters['mongo_hits'] += 1
+                return entry
+
+        with self._lock:
+            self._counters['misses'] += 1
+        return None
+
+    def store(self, file_hash, cv_text, parsed_data):
+        self._remember(file_hash, (cv_text, parsed_data))
+        if self.use_mongo:
+            try:
+                CVParsingResult.store_cached(file_hash, self.version, cv_text, parsed_data)
+            except PyMongoError:
+                logging.warning('CV cache store failed', exc_info=True)
+
+    def _remember(self, file_hash, entry):
+        with self._lock:
+            self._entries[file_hash] = entry
+            self._entries.move_to_end(file_hash)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+            size = len(self._entries)
+        lookups = sum(counters.values())
+        hits = counters['memory_hits'] + counters['mongo_hits']
+        return {
+            'version': self.version,
+            'entries': size,
+            'max_entries': self.max_entries,
+            'hit_rate': round(hits / lookups, 4) if lookups else None,
+            **counters
+        }
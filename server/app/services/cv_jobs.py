@@ -0,0 +1,250 @@
+import json
+import os
+import queue
+import threading
+import uuid
+from datetime import datetime, timedelta
+from flask import current_app
+from redis.exceptions import RedisError
+from app.extensions import db, redis_client
+from app.models import Candidate
+from app.models.mongo_models import CVParsingResult
+from app.services.ann_index import sync_ann_index
+from app.services.candidate_text import invalidate_candidate_texts
+from app.services.cv_parser import candidate_fields_from_parsed
+from app.services.cv_parser_pool import get_parser_pool
+from app.services.rescore_queue import schedule_candidate_rescore
+
+QUEUE_KEY = 'cv_jobs:queue'
+PROCESSING_KEY = 'cv_jobs:processing'
+JOB_KEY = 'cv_job:{}'
+
+
+class RedisJobBackend:
+    """
+    Job records and the pending queue live in Redis, so any process can run or
+    poll a job. A popped job moves to a processing list until it is acked, so
+    a worker that dies mid-job leaves it there for recover() to requeue. Jobs
+    carry the path of the uploaded file, so every process running workers must
+    see the same CV_UPLOAD_FOLDER (a shared volume when they are on several hosts).
+    """
+
+    def __init__(self, client, ttl, stale_after):
+        self.client = client
+        self.ttl = ttl
+        self.stale_after = stale_after
+
+    def save(self, job):
+        self.client.setex(JOB_KEY.format(job['id']), self.ttl, json.dumps(job))
+
+    def get(self, job_id):
+        raw = self.client.get(JOB_KEY.format(job_id))
+        return json.loads(raw) if raw else None
+
+    def push(self, job_id):
+        self.client.lpush(QUEUE_KEY, job_id)
+
+    def pop(self, timeout):
+        job_id = self.client.brpoplpush(QUEUE_KEY, PROCESSING_KEY, timeout=timeout)
+        return job_id.decode('utf-8') if isinstance(job_id, bytes) else job_id
+
+    def ack(self, job_id):
+        self.client.lrem(PROCESSING_KEY, 1, job_id)
+
+    def recover(self):
+        """
+        Requeue jobs left in the processing list by a worker that stopped
+        mid-job. Jobs another live worker updated within stale_after seconds
+        are left alone. Returns the number requeued.
+        """
+        requeued = 0
+        cutoff = datetime.utcnow() - timedelta(seconds=self.stale_after)
+        for raw in self.client.lrange(PROCESSING_KEY, 0, -1):
+            job_id = raw.decode('utf-8') if isinstance(raw, bytes) else raw
+            job = self.get(job_id)
+            if job and job['status'] in ('completed', 'failed'):
+                self.ack(job_id)
+            elif job is None or datetime.fromisoformat(job['updated_at']) < cutoff:
+                # Move it back only if no other process recovered it first
+                if self.client.lrem(PROCESSING_KEY, 1, job_id) and job:
+                    self.client.rpush(QUEUE_KEY, job_id)
+                    requeued += 1
+        return requeued
+
+
+class LocalJobBackend:
+    """In-process fallback used when Redis is unavailable and in tests."""
+
+    def __init__(self):
+        self.jobs = {}
+        self.pending = queue.Queue()
+        self.lock = threading.Lock()
+
+    def save(self, job):
+        with self.lock:
+            self.jobs[job['id']] = dict(job)
+
+    def get(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def push(self, job_id):
+        self.pending.put(job_id)
+
+    def pop(self, timeout):
+        try:
+            return self.pending.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def ack(self, job_id):
+        pass
+
+    def recover(self):
+        # Pending jobs die with the process, along with this queue
+        return 0
+
+
+class CVJobQueue:
+    def __init__(self, app, backend, workers):
+        self.app = app
+        self.backend = backend
+        self.workers = workers
+        self._threads = []
+        self._stop = threading.Event()
+
+    def start(self):
+        try:
+            requeued = self.backend.recover()
+            if requeued:
+                self.app.logger.warning(f'Requeued {requeued} interrupted CV job(s)')
+        except RedisError as e:
+            self.app.logger.error(f'CV job recovery error: {str(e)}')
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f'cv-job-worker-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._stop.set()
+
+    def enqueue(self, candidate_id, file_path, file_type):
+        """Queue a saved CV file for parsing into candidate_id. Returns the job record."""
+        now = datetime.utcnow().isoformat()
+        job = {
+            'id': uuid.uuid4().hex,
+            'candidate_id': candidate_id,
+            'file_path': file_path,
+            'file_type': file_type,
+            'status': 'queued',
+            'progress': 0,
+            'error': None,
+            'created_at': now,
+            'updated_at': now
+        }
+        self.backend.save(job)
+        self.backend.push(job['id'])
+        return job
+
+    def get(self, job_id):
+        return self.backend.get(job_id)
+
+    def _update(self, job, **fields):
+        job.update(fields, updated_at=datetime.utcnow().isoformat())
+        self.backend.save(job)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                job_id = self.backend.pop(timeout=1)
+            except RedisError as e:
+                self.app.logger.error(f'CV job queue error: {str(e)}')
+                self._stop.wait(5)
+                continue
+            if job_id is None:
+                continue
+            with self.app.app_context():
+                try:
+                    self._process(job_id)
+                    self.backend.ack(job_id)
+                except RedisError as e:
+                    self.app.logger.error(f'CV job queue error: {str(e)}')
+                finally:
+                    db.session.remove()
+
+    def _process(self, job_id):
+        job = self.backend.get(job_id)
+        if not job:
+            return
+
+        self._update(job, status='running', progress=25)
+        try:
+            cv_text, parsed_data = get_parser_pool().parse_file(job['file_path'], job['file_type'])
+            self._update(job, progress=75)
+
+            candidate = Candidate.query.get(job['candidate_id'])
+            if candidate is None:
+                raise Exception(f"Candidate {job['candidate_id']} no longer exists")
+
+            fallback = {
+                'phone': candidate.phone,
+                'current_company': candidate.current_company,
+                'current_title': candidate.current_title,
+                'summary': candidate.summary
+            }
+            for field, value in candidate_fields_from_parsed(parsed_data, fallback).items():
+                setattr(candidate, field, value)
+            candidate.cv_text = cv_text
+            candidate.parsing_status = 'parsed'
+            db.session.commit()
+            # Drop any text cached while the CV was still being parsed
+            invalidate_candidate_texts([candidate.id])
+            sync_ann_index(documents=[(candidate.id, cv_text)])
+            schedule_candidate_rescore([candidate.id])
+
+            CVParsingResult.create(candidate.id, cv_text, parsed_data)
+            self._update(job, status='completed', progress=100)
+
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.warning(f'CV job {job_id} failed: {str(e)}')
+            # The parse itself may have failed, before the candidate was loaded
+            Candidate.query.filter_by(id=job['candidate_id']).update(
+                {'parsing_status': 'failed'}, synchronize_session=False
+            )
+            db.session.commit()
+            self._update(job, status='failed', error=str(e))
+
+        finally:
+            if os.path.exists(job['file_path']):
+                os.remove(job['file_path'])
+
+
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+
+def get_cv_job_queue():
+    """Return the process-wide CVJobQueue, starting its workers on first use."""
+    global _job_queue
+    if _job_queue is None:
+        with _job_queue_lock:
+            if _job_queue is None:
+                app = current_app._get_current_object()
+                backend = None
+                if app.config.get('CV_JOB_BACKEND', 'redis') == 'redis':
+                    try:
+                        redis_client.ping()
+                        backend = RedisJobBackend(
+                            redis_client, app.config.get('CV_JOB_TTL', 86400),
+                            app.config.get('CV_JOB_STALE_AFTER', 900)
+                        )
+                    except RedisError as e:
+                        app.logger.warning(f'Redis unavailable, using local CV job queue: {str(e)}')
+                if backend is None:
+                    backend = LocalJobBackend()
+                job_queue = CVJobQueue(app, backend, app.config.get('CV_JOB_WORKERS', 2))
+                job_queue.start()
+                _job_queue = job_queue
+    return _job_queue
@@ -1,67 +1,304 @@
 import spacy
+from spacy.tokens import Doc
 import PyPDF2
 import docx
+import codecs
+import hashlib
+import json
+import os
 import re
+import threading
+import time
+from contextlib import closing
+from itertools import islice
 from datetime import datetime
 from app.extensions import mongo_db
+from app.services.skill_matcher import get_skill_matcher
+
+DEFAULT_SPACY_MODEL = 'en_core_web_sm'
+
+# Bump whenever extraction or parsing logic changes so cached parse results are invalidated
+PARSER_VERSION = 3
+
+# Extraction limits; enough text for parsing without letting huge or hostile files run unbounded
+MAX_PAGES = 50
+MAX_CHARS = 100000
+EXTRACT_TIME_BUDGET = 10.0  # seconds per file
+TEXT_CHUNK_SIZE = 64 * 1024
+
+EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+PHONE_PATTERN = re.compile(r'(\+?\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}')
+EXPERIENCE_YEARS_PATTERNS = [
+    re.compile(r'(\d+)\s*(?:years?|yrs?)\s*(?:of)?\s*experience'),
+    re.compile(r'experience.*?(\d+)\s*(?:years?|yrs?)'),
+    re.compile(r'(\d+)\s*\+?\s*years?')
+]
+# Substring matches, as before: 'role' also matches 'roles', 'job' matches 'jobs'
+EXPERIENCE_KEYWORDS = re.compile('worked|experience|job|position|role')
+EDUCATION_KEYWORDS = re.compile('university|college|institute|bachelor|master|phd|degree|diploma')
+
+# Components the 'fast' profile never loads; the extractors don't use them
+FAST_PROFILE_EXCLUDE = ['tagger', 'parser', 'attribute_ruler', 'lemmatizer', 'morphologizer']
+
+# spaCy pipelines are expensive to load (hundreds of ms, tens of MB), so each
+# process keeps one copy per model and profile, and every CVParser shares it.
+_nlp_models = {}
+_nlp_lock = threading.Lock()
+
+_parsers = {}
+_parsers_lock = threading.Lock()
+
+
+def _load_nlp(model_name, profile):
+    if profile == 'full':
+        return spacy.load(model_name)
+    if profile != 'fast':
+        raise ValueError(f"Unknown spaCy pipeline profile '{profile}'")
+
+    # The extractors only read doc.ents (PERSON) and doc.sents, so keep NER and
+    # get sentence boundaries from the rule-based sentencizer instead of the parser
+    nlp = spacy.load(model_name, exclude=FAST_PROFILE_EXCLUDE)
+    if 'tok2vec' in nlp.pipe_names and not getattr(nlp.get_pipe('tok2vec'), 'listening_components', None):
+        nlp.remove_pipe('tok2vec')
+    if 'senter' not in nlp.pipe_names and 'sentencizer' not in nlp.pipe_names:
+        nlp.add_pipe('sentencizer', first=True)
+    return nlp
+
+
+def get_nlp(model_name=DEFAULT_SPACY_MODEL, profile='full'):
+    """Return the process-wide spaCy pipeline for model_name and profile, loading it on first use."""
+    key = (model_name, profile)
+    nlp = _nlp_models.get(key)
+    if nlp is None:
+        with _nlp_lock:
+            nlp = _nlp_models.get(key)
+            if nlp is None:
+                nlp = _load_nlp(model_name, profile)
+                _nlp_models[key] = nlp
+    return nlp
+
+
+def get_cv_parser(model_name=DEFAULT_SPACY_MODEL, profile='full', chunk_chars=0):
+    """Return the shared CVParser for these settings. Safe to call from any thread."""
+    key = (model_name, profile, chunk_chars)
+    parser = _parsers.get(key)
+    if parser is None:
+        with _parsers_lock:
+            parser = _parsers.get(key)
+            if parser is None:
+                parser = CVParser(model_name, profile, chunk_chars)
+                _parsers[key] = parser
+    return parser
+
+
+def parser_options_from_config(config):
+    """Keyword arguments for get_cv_parser taken from the Flask config."""
+    return {
+        'model_name': config.get('SPACY_MODEL', DEFAULT_SPACY_MODEL),
+        'profile': config.get('SPACY_PIPELINE_PROFILE', 'full'),
+        'chunk_chars': config.get('CV_NLP_CHUNK_CHARS', 0)
+    }
+
+
+def parser_cache_version(parser_options=None, extract_limits=None):
+    """Fingerprint of everything that affects parse output: parser logic, pipeline, limits and skill dictionary."""
+    fingerprint = json.dumps({
+        'parser': PARSER_VERSION,
+        'pipeline': parser_options or {},
+        'limits': extract_limits or {},
+        'skills': get_skill_matcher().version
+    }, sort_keys=True)
+    return hashlib.sha1(fingerprint.encode('utf-8')).hexdigest()[:16]
+
+
+def split_text(text, max_chars):
+    """
+    Split text into windows of at most max_chars, cutting after a newline or
+    space where possible so the windows concatenate back to the original text.
+    """
+    if not max_chars or len(text) <= max_chars:
+        return [text]
+
+    chunks = []
+    start = 0
+    while len(text) - start > max_chars:
+        end = start + max_chars
+        cut = text.rfind('\n', start, end)
+        if cut <= start:
+            cut = text.rfind(' ', start, end)
+        cut = cut + 1 if cut > start else end
+        chunks.append(text[start:cut])
+        start = cut
+    chunks.append(text[start:])
+    return chunks
+
+
+def detect_file_type(filename):
+    """Map an uploaded file name to the file_type expected by extract_text_from_file."""
+    file_ext = os.path.splitext(filename)[1].lower()
+    return 'pdf' if file_ext == '.pdf' else 'docx' if file_ext == '.docx' else 'txt'
+
+
+def candidate_fields_from_parsed(parsed_data, fallback):
+    """Candidate column values derived from a parse_cv result, using fallback where the CV has nothing."""
+    experience = parsed_data.get('experience', {})
+    details = experience.get('details')
+    education = parsed_data.get('education')
+    return {
+        'phone': parsed_data.get('phone') or fallback.get('phone'),
+        'current_company': details[0].split(' at ')[-1][:100] if details else fallback.get('current_company'),
+        'current_title': details[0].split(' at ')[0][:100] if details else fallback.get('current_title'),
+        'total_experience': float(experience.get('total_years', 0)),
+        'summary': ' '.join(education)[:500] if education else fallback.get('summary', '')
+    }
+
 
 class CVParser:
-    def __init__(self):
-        self.nlp = spacy.load("en_core_web_sm")
+    def __init__(self, model_name=DEFAULT_SPACY_MODEL, profile='full', chunk_chars=0):
+        self.nlp = get_nlp(model_name, profile)
+        self.skill_matcher = get_skill_matcher()
+        # CVs longer than chunk_chars are processed in bounded windows and merged (0 = never)
+        self.chunk_chars = chunk_chars
     
-    def extract_text_from_file(self, file_path, file_type):
+    def iter_text(self, source, file_type, max_pages=MAX_PAGES):
+        """
+        Yield a CV's text one PDF page, DOCX paragraph or plain-text chunk at a time.
+        source is a file path or a binary file object.
+        """
+        if file_type == 'pdf':
+            pdf_reader = PyPDF2.PdfReader(source)
+            for page in islice(pdf_reader.pages, max_pages):
+                yield (page.extract_text() or '') + "\n"
+        elif file_type == 'docx':
+            doc = docx.Document(source)
+            for para in doc.paragraphs:
+                yield para.text + "\n"
+        elif isinstance(source, str):
+            with open(source, 'r', encoding='utf-8') as file:
+                for chunk in iter(lambda: file.read(TEXT_CHUNK_SIZE), ''):
+                    yield chunk
+        else:
+            reader = codecs.getincrementaldecoder('utf-8')()
+            for chunk in iter(lambda: source.read(TEXT_CHUNK_SIZE), b''):
+                yield reader.decode(chunk)
+            yield reader.decode(b'', final=True)
+
+    def extract_text_from_file(self, source, file_type, max_pages=MAX_PAGES, max_chars=MAX_CHARS,
+                               time_budget=EXTRACT_TIME_BUDGET):
+        """
+        Extract a CV's text from a file path or binary file object. Stops early once
+        max_chars have been collected or time_budget seconds have passed.
+        """
         try:
-            text = ""
-            if file_type == 'pdf':
-                with open(file_path, 'rb') as file:
-                    pdf_reader = PyPDF2.PdfReader(file)
-                    for page in pdf_reader.pages:
-                        text += page.extract_text() + "\n"
-            elif file_type == 'docx':
-                doc = docx.Document(file_path)
-                for para in doc.paragraphs:
-                    text += para.text + "\n"
-            else:
-                with open(file_path, 'r', encoding='utf-8') as file:
-                    text = file.read()
-            return text
+            parts = []
+            collected = 0
+            deadline = time.monotonic() + time_budget if time_budget else None
+            with closing(self.iter_text(source, file_type, max_pages)) as chunks:
+                for chunk in chunks:
+                    parts.append(chunk)
+                    collected += len(chunk)
+                    if max_chars and collected >= max_chars:
+                        break
+                    if deadline and time.monotonic() > deadline:
+                        break
+            text = ''.join(parts)
+            return text[:max_chars] if max_chars else text
         except Exception as e:
             raise Exception(f"Error extracting text from file: {str(e)}")
     
     def parse_cv(self, cv_text):
         try:
-            doc = self.nlp(cv_text)
-            
-            # Extract name
-            name = self.extract_name(doc)
-            
-            # Extract email
-            email = self.extract_email(cv_text)
-            
-            # Extract phone
-            phone = self.extract_phone(cv_text)
-            
-            # Extract skills
-            skills = self.extract_skills(doc)
-            
-            # Extract experience
-            experience = self.extract_experience(doc)
-            
-            # Extract education
-            education = self.extract_education(doc)
-            
-            return {
-                'name': name,
-                'email': email,
-                'phone': phone,
-                'skills': skills,
-                'experience': experience,
-                'education': education,
-                'raw_text': cv_text
-            }
+            doc = self.make_doc(cv_text)
+            return self._parse_doc(doc, cv_text)
         except Exception as e:
             raise Exception(f"Error parsing CV: {str(e)}")
-    
+
+    def make_doc(self, cv_text):
+        """Run the pipeline over cv_text, in chunk_chars windows when it is long."""
+        chunks = split_text(cv_text, self.chunk_chars)
+        if len(chunks) == 1:
+            return self.nlp(cv_text)
+        return Doc.from_docs(list(self.nlp.pipe(chunks)), ensure_whitespace=False)
+
+    def parse_many(self, items, batch_size=32, n_process=1):
+        """
+        Parse many CVs through nlp.pipe. items is an iterable of (cv_text, context)
+        pairs and is consumed lazily; yields (parsed_data, context) in the same order.
+        """
+        def windows():
+            for cv_text, context in items:
+                chunks = split_text(cv_text, self.chunk_chars)
+                for index, chunk in enumerate(chunks):
+                    yield chunk, (context, index == len(chunks) - 1)
+
+        pending = []
+        docs = self.nlp.pipe(windows(), as_tuples=True, batch_size=batch_size, n_process=n_process)
+        for doc, (context, last) in docs:
+            pending.append(doc)
+            if not last:
+                continue
+            doc = pending[0] if len(pending) == 1 else Doc.from_docs(pending, ensure_whitespace=False)
+            pending = []
+            yield self._parse_doc(doc, doc.text), context
+
+    def _parse_doc(self, doc, cv_text):
+        # Lowercase once and sort sentences in a single pass; every extractor reuses both
+        text_lower = cv_text.lower()
+        sections = self.classify_sentences(doc, text_lower)
+
+        # Extract name
+        name = self.extract_name(doc)
+
+        # Extract email
+        email = self.extract_email(cv_text)
+
+        # Extract phone
+        phone = self.extract_phone(cv_text)
+
+        # Extract skills
+        skills = self.extract_skills(doc, text_lower)
+
+        # Extract experience
+        experience = self.extract_experience(doc, text_lower, sections)
+
+        # Extract education
+        education = self.extract_education(doc, sections)
+
+        return {
+            'name': name,
+            'email': email,
+            'phone': phone,
+            'skills': skills,
+            'experience': experience,
+            'education': education,
+            'raw_text': cv_text
+        }
+
+    def classify_sentences(self, doc, text_lower=None):
+        """
+        Sort the sentences of doc into experience, education and other buckets in one loop.
+        A sentence mentioning both a job and a qualification goes into both buckets.
+        """
+        if text_lower is None:
+            text_lower = doc.text.lower()
+        # Slicing the lowered text avoids lowering each sentence again, but only
+        # lines up when lowercasing kept every character the same length
+        aligned = len(text_lower) == len(doc.text)
+
+        sections = {'experience': [], 'education': [], 'other': []}
+        for sent in doc.sents:
+            sent_lower = text_lower[sent.start_char:sent.end_char] if aligned else sent.text.lower()
+            matched = False
+            if EXPERIENCE_KEYWORDS.search(sent_lower):
+                sections['experience'].append(sent.text)
+                matched = True
+            if EDUCATION_KEYWORDS.search(sent_lower):
+                sections['education'].append(sent.text)
+                matched = True
+            if not matched:
+                sections['other'].append(sent.text)
+        return sections
+
     def extract_name(self, doc):
         for ent in doc.ents:
             if ent.label_ == "PERSON":
@@ -69,72 +306,37 @@ class CVParser:
         return ""
     
     def extract_email(self, text):
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        match = re.search(email_pattern, text)
+        match = EMAIL_PATTERN.search(text)
         return match.group(0) if match else ""
     
     def extract_phone(self, text):
-        phone_pattern = r'(\+?\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'
-        match = re.search(phone_pattern, text)
+        match = PHONE_PATTERN.search(text)
         return match.group(0) if match else ""
     
-    def extract_skills(self, doc):
-        # Common skills dictionary
-        common_skills = {
-            'programming': ['python', 'java', 'javascript', 'c++', 'c#', 'ruby', 'php', 'swift', 'kotlin', 'go'],
-            'web': ['html', 'css', 'react', 'angular', 'vue', 'django', 'flask', 'node.js', 'express'],
-            'database': ['sql', 'mysql', 'postgresql', 'mongodb', 'redis', 'oracle'],
-            'devops': ['docker', 'kubernetes', 'aws', 'azure', 'gcp', 'jenkins', 'git', 'ci/cd'],
-            'data': ['pandas', 'numpy', 'tensorflow', 'pytorch', 'scikit-learn', 'ml', 'ai']
-        }
-        
-        skills = set()
-        text_lower = doc.text.lower()
-        
-        for category, skill_list in common_skills.items():
-            for skill in skill_list:
-                if skill in text_lower:
-                    skills.add(skill)
-        
-        return list(skills)
+    def extract_skills(self, doc, text_lower=None):
+        if text_lower is None:
+            text_lower = doc.text.lower()
+        return list(self.skill_matcher.find_skills(text_lower))
     
-    def extract_experience(self, doc):
-        experience = []
-        experience_patterns = [
-            r'(\d+)\s*(?:years?|yrs?)\s*(?:of)?\s*experience',
-            r'experience.*?(\d+)\s*(?:years?|yrs?)',
-            r'(\d+)\s*\+?\s*years?'
-        ]
-        
-        text = doc.text.lower()
+    def extract_experience(self, doc, text_lower=None, sections=None):
+        if text_lower is None:
+            text_lower = doc.text.lower()
+        if sections is None:
+            sections = self.classify_sentences(doc, text_lower)
+
         total_experience = 0
-        
-        for pattern in experience_patterns:
-            matches = re.findall(pattern, text)
-            for match in matches:
-                try:
-                    years = float(match)
-                    if years > total_experience:
-                        total_experience = years
-                except ValueError:
-                    continue
-        
-        # Extract job experiences
-        for sent in doc.sents:
-            if any(word in sent.text.lower() for word in ['worked', 'experience', 'job', 'position', 'role']):
-                experience.append(sent.text)
+        for pattern in EXPERIENCE_YEARS_PATTERNS:
+            for match in pattern.findall(text_lower):
+                years = float(match)
+                if years > total_experience:
+                    total_experience = years
         
         return {
             'total_years': total_experience,
-            'details': experience[:5]  # Limit to 5 most relevant experiences
+            'details': sections['experience'][:5]  # Limit to 5 most relevant experiences
         }
     
-    def extract_education(self, doc):
-        education = []
-        education_keywords = ['university', 'college', 'institute', 'bachelor', 'master', 'phd', 'degree', 'diploma']
-        
-        for sent in doc.sents:
-            if any(keyword in sent.text.lower() for keyword in education_keywords):
-                education.append(sent.text)
-        
-        return education
\ No newline at end of file
+    def extract_education(self, doc, sections=None):
+        if sections is None:
+            sections = self.classify_sentences(doc)
+        return sections['education']
@@ -0,0 +1,197 @@
+import hashlib
+import io
+import multiprocessing
+import os
+import resource
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from flask import current_app
+from app.services.cv_cache import CVResultCache, hash_file
+from app.services.cv_parser import (
+    get_cv_parser, parser_cache_version, parser_options_from_config, MAX_PAGES, MAX_CHARS, EXTRACT_TIME_BUDGET
+)
+
+
+def current_rss_kb():
+    """Resident set size of the current process in KB (peak RSS where /proc is unavailable)."""
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _warm_worker(parser_options):
+    get_cv_parser(**parser_options)
+
+
+def _worker_ready(parser_options):
+    get_cv_parser(**parser_options)
+    return os.getpid()
+
+
+def _parse_file(source, file_type, parser_options, extract_limits):
+    # source is a file path or the raw file bytes
+    start = time.perf_counter()
+    parser = get_cv_parser(**parser_options)
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    cv_text = parser.extract_text_from_file(source, file_type, **extract_limits)
+    parsed_data = parser.parse_cv(cv_text)
+    stats = {
+        'pid': os.getpid(),
+        'parse_ms': (time.perf_counter() - start) * 1000,
+        'rss_kb': current_rss_kb()
+    }
+    return cv_text, parsed_data, stats
+
+
+class CVParserPool:
+    """
+    Runs CV extraction and parsing either in the calling thread (workers=0),
+    using the process-wide shared parser, or in N pre-warmed worker processes
+    that each load the spaCy model exactly once.
+
+    When a result cache is configured, files are hashed in the calling process
+    and cache hits skip extraction, NLP and the trip to a worker entirely.
+    """
+
+    def __init__(self, workers=0, parser_options=None, timeout=None, cache=None, extract_limits=None):
+        self.workers = workers
+        self.parser_options = parser_options or {}
+        self.extract_limits = extract_limits or {}
+        self.timeout = timeout
+        self.cache = cache
+        self.executor = None
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+
+        if workers > 0:
+            self.executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_warm_worker,
+                initargs=(self.parser_options,)
+            )
+            # Start every worker now so the first uploads don't pay for model loading
+            futures = [self.executor.submit(_worker_ready, self.parser_options) for _ in range(workers)]
+            for future in futures:
+                future.result()
+        else:
+            get_cv_parser(**self.parser_options)
+
+    def parse_file(self, file_path, file_type):
+        """Extract and parse a CV file on disk. Returns (cv_text, parsed_data)."""
+        file_hash = hash_file(file_path) if self.cache is not None else None
+        return self._parse(file_path, file_type, file_hash)
+
+    def parse_bytes(self, data, file_type):
+        """Extract and parse an in-memory CV without touching disk. Returns (cv_text, parsed_data)."""
+        file_hash = hashlib.sha256(data).hexdigest() if self.cache is not None else None
+        return self._parse(data, file_type, file_hash)
+
+    def parse_upload(self, upload, file_type):
+        """Parse an UploadBuffer, reusing the hash computed while it was read."""
+        source = upload.path if upload.path is not None else upload.data
+        return self._parse(source, file_type, upload.sha256)
+
+    def _parse(self, source, file_type, file_hash):
+        if self.cache is not None:
+            cached = self.cache.lookup(file_hash)
+            if cached is not None:
+                return cached
+
+        if self.executor is None:
+            cv_text, parsed_data, stats = _parse_file(source, file_type, self.parser_options, self.extract_limits)
+        else:
+            future = self.executor.submit(_parse_file, source, file_type, self.parser_options, self.extract_limits)
+            cv_text, parsed_data, stats = future.result(timeout=self.timeout)
+
+        self._record(stats)
+        if self.cache is not None:
+            self.cache.store(file_hash, cv_text, parsed_data)
+        return cv_text, parsed_data
+
+    def _record(self, stats):
+        with self._stats_lock:
+            worker = self._stats.setdefault(stats['pid'], {
+                'parses': 0,
+                'total_parse_ms': 0.0,
+                'max_parse_ms': 0.0
+            })
+            worker['parses'] += 1
+            worker['total_parse_ms'] += stats['parse_ms']
+            worker['max_parse_ms'] = max(worker['max_parse_ms'], stats['parse_ms'])
+            worker['last_parse_ms'] = stats['parse_ms']
+            worker['rss_kb'] = stats['rss_kb']
+
+    def stats(self):
+        with self._stats_lock:
+            workers = []
+            for pid, worker in self._stats.items():
+                workers.append({
+                    'pid': pid,
+                    'parses': worker['parses'],
+                    'avg_parse_ms': round(worker['total_parse_ms'] / worker['parses'], 2),
+                    'max_parse_ms': round(worker['max_parse_ms'], 2),
+                    'last_parse_ms': round(worker['last_parse_ms'], 2),
+                    'rss_kb': worker['rss_kb']
+                })
+        return {
+            'mode': 'process' if self.executor else 'in_process',
+            'configured_workers': self.workers,
+            'parser': self.parser_options,
+            'workers': workers,
+            'cache': self.cache.stats() if self.cache is not None else None
+        }
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_parser_pool():
+    """Return the process-wide CVParserPool configured from the current app."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                config = current_app.config
+                parser_options = parser_options_from_config(config)
+                extract_limits = {
+                    'max_pages': config.get('CV_MAX_PAGES', MAX_PAGES),
+                    'max_chars': config.get('CV_MAX_CHARS', MAX_CHARS),
+                    'time_budget': config.get('CV_EXTRACT_TIME_BUDGET', EXTRACT_TIME_BUDGET)
+                }
+                cache = None
+                if config.get('CV_CACHE_ENABLED', True):
+                    cache = CVResultCache(
+                        parser_cache_version(parser_options, extract_limits),
+                        max_entries=config.get('CV_CACHE_SIZE', 256)
+                    )
+                _pool = CVParserPool(
+                    workers=config.get('CV_PARSER_WORKERS', 0),
+                    parser_options=parser_options,
+                    timeout=config.get('CV_PARSER_TIMEOUT'),
+                    cache=cache,
+                    extract_limits=extract_limits
+                )
+    return _pool
+
+
+def warm_parser_pool(app):
+    """
+    Build the app's parser pool (loading spaCy, starting any workers) before
+    the server takes traffic, so the first upload doesn't pay for it.
+    """
+    with app.app_context():
+        return get_parser_pool()
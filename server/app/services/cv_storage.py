@@ -0,0 +1,140 @@
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+import cloudinary
+import cloudinary.uploader
+
+CHUNK_SIZE = 64 * 1024
+
+
+class UploadBuffer:
+    """
+    An uploaded file read exactly once: hashed while it is read, held in memory
+    up to max_memory bytes and spilled to a temporary file beyond that. open()
+    returns an independent reader, so storage and parsing can consume it at the
+    same time.
+    """
+
+    def __init__(self, stream, max_memory=2 * 1024 * 1024, temp_dir=None):
+        digest = hashlib.sha256()
+        chunks = []
+        self.size = 0
+        self.path = None
+        self.data = None
+        temp_file = None
+
+        try:
+            for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+                self.size += len(chunk)
+                if temp_file is None and self.size > max_memory:
+                    temp_file = tempfile.NamedTemporaryFile(dir=temp_dir, suffix='.upload', delete=False)
+                    self.path = temp_file.name
+                    temp_file.writelines(chunks)
+                    chunks = []
+                if temp_file is not None:
+                    temp_file.write(chunk)
+                else:
+                    chunks.append(chunk)
+        except Exception:
+            self.close()
+            raise
+        finally:
+            if temp_file is not None:
+                temp_file.close()
+
+        if self.path is None:
+            self.data = b''.join(chunks)
+        self.sha256 = digest.hexdigest()
+
+    def open(self):
+        if self.path is not None:
+            return open(self.path, 'rb')
+        return io.BytesIO(self.data)
+
+    def save_to(self, path):
+        with self.open() as source, open(path, 'wb') as target:
+            shutil.copyfileobj(source, target, CHUNK_SIZE)
+
+    def close(self):
+        if self.path is not None and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class CloudinaryStorage:
+    def __init__(self, folder='recruitment/cvs', cloud_name=None, api_key=None, api_secret=None):
+        self.folder = folder
+        if cloud_name:
+            cloudinary.config(cloud_name=cloud_name, api_key=api_key, api_secret=api_secret, secure=True)
+
+    def save(self, upload, filename):
+        """Upload the file and return its public URL."""
+        with upload.open() as file:
+            result = cloudinary.uploader.upload(
+                file,
+                folder=self.folder,
+                resource_type="auto"
+            )
+        return result['secure_url']
+
+
+class LocalStorage:
+    """Content-addressed file store: each file lives at <root>/<aa>/<bb>/<sha256><ext>, written once."""
+
+    def __init__(self, root, base_url=None):
+        self.root = os.path.abspath(root)
+        self.base_url = base_url.rstrip('/') if base_url else None
+
+    def save(self, upload, filename):
+        """Store the file (unless identical content is already stored) and return its URL or path."""
+        ext = os.path.splitext(filename)[1].lower()
+        key = f'{upload.sha256[:2]}/{upload.sha256[2:4]}/{upload.sha256}{ext}'
+        path = os.path.join(self.root, key)
+
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f'{path}.{threading.get_ident()}.tmp'
+            upload.save_to(temp_path)
+            os.replace(temp_path, path)
+
+        return f'{self.base_url}/{key}' if self.base_url else path
+
+
+def get_cv_storage():
+    """Storage backend selected by CV_STORAGE_BACKEND (cloudinary or local)."""
+    config = current_app.config
+    if config.get('CV_STORAGE_BACKEND', 'cloudinary') == 'local':
+        return LocalStorage(config['CV_STORAGE_PATH'], config.get('CV_STORAGE_BASE_URL'))
+    return CloudinaryStorage(
+        cloud_name=config.get('CLOUDINARY_CLOUD_NAME'),
+        api_key=config.get('CLOUDINARY_API_KEY'),
+        api_secret=config.get('CLOUDINARY_API_SECRET')
+    )
+
+
+_storage_executor = None
+_storage_executor_lock = threading.Lock()
+
+
+def get_storage_executor():
+    """Threads that push CVs to storage while the request thread parses them."""
+    global _storage_executor
+    if _storage_executor is None:
+        with _storage_executor_lock:
+            if _storage_executor is None:
+                _storage_executor = ThreadPoolExecutor(
+                    max_workers=current_app.config.get('CV_UPLOAD_THREADS', 4),
+                    thread_name_prefix='cv-storage'
+                )
+    return _storage_executor
@@ -0,0 +1,319 @@
+import logging
+import uuid
+from redis.exceptions import RedisError, WatchError
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.extensions import db, redis_client
+from app.models import Application
+from app.utils.pagination import count_rows, keyset_page, order_clauses
+
+PENDING_KEY = 'pending_rankings'
+ALL_KEY = 'leaderboard:{}:all'  # ZSET of every application to a requisition by overall_score
+STATUS_KEY = 'leaderboard:{}:status:{}'
+RECOMMENDATION_KEY = 'leaderboard:{}:recommendation:{}'
+MEMBERS_KEY = 'leaderboard:{}:members'  # HASH member -> "status\trecommendation", to find old buckets
+BUILT_KEY = 'leaderboard:{}:built'
+REBUILD_KEY = 'leaderboard_rebuild:{}'  # token of the rebuild in progress; writes delete it
+TEMP_KEY = 'leaderboard_tmp:{}:{}'  # a rebuild's copy of a live key, renamed over it when done
+REBUILD_CHUNK = 5000
+REBUILD_ATTEMPTS = 3
+REBUILD_TTL = 300  # seconds
+
+
+def _member(application_id):
+    # Zero-padded so ties (equal scores) order by id, like the SQL fallback
+    return f'{application_id:012d}'
+
+
+def _score(overall_score):
+    return '-inf' if overall_score is None else overall_score
+
+
+def _buckets(requisition_id, status, recommendation):
+    keys = [ALL_KEY.format(requisition_id)]
+    if status:
+        keys.append(STATUS_KEY.format(requisition_id, status))
+    if recommendation:
+        keys.append(RECOMMENDATION_KEY.format(requisition_id, recommendation))
+    return keys
+
+
+class ApplicationLeaderboard:
+    """
+    Rankings of a requisition's applications by overall_score, kept as Redis
+    sorted sets: one over all applications, one per status and one per
+    recommendation bucket. Unscored applications rank last (-inf) and ties go
+    to the newest application, matching ranked_query. A requisition's sets
+    are built from the database on first read and kept current from then on
+    by write(), which runs after every commit that touches an application.
+    A rebuild fills temporary keys and renames them over the live ones only
+    if no write landed in the meantime, so it never overwrites a newer score.
+    """
+
+    def write(self, rows):
+        """Apply (id, requisition_id, overall_score, status, recommendation, removed) rows."""
+        rows = list(rows)
+        pipe = redis_client.pipeline(transaction=False)
+        for application_id, requisition_id, _, _, _, _ in rows:
+            pipe.hget(MEMBERS_KEY.format(requisition_id), _member(application_id))
+        previous = pipe.execute()
+
+        pipe = redis_client.pipeline()
+        for (application_id, requisition_id, overall_score, status, recommendation, removed), old in zip(rows, previous):
+            member = _member(application_id)
+            new_keys = [] if removed else _buckets(requisition_id, status, recommendation)
+            if old is not None:
+                old_status, old_recommendation = old.decode('utf-8').split('\t')
+                for key in set(_buckets(requisition_id, old_status, old_recommendation)) - set(new_keys):
+                    pipe.zrem(key, member)
+            if removed:
+                pipe.hdel(MEMBERS_KEY.format(requisition_id), member)
+                continue
+            for key in new_keys:
+                pipe.zadd(key, {member: _score(overall_score)})
+            pipe.hset(MEMBERS_KEY.format(requisition_id), member, f"{status or ''}\t{recommendation or ''}")
+        # Tell any rebuild in progress that its snapshot is out of date
+        for requisition_id in {row[1] for row in rows}:
+            pipe.delete(REBUILD_KEY.format(requisition_id))
+        pipe.execute()
+
+    def rebuild(self, requisition_id):
+        """
+        Resync one requisition's sets from the database. Returns the number of
+        applications, or None when writes kept landing during every attempt
+        (the sets are then left for the next read to rebuild).
+        """
+        for _ in range(REBUILD_ATTEMPTS):
+            count = self._try_rebuild(requisition_id)
+            if count is not None:
+                return count
+        logging.warning(f'Leaderboard rebuild of requisition {requisition_id} kept racing writes')
+        return None
+
+    def _try_rebuild(self, requisition_id):
+        token = uuid.uuid4().hex
+        rebuild_key = REBUILD_KEY.format(requisition_id)
+        # Set before reading, so any commit the snapshot misses deletes it
+        redis_client.set(rebuild_key, token, ex=REBUILD_TTL)
+        rows = (
+            db.session.query(Application.id, Application.overall_score, Application.status, Application.recommendation)
+            .filter(Application.requisition_id == requisition_id)
+            .all()
+        )
+
+        members_key = MEMBERS_KEY.format(requisition_id)
+        live_keys = set()
+        pipe = redis_client.pipeline(transaction=False)
+        for start in range(0, len(rows), REBUILD_CHUNK):
+            buckets = {}
+            members = {}
+            for application_id, overall_score, status, recommendation in rows[start:start + REBUILD_CHUNK]:
+                member = _member(application_id)
+                for key in _buckets(requisition_id, status, recommendation):
+                    buckets.setdefault(key, {})[member] = _score(overall_score)
+                members[member] = f"{status or ''}\t{recommendation or ''}"
+            for key, scores in buckets.items():
+                pipe.zadd(TEMP_KEY.format(token, key), scores)
+            pipe.hset(TEMP_KEY.format(token, members_key), mapping=members)
+            live_keys.update(buckets, [members_key])
+        for key in live_keys:
+            pipe.expire(TEMP_KEY.format(token, key), REBUILD_TTL)
+        pipe.execute()
+
+        with redis_client.pipeline() as pipe:
+            try:
+                pipe.watch(rebuild_key)
+                current = pipe.get(rebuild_key)
+                if current is None or current.decode('utf-8') != token:
+                    raise WatchError('written during rebuild')
+                stale = set(
+                    key.decode('utf-8') for key in pipe.scan_iter(f'leaderboard:{requisition_id}:*')
+                ) - live_keys
+                pipe.multi()
+                if stale:
+                    pipe.delete(*stale)
+                for key in live_keys:
+                    pipe.rename(TEMP_KEY.format(token, key), key)
+                    pipe.persist(key)
+                pipe.set(BUILT_KEY.format(requisition_id), 1)
+                pipe.delete(rebuild_key)
+                pipe.execute()
+            except WatchError:
+                if live_keys:
+                    redis_client.delete(*[TEMP_KEY.format(token, key) for key in live_keys])
+                return None
+        return len(rows)
+
+    def rebuild_all(self):
+        """Resync every requisition. Returns the number of applications."""
+        stale = list(redis_client.scan_iter('leaderboard:*'))
+        if stale:
+            redis_client.delete(*stale)
+        requisition_ids = [requisition_id for (requisition_id,) in db.session.query(Application.requisition_id).distinct()]
+        return sum(self.rebuild(requisition_id) or 0 for requisition_id in requisition_ids)
+
+    def invalidate(self, requisition_ids):
+        """Mark requisitions for a rebuild on next read, e.g. after a write could not be applied."""
+        if requisition_ids:
+            redis_client.delete(*[BUILT_KEY.format(requisition_id) for requisition_id in requisition_ids])
+
+    def page(self, requisition_id, status=None, recommendation=None, start=0, count=None, after=None):
+        """
+        (application ids, total) for a slice of a ranking, starting at start
+        or just past the after anchor ((overall_score, application id) of the
+        previous page's last row). None when the filter combination has no
+        set of its own (status and recommendation) or the anchor has since
+        moved, so the caller falls back to SQL.
+        """
+        if status and recommendation:
+            return None
+        if status:
+            key = STATUS_KEY.format(requisition_id, status)
+        elif recommendation:
+            key = RECOMMENDATION_KEY.format(requisition_id, recommendation)
+        else:
+            key = ALL_KEY.format(requisition_id)
+
+        if not redis_client.exists(BUILT_KEY.format(requisition_id)) and self.rebuild(requisition_id) is None:
+            return None
+        if after is not None:
+            overall_score, application_id = after
+            pipe = redis_client.pipeline(transaction=False)
+            pipe.zrevrank(key, _member(application_id))
+            pipe.zscore(key, _member(application_id))
+            rank, score = pipe.execute()
+            expected = float('-inf') if overall_score is None else float(overall_score)
+            if rank is None or score != expected:
+                return None
+            start = rank + 1
+
+        stop = -1 if count is None else start + count - 1
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.zrevrange(key, start, stop)
+        pipe.zcard(key)
+        members, total = pipe.execute()
+        return [int(member) for member in members], total
+
+
+_leaderboard = ApplicationLeaderboard()
+
+
+def get_leaderboard():
+    return _leaderboard
+
+
+# The SQL ordering the leaderboards mirror
+RANKING_KEYS = [(Application.overall_score, True), (Application.id, True)]
+
+
+def _filtered(requisition_id, status, recommendation, options=()):
+    query = Application.query.options(*options).filter_by(requisition_id=requisition_id)
+    if status:
+        query = query.filter_by(status=status)
+    if recommendation:
+        query = query.filter_by(recommendation=recommendation)
+    return query
+
+
+def _load(application_ids, options=()):
+    found = {
+        application.id: application
+        for application in Application.query.options(*options).filter(Application.id.in_(application_ids))
+    } if application_ids else {}
+    return [found[application_id] for application_id in application_ids if application_id in found]
+
+
+def _from_redis(requisition_id, status, recommendation, start=0, count=None, after=None):
+    try:
+        return _leaderboard.page(requisition_id, status, recommendation, start, count, after)
+    except RedisError:
+        logging.warning('Application leaderboard unavailable, ranking in SQL', exc_info=True)
+        return None
+
+
+def ranked_query(query):
+    return query.order_by(*order_clauses(RANKING_KEYS))
+
+
+def ranked_applications(requisition_id, status=None, recommendation=None, page=1, per_page=None, options=()):
+    """
+    (applications, total) for a page of a requisition's applications ranked by
+    overall_score, served from the leaderboards and falling back to SQL when
+    Redis is unavailable. per_page=None returns the whole ranking; options are
+    loader options (e.g. joinedload) applied to the applications query.
+    """
+    start = (page - 1) * per_page if per_page else 0
+    ranking = _from_redis(requisition_id, status, recommendation, start, per_page)
+    if ranking is not None:
+        application_ids, total = ranking
+        return _load(application_ids, options), total
+
+    query = ranked_query(_filtered(requisition_id, status, recommendation, options))
+    if per_page is None:
+        applications = query.all()
+        return applications, len(applications)
+    applications = query.paginate(page=page, per_page=per_page, error_out=False, count=False)
+    return applications.items, count_rows(query, 'exact')
+
+
+def ranked_applications_after(requisition_id, status=None, recommendation=None, limit=10, after=None, total=None,
+                              options=()):
+    """
+    Keyset page of a ranking: (applications, next (overall_score, id) anchor
+    or None, total or None). Uses the anchor's rank in the leaderboard, or a
+    keyset query when Redis is unavailable or the anchor has moved. total is
+    an opt-in count mode (see count_rows); Redis answers it exactly.
+    """
+    ranking = _from_redis(requisition_id, status, recommendation, 0, limit + 1, after)
+    if ranking is not None:
+        application_ids, ranked_total = ranking
+        applications = _load(application_ids, options)
+        next_after = None
+        if len(applications) > limit:
+            applications = applications[:limit]
+            next_after = [applications[-1].overall_score, applications[-1].id]
+        return applications, next_after, ranked_total if total else None
+
+    query = _filtered(requisition_id, status, recommendation, options)
+    applications, next_after = keyset_page(query, RANKING_KEYS, limit, after)
+    return applications, next_after, count_rows(query, total) if total else None
+
+
+def record_rankings(session, rows):
+    """Queue (id, requisition_id, overall_score, status, recommendation, removed) rows for after the commit."""
+    pending = session.info.setdefault(PENDING_KEY, {})
+    for row in rows:
+        pending[row[0]] = row
+
+
+@event.listens_for(Session, 'after_flush')
+def _applications_flushed(session, flush_context):
+    rows = [
+        (application.id, application.requisition_id, application.overall_score,
+         application.status, application.recommendation, application in session.deleted)
+        for application in list(session.new) + list(session.dirty) + list(session.deleted)
+        if isinstance(application, Application)
+    ]
+    if rows:
+        record_rankings(session, rows)
+
+
+@event.listens_for(Session, 'after_commit')
+def _applications_committed(session):
+    rows = list(session.info.pop(PENDING_KEY, {}).values())
+    if not rows:
+        return
+    try:
+        _leaderboard.write(rows)
+    except RedisError:
+        logging.warning('Application leaderboard update failed', exc_info=True)
+        try:
+            _leaderboard.invalidate({row[1] for row in rows})
+        except RedisError:
+            pass
+
+
+@event.listens_for(Session, 'after_transaction_end')
+def _applications_discarded(session, transaction):
+    if transaction.parent is None:
+        session.info.pop(PENDING_KEY, None)
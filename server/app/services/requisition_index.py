@@ -0,0 +1,146 @@
+import heapq
+import logging
+from redis.exceptions import RedisError
+from app.extensions import db, redis_client
+from app.models import Requisition
+from app.services.scoring_profile import cached_scoring_profile, get_scoring_profile
+
+SKILL_KEY = 'req_index:skill:{}'  # SET of open requisition ids requiring a skill
+REQUISITION_KEY = 'req_index:req:{}'  # SET of skill ids a requisition is indexed under
+BUILT_KEY = 'req_index:built'
+
+
+def bit_positions(bits):
+    """Skill ids set in a bitset."""
+    positions = []
+    while bits:
+        low = bits & -bits
+        positions.append(low.bit_length() - 1)
+        bits ^= low
+    return positions
+
+
+class RequisitionSkillIndex:
+    """
+    Inverted index from skill id to the open requisitions that require it,
+    kept in Redis sets. Reverse matching looks up a candidate's skills here
+    so only requisitions sharing at least one skill get scored.
+    """
+
+    def index(self, requisition):
+        """(Re)index a requisition under its required skills, or drop it when it is not open."""
+        skill_ids = []
+        if requisition.status == 'open':
+            skill_ids = bit_positions(get_scoring_profile(requisition).required_bits)
+        self._write(requisition.id, skill_ids)
+
+    def remove(self, requisition_id):
+        self._write(requisition_id, [])
+
+    def _write(self, requisition_id, skill_ids):
+        requisition_key = REQUISITION_KEY.format(requisition_id)
+        old_skill_ids = {int(skill_id) for skill_id in redis_client.smembers(requisition_key)}
+        pipe = redis_client.pipeline()
+        for skill_id in old_skill_ids - set(skill_ids):
+            pipe.srem(SKILL_KEY.format(skill_id), requisition_id)
+        pipe.delete(requisition_key)
+        for skill_id in skill_ids:
+            pipe.sadd(SKILL_KEY.format(skill_id), requisition_id)
+        if skill_ids:
+            pipe.sadd(requisition_key, *skill_ids)
+        pipe.execute()
+
+    def rebuild(self):
+        """Resync the whole index from the database. Returns the number of open requisitions indexed."""
+        stale = [key for key in redis_client.scan_iter('req_index:*')]
+        pipe = redis_client.pipeline()
+        if stale:
+            pipe.delete(*stale)
+        requisitions = Requisition.query.filter_by(status='open').all()
+        for requisition in requisitions:
+            skill_ids = bit_positions(get_scoring_profile(requisition).required_bits)
+            for skill_id in skill_ids:
+                pipe.sadd(SKILL_KEY.format(skill_id), requisition.id)
+            if skill_ids:
+                pipe.sadd(REQUISITION_KEY.format(requisition.id), *skill_ids)
+        pipe.set(BUILT_KEY, 1)
+        pipe.execute()
+        return len(requisitions)
+
+    def candidate_requisition_ids(self, candidate_bits):
+        """Ids of open requisitions requiring any of the candidate's skills."""
+        if not redis_client.exists(BUILT_KEY):
+            self.rebuild()
+        keys = [SKILL_KEY.format(skill_id) for skill_id in bit_positions(candidate_bits)]
+        if not keys:
+            return set()
+        return {int(requisition_id) for requisition_id in redis_client.sunion(keys)}
+
+
+_index = RequisitionSkillIndex()
+
+
+def get_requisition_index():
+    return _index
+
+
+def sync_requisition_index(requisition=None, requisition_id=None):
+    """Reflect a created, updated, closed or deleted requisition in the index; failures only log."""
+    try:
+        if requisition is not None:
+            _index.index(requisition)
+        else:
+            _index.remove(requisition_id)
+    except RedisError:
+        logging.warning('Requisition skill index update failed', exc_info=True)
+        # Force a rebuild once Redis is reachable again
+        try:
+            redis_client.delete(BUILT_KEY)
+        except RedisError:
+            pass
+
+
+def matching_requisitions(candidate_bits, candidate_experience, limit=10):
+    """
+    Top open requisitions for a candidate as (score, requisition, profile)
+    tuples. Candidates come from the inverted index; without Redis every
+    open requisition is checked for a shared skill instead. Scoring works on
+    cached profiles, so only the top requisitions are loaded in full.
+    """
+    query = db.session.query(Requisition.id, Requisition.updated_at).filter(Requisition.status == 'open')
+    try:
+        requisition_ids = _index.candidate_requisition_ids(candidate_bits)
+        if not requisition_ids:
+            return []
+        query = query.filter(Requisition.id.in_(requisition_ids))
+    except RedisError:
+        logging.warning('Requisition skill index unavailable, scanning open requisitions', exc_info=True)
+
+    profiles = {}
+    missing = []
+    for requisition_id, updated_at in query:
+        profiles[requisition_id] = cached_scoring_profile(requisition_id, updated_at)
+        if profiles[requisition_id] is None:
+            missing.append(requisition_id)
+
+    # Cold profiles are compiled from requisitions loaded in one query
+    requisitions = {}
+    if missing:
+        for requisition in Requisition.query.filter(Requisition.id.in_(missing)):
+            requisitions[requisition.id] = requisition
+            profiles[requisition.id] = get_scoring_profile(requisition)
+
+    scored = []
+    for requisition_id, profile in profiles.items():
+        if profile is None or not candidate_bits & profile.required_bits:
+            continue
+        score = profile.cv_match_score(None, candidate_experience, candidate_bits)
+        scored.append((score, -requisition_id, profile))
+
+    top = heapq.nlargest(limit, scored, key=lambda item: item[:2])
+    unloaded = [-negative_id for _, negative_id, _ in top if -negative_id not in requisitions]
+    if unloaded:
+        requisitions.update(
+            (requisition.id, requisition) for requisition in Requisition.query.filter(Requisition.id.in_(unloaded))
+        )
+    return [(score, requisitions[-negative_id], profile) for score, negative_id, profile in top]
@@ -0,0 +1,140 @@
+import threading
+import time
+from flask import current_app
+from redis.exceptions import RedisError
+from app.extensions import db, redis_client
+from app.services.batch_scoring import rescore_candidates
+
+PENDING_KEY = 'rescore:pending'  # ZSET of candidate id -> time the rescoring is due
+
+
+class RedisRescoreBackend:
+    """Pending candidates live in a Redis sorted set, so any process can pick them up."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def schedule(self, candidate_ids, due):
+        # Re-adding a pending candidate pushes its due time back: a burst of edits coalesces
+        self.client.zadd(PENDING_KEY, {str(candidate_id): due for candidate_id in candidate_ids})
+
+    def claim_due(self, now, limit):
+        due = self.client.zrangebyscore(PENDING_KEY, '-inf', now, start=0, num=limit)
+        if not due:
+            return []
+        pipe = self.client.pipeline()
+        for candidate_id in due:
+            pipe.zrem(PENDING_KEY, candidate_id)
+        # Only the process whose ZREM removed the entry owns it
+        return [int(candidate_id) for candidate_id, removed in zip(due, pipe.execute()) if removed]
+
+
+class LocalRescoreBackend:
+    """In-process fallback used when Redis is unavailable and in tests."""
+
+    def __init__(self):
+        self.pending = {}
+        self.lock = threading.Lock()
+
+    def schedule(self, candidate_ids, due):
+        with self.lock:
+            for candidate_id in candidate_ids:
+                self.pending[candidate_id] = due
+
+    def claim_due(self, now, limit):
+        with self.lock:
+            due = [candidate_id for candidate_id, at in self.pending.items() if at <= now][:limit]
+            for candidate_id in due:
+                del self.pending[candidate_id]
+            return due
+
+
+class RescoreQueue:
+    """
+    Debounced rescoring of candidates' open applications. Mutations schedule
+    the candidate debounce seconds ahead (rescheduling on every edit), and a
+    worker thread rescores whatever has come due in batches of batch_size
+    candidates, one bulk update and one bulk audit insert per batch.
+    """
+
+    def __init__(self, app, backend, debounce, batch_size, poll_interval=1):
+        self.app = app
+        self.backend = backend
+        self.debounce = debounce
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='rescore-worker', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def enqueue(self, candidate_ids):
+        self.backend.schedule(list(candidate_ids), time.time() + self.debounce)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                candidate_ids = self.backend.claim_due(time.time(), self.batch_size)
+            except RedisError as e:
+                self.app.logger.error(f'Rescore queue error: {str(e)}')
+                self._stop.wait(5)
+                continue
+            if not candidate_ids:
+                self._stop.wait(self.poll_interval)
+                continue
+            with self.app.app_context():
+                try:
+                    changed = rescore_candidates(candidate_ids)
+                    db.session.commit()
+                    self.app.logger.info(f'Rescored {changed} applications for {len(candidate_ids)} candidates')
+                except Exception as e:
+                    db.session.rollback()
+                    self.app.logger.error(f'Candidate rescoring failed: {str(e)}')
+                    # Try again after another debounce period
+                    try:
+                        self.enqueue(candidate_ids)
+                    except RedisError:
+                        pass
+                finally:
+                    db.session.remove()
+
+
+_rescore_queue = None
+_rescore_queue_lock = threading.Lock()
+
+
+def get_rescore_queue():
+    """Return the process-wide RescoreQueue, starting its worker on first use."""
+    global _rescore_queue
+    if _rescore_queue is None:
+        with _rescore_queue_lock:
+            if _rescore_queue is None:
+                app = current_app._get_current_object()
+                backend = None
+                if app.config.get('RESCORE_BACKEND', 'redis') == 'redis':
+                    try:
+                        redis_client.ping()
+                        backend = RedisRescoreBackend(redis_client)
+                    except RedisError as e:
+                        app.logger.warning(f'Redis unavailable, using local rescore queue: {str(e)}')
+                if backend is None:
+                    backend = LocalRescoreBackend()
+                rescore_queue = RescoreQueue(
+                    app, backend, app.config['RESCORE_DEBOUNCE_SECONDS'], app.config['RESCORE_BATCH_SIZE']
+                )
+                rescore_queue.start()
+                _rescore_queue = rescore_queue
+    return _rescore_queue
+
+
+def schedule_candidate_rescore(candidate_ids):
+    """Queue candidates whose skills or experience changed; call after committing. Failures only log."""
+    try:
+        get_rescore_queue().enqueue(candidate_ids)
+    except RedisError as e:
+        current_app.logger.warning(f'Could not schedule candidate rescoring: {str(e)}')
@@ -0,0 +1,250 @@
+import json
+import logging
+import threading
+from collections import OrderedDict
+from redis.exceptions import RedisError
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.extensions import db, redis_client
+from app.services.skill_dictionary import get_skill_dictionary
+from app.services.skill_matcher import normalize_skill
+
+PROFILE_KEY = 'scoring_profile:v3:{}:{}'
+PENDING_KEY = 'pending_profiles'
+FLUSHED_KEY = 'profiles_flushed'
+PROFILE_TTL = 86400
+MAX_PROFILES = 8192
+
+SKILL_WEIGHT = 0.7
+EXPERIENCE_WEIGHT = 0.3
+PROCEED_THRESHOLD = 80
+HOLD_THRESHOLD = 60
+
+
+def _skill_knockout(mask):
+    return lambda bits, experience: bits & mask == mask
+
+
+def _experience_knockout(value):
+    return lambda bits, experience: experience >= value
+
+
+class ScoringProfile:
+    """
+    A requisition's scoring criteria compiled once: the required skills and
+    the knockout skills as bitsets of skill ids, knockout rules as predicates,
+    and the CV/assessment weights already divided down to fractions. Profiles
+    are immutable and tied to the requisition's updated_at, so they can be
+    shared freely. Skills missing from the skill dictionary are held by
+    nobody: they still count towards the skill ratio (required_unresolved),
+    and an unknown knockout skill knocks every candidate out.
+    """
+
+    def __init__(self, requisition_id, version, required_bits, min_experience, knockout_bits, knockout_experience,
+                 cv_weight, assessment_weight, required_unresolved=0, knockout_unresolved=0):
+        self.requisition_id = requisition_id
+        self.version = version
+        self.required_bits = required_bits
+        self.required_unresolved = required_unresolved
+        self.required_count = required_bits.bit_count() + required_unresolved
+        self.min_experience = min_experience or 0
+        self.knockout_bits = knockout_bits
+        self.knockout_unresolved = knockout_unresolved
+        self.knockout_experience = tuple(knockout_experience)
+        self.knockouts = tuple(
+            ([_skill_knockout(knockout_bits)] if knockout_bits else []) +
+            ([lambda bits, experience: False] if knockout_unresolved else []) +
+            [_experience_knockout(value) for value in self.knockout_experience]
+        )
+        self.cv_weight = cv_weight
+        self.assessment_weight = assessment_weight
+
+    @staticmethod
+    def weights(weightings):
+        """(cv, assessment) weights as fractions from a requisition's weightings dict."""
+        weightings = weightings or {}
+        return weightings.get('cv', 60) / 100, weightings.get('assessment', 40) / 100
+
+    @classmethod
+    def compile(cls, requisition, version=None):
+        """
+        Build a profile from a requisition dict (as returned by
+        Requisition.to_dict()). Only reads the skill dictionary: the
+        requisition write paths add its skills (register_requisition_skills).
+        """
+        dictionary = get_skill_dictionary()
+        knockout_rules = requisition.get('knockout_rules') or []
+        required = {normalize_skill(skill['name']) for skill in requisition.get('required_skills') or []}
+        required.discard('')
+        required_ids = dictionary.resolve(required)
+        knockout = {
+            normalize_skill(str(rule['value'])) for rule in knockout_rules
+            if rule.get('type') == 'skill' and rule.get('value') is not None
+        }
+        knockout.discard('')
+        knockout_ids = dictionary.resolve(knockout)
+        cv_weight, assessment_weight = cls.weights(requisition.get('weightings'))
+        return cls(
+            requisition_id=requisition.get('id'),
+            version=version or requisition.get('updated_at'),
+            required_bits=sum(1 << skill_id for skill_id in set(required_ids.values())),
+            required_unresolved=len(required - required_ids.keys()),
+            min_experience=requisition.get('min_experience'),
+            knockout_bits=sum(1 << skill_id for skill_id in set(knockout_ids.values())),
+            knockout_unresolved=len(knockout - knockout_ids.keys()),
+            knockout_experience=[
+                rule['value'] for rule in knockout_rules
+                if rule.get('type') == 'experience' and rule.get('value') is not None
+            ],
+            cv_weight=cv_weight,
+            assessment_weight=assessment_weight
+        )
+
+    def to_dict(self):
+        return {
+            'requisition_id': self.requisition_id,
+            'version': self.version,
+            'required_bits': self.required_bits,
+            'required_unresolved': self.required_unresolved,
+            'min_experience': self.min_experience,
+            'knockout_bits': self.knockout_bits,
+            'knockout_unresolved': self.knockout_unresolved,
+            'knockout_experience': list(self.knockout_experience),
+            'cv_weight': self.cv_weight,
+            'assessment_weight': self.assessment_weight
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+    # ---------- Scoring ----------
+    def knockout_passed(self, candidate_bits, candidate_experience):
+        return all(check(candidate_bits, candidate_experience) for check in self.knockouts)
+
+    def cv_match_score(self, candidate_skills, candidate_experience, candidate_bits=None):
+        """Score a candidate from skill names, or from its skill bitset when one is at hand."""
+        if candidate_bits is None:
+            candidate_bits = get_skill_dictionary().bitset(candidate_skills)
+        candidate_experience = candidate_experience or 0
+
+        matched_skills = (candidate_bits & self.required_bits).bit_count()
+        skill_match_ratio = matched_skills / self.required_count if self.required_count else 0
+
+        if candidate_experience >= self.min_experience:
+            experience_match = 1
+        else:
+            experience_match = candidate_experience / self.min_experience
+
+        score = (skill_match_ratio * SKILL_WEIGHT) + (experience_match * EXPERIENCE_WEIGHT)
+        if not self.knockout_passed(candidate_bits, candidate_experience):
+            score = 0
+
+        return min(score * 100, 100)  # Convert to percentage
+
+    def overall_score(self, cv_score, assessment_score):
+        return (cv_score * self.cv_weight) + (assessment_score * self.assessment_weight)
+
+    @staticmethod
+    def recommendation(overall_score, knockout_passed=True):
+        if not knockout_passed:
+            return 'reject'
+        if overall_score >= PROCEED_THRESHOLD:
+            return 'proceed'
+        if overall_score >= HOLD_THRESHOLD:
+            return 'hold'
+        return 'reject'
+
+
+_profiles = OrderedDict()
+_profiles_lock = threading.Lock()
+
+
+def _remember(key, profile):
+    with _profiles_lock:
+        _profiles[key] = profile
+        _profiles.move_to_end(key)
+        while len(_profiles) > MAX_PROFILES:
+            _profiles.popitem(last=False)
+
+
+def cached_scoring_profile(requisition_id, updated_at):
+    """The profile for a requisition version from the process cache or Redis, or None."""
+    version = updated_at.isoformat() if updated_at else None
+    key = (requisition_id, version)
+    with _profiles_lock:
+        profile = _profiles.get(key)
+        if profile is not None:
+            _profiles.move_to_end(key)
+            return profile
+
+    try:
+        cached = redis_client.get(PROFILE_KEY.format(requisition_id, version))
+    except RedisError:
+        logging.warning('Scoring profile cache unavailable', exc_info=True)
+        return None
+    if cached is None:
+        return None
+
+    profile = ScoringProfile.from_dict(json.loads(cached))
+    _remember(key, profile)
+    return profile
+
+
+def get_scoring_profile(requisition):
+    """
+    Return the compiled profile for a Requisition, looking in the process
+    cache, then Redis, before compiling it. The key includes updated_at, so
+    editing a requisition never serves a stale profile. A freshly compiled
+    profile is only shared (process cache and Redis) once the transaction
+    that compiled it commits, or ends without having written anything, so a
+    rolled-back transaction can never leave a cached profile behind.
+    """
+    profile = cached_scoring_profile(requisition.id, requisition.updated_at)
+    if profile is not None:
+        return profile
+
+    version = requisition.updated_at.isoformat() if requisition.updated_at else None
+    pending = db.session.info.setdefault(PENDING_KEY, {})
+    profile = pending.get((requisition.id, version))
+    if profile is None:
+        profile = ScoringProfile.compile(requisition.to_dict(), version)
+        # Skills the dictionary does not know yet may be added later: keep compiling until they resolve
+        if not (profile.required_unresolved or profile.knockout_unresolved):
+            pending[(requisition.id, version)] = profile
+    return profile
+
+
+def _share(profiles):
+    pipe = redis_client.pipeline(transaction=False)
+    for (requisition_id, version), profile in profiles.items():
+        _remember((requisition_id, version), profile)
+        pipe.setex(PROFILE_KEY.format(requisition_id, version), PROFILE_TTL, json.dumps(profile.to_dict()))
+    try:
+        pipe.execute()
+    except RedisError:
+        logging.warning('Scoring profile cache store failed', exc_info=True)
+
+
+@event.listens_for(Session, 'after_flush')
+def _profiles_flushed(session, flush_context):
+    session.info[FLUSHED_KEY] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _profiles_committed(session):
+    session.info.pop(FLUSHED_KEY, None)
+    profiles = session.info.pop(PENDING_KEY, None)
+    if profiles:
+        _share(profiles)
+
+
+@event.listens_for(Session, 'after_transaction_end')
+def _profiles_discarded(session, transaction):
+    if transaction.parent is not None:
+        return
+    flushed = session.info.pop(FLUSHED_KEY, False)
+    profiles = session.info.pop(PENDING_KEY, None)
+    # A read-only transaction saw only committed skills; anything else is dropped with its writes
+    if profiles and not flushed:
+        _share(profiles)
@@ -0,0 +1,266 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+import scipy.sparse as sp
+from flask import current_app
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+
+DEFAULT_N_FEATURES = 2 ** 18
+QUERY_CHUNK = 32  # probes per product, bounding the dense probe and score blocks
+
+
+def top_k(scores, limit):
+    """
+    Column indices of the limit highest scores in each row of a 2-D array,
+    best first. Selects with argpartition and sorts only the selected part.
+    A limit below 1 selects nothing.
+    """
+    if limit < 1:
+        return np.empty((scores.shape[0], 0), dtype=np.intp)
+    if scores.shape[1] > limit:
+        top = np.argpartition(-scores, limit - 1, axis=1)[:, :limit]
+    else:
+        top = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+    order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1, kind='stable')
+    return np.take_along_axis(top, order, axis=1)
+
+
+class SimilarityIndex:
+    """
+    TF-IDF index over candidate CV texts that is updated incrementally.
+
+    Term counts come from a stateless HashingVectorizer, so adding a CV never
+    needs the rest of the corpus: its counts row is appended and the document
+    frequencies are bumped. The IDF weights (and the normalised TF-IDF matrix
+    queries run against) are refitted from the stored counts once the corpus
+    has grown by refit_ratio since the last fit. A query vectorises only the
+    probe CV, or reuses its row when the candidate is already indexed.
+    """
+
+    def __init__(self, path=None, n_features=DEFAULT_N_FEATURES, refit_ratio=0.1):
+        self.path = path
+        self.refit_ratio = refit_ratio
+        self.vectorizer = HashingVectorizer(
+            stop_words='english', n_features=n_features, alternate_sign=False, norm=None
+        )
+        self.counts = sp.csr_matrix((0, n_features), dtype=np.float32)
+        self.doc_freq = np.zeros(n_features, dtype=np.int32)
+        self.ids = np.empty(0, dtype=np.int64)
+        self.stamps = np.empty(0, dtype=np.float64)
+        self.pending = 0
+        self.loaded_mtime = None
+        self.last_synced = None
+        self.lock = threading.RLock()
+        self._refit()
+
+    def __len__(self):
+        return len(self.ids)
+
+    # ---------- Model ----------
+    def _refit(self):
+        n_docs = len(self.ids)
+        # Same smoothed IDF as TfidfVectorizer
+        self.idf = (np.log((1 + n_docs) / (1 + self.doc_freq)) + 1).astype(np.float32)
+        self.matrix = self._weigh(self.counts)
+        self.rows = {int(candidate_id): row for row, candidate_id in enumerate(self.ids)}
+        self.pending = 0
+
+    def _weigh(self, counts):
+        if counts.shape[0] == 0:
+            return sp.csr_matrix(counts.shape, dtype=np.float32)
+        return normalize(sp.csr_matrix(counts.multiply(self.idf), dtype=np.float32))
+
+    def vectorize(self, texts):
+        return self._weigh(self.vectorizer.transform(texts).astype(np.float32))
+
+    # ---------- Updates ----------
+    def update(self, documents):
+        """Add or replace documents given as (candidate_id, text, stamp) tuples."""
+        documents = list(documents)
+        if not documents:
+            return
+        with self.lock:
+            self.remove([candidate_id for candidate_id, _, _ in documents], refit=False)
+            counts = self.vectorizer.transform([text or '' for _, text, _ in documents]).astype(np.float32)
+            self.doc_freq += np.bincount(counts.indices, minlength=self.doc_freq.size).astype(np.int32)
+
+            self.counts = sp.vstack([self.counts, counts], format='csr')
+            self.matrix = sp.vstack([self.matrix, self._weigh(counts)], format='csr')
+            self.ids = np.concatenate([self.ids, [candidate_id for candidate_id, _, _ in documents]]).astype(np.int64)
+            self.stamps = np.concatenate([self.stamps, [stamp for _, _, stamp in documents]]).astype(np.float64)
+            start = len(self.ids) - len(documents)
+            for offset, (candidate_id, _, _) in enumerate(documents):
+                self.rows[int(candidate_id)] = start + offset
+
+            self.pending += len(documents)
+            if self.pending > self.refit_ratio * len(self.ids):
+                self._refit()
+
+    def remove(self, candidate_ids, refit=True):
+        with self.lock:
+            drop = [self.rows[candidate_id] for candidate_id in candidate_ids if candidate_id in self.rows]
+            if not drop:
+                return
+            removed = self.counts[drop]
+            self.doc_freq -= np.bincount(removed.indices, minlength=self.doc_freq.size).astype(np.int32)
+
+            keep = np.ones(len(self.ids), dtype=bool)
+            keep[drop] = False
+            self.counts = self.counts[keep]
+            self.matrix = self.matrix[keep]
+            self.ids = self.ids[keep]
+            self.stamps = self.stamps[keep]
+            self.rows = {int(candidate_id): row for row, candidate_id in enumerate(self.ids)}
+            self.pending += len(drop)
+            if refit and self.pending > self.refit_ratio * len(self.ids):
+                self._refit()
+
+    def sync(self, stamps, load_texts):
+        """
+        Bring the index in line with stamps ({candidate_id: updated_at timestamp}):
+        drop candidates that are gone and (re)index new or changed ones, fetching
+        only their texts through load_texts(ids) -> {candidate_id: text}.
+        Returns True when anything changed.
+        """
+        with self.lock:
+            indexed = dict(zip(self.ids.tolist(), self.stamps.tolist()))
+            gone = [candidate_id for candidate_id in indexed if candidate_id not in stamps]
+            stale = [
+                candidate_id for candidate_id, stamp in stamps.items()
+                if indexed.get(candidate_id) != stamp
+            ]
+            if gone:
+                self.remove(gone)
+            if stale:
+                texts = load_texts(stale)
+                self.update((candidate_id, texts.get(candidate_id), stamps[candidate_id]) for candidate_id in stale)
+            return bool(gone or stale)
+
+    # ---------- Queries ----------
+    def query(self, candidate_id=None, text=None, limit=5):
+        """
+        Return (candidate_id, score) pairs for the indexed CVs closest to the
+        candidate's own row, or to text when the candidate is not indexed.
+        """
+        return self.query_many([candidate_id], {candidate_id: text}, limit)[candidate_id]
+
+    def query_many(self, candidate_ids, texts=None, limit=5):
+        """
+        Answer many probes at once: {candidate_id: [(candidate_id, score), ...]}.
+        Indexed candidates probe with their own rows (and are left out of
+        their own results); others are vectorised from texts. Rows are
+        L2-normalised, so multiplying the sparse matrix by the probes gives
+        the cosine similarities directly.
+        """
+        texts = texts or {}
+        candidate_ids = list(dict.fromkeys(candidate_ids))
+        with self.lock:
+            rows = [self.rows.get(candidate_id) for candidate_id in candidate_ids]
+            unindexed = [candidate_id for candidate_id, row in zip(candidate_ids, rows) if row is None]
+            vectors = sp.csr_matrix((0, self.matrix.shape[1]), dtype=np.float32)
+            if unindexed:
+                vectors = self.vectorize([texts.get(candidate_id) or '' for candidate_id in unindexed])
+            own = self.matrix[[row for row in rows if row is not None]]
+            matrix, ids = self.matrix, self.ids
+
+        probes = sp.vstack([own, vectors], format='csr')
+        ordered = [c for c, row in zip(candidate_ids, rows) if row is not None] + unindexed
+        own_rows = [row for row in rows if row is not None] + [None] * len(unindexed)
+
+        results = {}
+        for start in range(0, len(ordered), QUERY_CHUNK):
+            chunk = probes[start:start + QUERY_CHUNK]
+            if matrix.nnz > matrix.shape[1]:
+                # Sparse matrix times dense probe columns beats a sparse-sparse product once
+                # the matrix holds more entries than a dense probe has columns
+                scores = np.ascontiguousarray((matrix @ chunk.T.toarray()).T)
+            else:
+                scores = (chunk @ matrix.T).toarray()
+            for offset, row in enumerate(own_rows[start:start + QUERY_CHUNK]):
+                if row is not None:
+                    scores[offset, row] = -1
+            top = top_k(scores, limit)
+            for offset, columns in enumerate(top):
+                results[ordered[start + offset]] = [
+                    (int(ids[column]), float(scores[offset, column]))
+                    for column in columns if scores[offset, column] >= 0
+                ]
+        return results
+
+    # ---------- Persistence ----------
+    def save(self):
+        if not self.path:
+            return
+        with self.lock:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp_path = f'{self.path}.{os.getpid()}.tmp.npz'
+            np.savez(
+                temp_path,
+                data=self.counts.data, indices=self.counts.indices, indptr=self.counts.indptr,
+                shape=np.array(self.counts.shape), doc_freq=self.doc_freq, ids=self.ids, stamps=self.stamps
+            )
+            os.replace(temp_path, self.path)
+            self.loaded_mtime = os.path.getmtime(self.path)
+
+    def reload_if_changed(self):
+        """Pick up a newer copy saved by another worker process."""
+        if not self.path or not os.path.exists(self.path):
+            return False
+        mtime = os.path.getmtime(self.path)
+        if self.loaded_mtime is not None and mtime <= self.loaded_mtime:
+            return False
+        with self.lock, np.load(self.path) as saved:
+            self.counts = sp.csr_matrix(
+                (saved['data'], saved['indices'], saved['indptr']), shape=tuple(saved['shape'])
+            )
+            self.doc_freq = saved['doc_freq']
+            self.ids = saved['ids']
+            self.stamps = saved['stamps']
+            self._refit()
+            self.loaded_mtime = mtime
+        return True
+
+
+# Least recently used scopes are dropped past SIMILARITY_MAX_INDEXES; they reload from disk when asked for again
+_indexes = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def get_similarity_index(scope):
+    """Return the process-wide index for a scope ('global' or 'requisition-<id>'), loading it from disk."""
+    with _indexes_lock:
+        index = _indexes.get(scope)
+        if index is None:
+            config = current_app.config
+            index = SimilarityIndex(
+                path=os.path.join(config['SIMILARITY_INDEX_DIR'], f'{scope}.npz'),
+                n_features=config['SIMILARITY_N_FEATURES'],
+                refit_ratio=config['SIMILARITY_REFIT_RATIO']
+            )
+            index.reload_if_changed()
+            _indexes[scope] = index
+            while len(_indexes) > config['SIMILARITY_MAX_INDEXES']:
+                _indexes.popitem(last=False)
+        _indexes.move_to_end(scope)
+    return index
+
+
+def synced_index(scope, load_stamps, load_texts):
+    """
+    Return the index for scope after syncing it with the database, at most once
+    per SIMILARITY_SYNC_INTERVAL seconds. Changes are saved for other workers.
+    """
+    index = get_similarity_index(scope)
+    interval = current_app.config['SIMILARITY_SYNC_INTERVAL']
+    with index.lock:
+        now = time.monotonic()
+        if index.last_synced is not None and now - index.last_synced < interval:
+            return index
+        index.reload_if_changed()
+        if index.sync(load_stamps(), load_texts):
+            index.save()
+        index.last_synced = now
+    return index
@@ -0,0 +1,302 @@
+import threading
+import numpy as np
+from sqlalchemy import bindparam, event, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.extensions import db
+from app.models import Candidate, CandidateSkill, Requisition, Skill, SkillAlias
+from app.services.skill_matcher import get_skill_matcher, normalize_skill
+
+PENDING_KEY = 'pending_skills'
+
+# Set bits per byte value, for popcounts over packed bitsets
+POPCOUNT = np.array([bin(value).count('1') for value in range(256)], dtype=np.uint8)
+
+
+def bits_to_bytes(bits):
+    """Little-endian bytes of a bitset, as stored in Candidate.skill_bits."""
+    return bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+
+
+def bytes_to_bits(data):
+    return int.from_bytes(data, 'little') if data else 0
+
+
+def pack_bitsets(bitsets, width=None):
+    """Pack Python-int bitsets into a uint8 matrix, one row per bitset, width bytes per row."""
+    bitsets = list(bitsets)
+    if width is None:
+        width = max(((bits.bit_length() + 7) // 8 for bits in bitsets), default=0)
+    mask = (1 << (8 * width)) - 1
+    data = b''.join((bits & mask).to_bytes(width, 'little') for bits in bitsets)
+    return np.frombuffer(data, dtype=np.uint8).reshape(len(bitsets), width)
+
+
+def overlap_counts(packed, bits):
+    """popcount(row & bits) for every row of a packed bitset matrix."""
+    row = pack_bitsets([bits], packed.shape[1])[0]
+    return POPCOUNT[packed & row].sum(axis=1, dtype=np.int64)
+
+
+class SkillDictionary:
+    """
+    Maps skill names and synonyms to the integer ids of the skills table. The
+    id doubles as a bit position, so a set of skills is a single Python int
+    and two sets overlap by popcount(a & b). Lookups are served from memory;
+    names it has not seen are looked up in (and optionally added to) the
+    database, so ids stay consistent across worker processes.
+    """
+
+    def __init__(self):
+        self.ids = {}
+        self.names = {}
+        self.lock = threading.Lock()
+
+    def load(self):
+        rows = db.session.query(SkillAlias.alias, SkillAlias.skill_id, Skill.name).join(Skill).all()
+        with self.lock:
+            for alias, skill_id, name in rows:
+                self.ids[alias] = skill_id
+                self.names[skill_id] = name
+        return self
+
+    def resolve(self, names, create=False):
+        """Return {normalised name: skill id}; unknown names are added when create is set, otherwise left out."""
+        terms = {normalize_skill(name) for name in names if name}
+        terms.discard('')
+        with self.lock:
+            found = {term: self.ids[term] for term in terms if term in self.ids}
+        missing = terms - found.keys()
+        if missing:
+            found.update(self._fetch(missing))
+            missing -= found.keys()
+        if missing and create:
+            for term in missing:
+                found[term] = self._create(term)
+        return found
+
+    def skill_id(self, name, create=False):
+        return self.resolve([name], create).get(normalize_skill(name))
+
+    def bitset(self, names, create=False):
+        bits = 0
+        for skill_id in self.resolve(names, create).values():
+            bits |= 1 << skill_id
+        return bits
+
+    def skill_names(self, bits):
+        """Canonical names of the skills in a bitset."""
+        with self.lock:
+            return [self.names[skill_id] for skill_id in self.names if bits >> skill_id & 1]
+
+    def _fetch(self, terms):
+        rows = (
+            db.session.query(SkillAlias.alias, SkillAlias.skill_id, Skill.name)
+            .join(Skill)
+            .filter(SkillAlias.alias.in_(terms))
+            .all()
+        )
+        with self.lock:
+            for alias, skill_id, name in rows:
+                self.ids[alias] = skill_id
+                self.names[skill_id] = name
+        return {alias: skill_id for alias, skill_id, _ in rows}
+
+    def _create(self, term, category=None):
+        """Add a skill (mapped through the taxonomy to its canonical name) and an alias for term."""
+        matcher = get_skill_matcher()
+        name = matcher.canonicalize(term)
+        try:
+            with db.session.begin_nested():
+                skill = Skill.query.filter_by(name=name).first()
+                if skill is None:
+                    skill = Skill(name=name, category=category or matcher.categories.get(name))
+                    db.session.add(skill)
+                    db.session.flush()
+                for alias in {name, term}:
+                    if not SkillAlias.query.filter_by(alias=alias).first():
+                        db.session.add(SkillAlias(alias=alias, skill_id=skill.id))
+        except IntegrityError:
+            # Another worker added it (or its canonical skill) first
+            found = self._fetch({term})
+            return found[term] if term in found else self._create(term, category)
+
+        with self.lock:
+            self.ids[term] = self.ids[name] = skill.id
+            self.names[skill.id] = name
+        # Until the surrounding transaction commits, the new id may still be rolled back
+        db.session.info.setdefault(PENDING_KEY, []).append((skill.id, {term, name}))
+        return skill.id
+
+    def forget(self, entries):
+        """Drop cached skills whose creating transaction was rolled back."""
+        with self.lock:
+            for skill_id, terms in entries:
+                self.names.pop(skill_id, None)
+                for term in terms:
+                    if self.ids.get(term) == skill_id:
+                        del self.ids[term]
+
+    def seed_from_taxonomy(self):
+        """
+        Add every taxonomy skill with its synonyms, and move aliases the
+        taxonomy now maps to another skill (say 'github', once an alias of
+        git). Returns the number of new aliases.
+        """
+        matcher = get_skill_matcher()
+        known = dict(db.session.query(SkillAlias.alias, Skill.name).join(Skill))
+        added = 0
+        for term in sorted(set(matcher.canonical) | set(matcher.categories)):
+            if term not in known:
+                self._create(term)
+                added += 1
+            elif known[term] != matcher.canonicalize(term):
+                skill_id = self._create(matcher.canonicalize(term))
+                SkillAlias.query.filter_by(alias=term).update({'skill_id': skill_id})
+                with self.lock:
+                    self.ids[term] = skill_id
+        return added
+
+
+_dictionary = None
+_dictionary_lock = threading.Lock()
+
+
+@event.listens_for(Session, 'after_commit')
+def _skills_committed(session):
+    session.info.pop(PENDING_KEY, None)
+
+
+@event.listens_for(Session, 'after_transaction_end')
+def _skills_discarded(session, transaction):
+    if transaction.parent is None and PENDING_KEY in session.info:
+        entries = session.info.pop(PENDING_KEY)
+        if _dictionary is not None:
+            _dictionary.forget(entries)
+
+
+def get_skill_dictionary():
+    """Return the process-wide SkillDictionary, loading the table on first use."""
+    global _dictionary
+    if _dictionary is None:
+        with _dictionary_lock:
+            if _dictionary is None:
+                _dictionary = SkillDictionary().load()
+    return _dictionary
+
+
+def requisition_skill_names(required_skills, knockout_rules):
+    """Skill names a requisition scores on: its required skills and skill knockout rules."""
+    names = {skill['name'] for skill in required_skills or [] if skill.get('name')}
+    names.update(
+        str(rule['value']) for rule in knockout_rules or []
+        if rule.get('type') == 'skill' and rule.get('value') is not None
+    )
+    return names
+
+
+def register_requisition_skills(requisition):
+    """
+    Add a requisition's skills to the dictionary, so its scoring profile can
+    resolve them, and give candidates who already list a newly added skill
+    its bit. Call from the requisition write paths before committing;
+    scoring itself never writes to the dictionary.
+    """
+    dictionary = get_skill_dictionary()
+    names = requisition_skill_names(requisition.required_skills, requisition.knockout_rules)
+    known = dictionary.resolve(names)
+    added = dictionary.resolve(names, create=True).keys() - known.keys()
+    if added:
+        candidate_ids = {
+            candidate_id for (candidate_id,) in
+            db.session.query(CandidateSkill.candidate_id)
+            .filter(CandidateSkill.skill_id.is_(None), func.lower(CandidateSkill.skill).in_(added))
+            .distinct()
+        }
+        refresh_candidate_skill_bits(candidate_ids)
+
+
+def refresh_candidate_skill_bits(candidate_ids):
+    """
+    Resolve skill ids for the candidates' CandidateSkill rows and rewrite
+    their Candidate.skill_bits. Skills outside the taxonomy that no
+    requisition uses keep skill_id None. Call after changing a candidate's
+    skills; the caller commits.
+    """
+    candidate_ids = list(candidate_ids)
+    if not candidate_ids:
+        return
+    dictionary = get_skill_dictionary()
+    rows = (
+        db.session.query(CandidateSkill.id, CandidateSkill.candidate_id, CandidateSkill.skill, CandidateSkill.skill_id)
+        .filter(CandidateSkill.candidate_id.in_(candidate_ids))
+        .all()
+    )
+    # Free-text skills only get an id (and a bit) once the taxonomy or a
+    # requisition names them: until then they cannot match anything
+    names = [row.skill for row in rows if row.skill_id is None and row.skill]
+    ids = dictionary.resolve(names)
+    matcher = get_skill_matcher()
+    ids.update(dictionary.resolve([name for name in names if matcher.knows(name)], create=True))
+
+    skill_updates = []
+    bits = dict.fromkeys(candidate_ids, 0)
+    for row in rows:
+        skill_id = row.skill_id or ids.get(normalize_skill(row.skill))
+        if skill_id is None:
+            continue
+        if row.skill_id is None:
+            skill_updates.append({'b_id': row.id, 'b_skill_id': skill_id})
+        bits[row.candidate_id] |= 1 << skill_id
+
+    if skill_updates:
+        table = CandidateSkill.__table__
+        db.session.execute(
+            table.update().where(table.c.id == bindparam('b_id')).values(skill_id=bindparam('b_skill_id')),
+            skill_updates
+        )
+    _write_bits(bits)
+
+
+def _write_bits(bits):
+    table = Candidate.__table__
+    db.session.execute(
+        table.update()
+        .where(table.c.id == bindparam('b_id'))
+        # Deriving the bitset is bookkeeping, not an edit: keep updated_at as it is
+        .values(skill_bits=bindparam('b_bits'), updated_at=table.c.updated_at),
+        [{'b_id': candidate_id, 'b_bits': bits_to_bytes(value)} for candidate_id, value in bits.items()]
+    )
+
+
+def backfill_skill_bits(batch_size=1000, progress=None):
+    """
+    Migrate existing data to skill ids: seed the skills table from the
+    taxonomy and the requisitions' skills, then fill CandidateSkill.skill_id and Candidate.skill_bits for
+    every candidate, batch_size candidates per commit. Safe to re-run.
+    Returns the number of candidates processed.
+    """
+    dictionary = get_skill_dictionary()
+    dictionary.seed_from_taxonomy()
+    names = set()
+    for required_skills, knockout_rules in db.session.query(Requisition.required_skills, Requisition.knockout_rules):
+        names.update(requisition_skill_names(required_skills, knockout_rules))
+    dictionary.resolve(names, create=True)
+    db.session.commit()
+
+    done = 0
+    last_id = 0
+    while True:
+        candidate_ids = [
+            candidate_id for (candidate_id,) in
+            db.session.query(Candidate.id).filter(Candidate.id > last_id).order_by(Candidate.id).limit(batch_size)
+        ]
+        if not candidate_ids:
+            break
+        refresh_candidate_skill_bits(candidate_ids)
+        db.session.commit()
+        done += len(candidate_ids)
+        last_id = candidate_ids[-1]
+        if progress:
+            progress(done)
+    return done
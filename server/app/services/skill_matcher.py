@@ -0,0 +1,116 @@
+import hashlib
+import json
+import os
+import re
+import threading
+
+DEFAULT_TAXONOMY_PATH = os.getenv(
+    'SKILL_TAXONOMY_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'skills_taxonomy.json')
+)
+
+# A skill only counts when it is not glued to other word characters, so 'go'
+# doesn't match inside 'good' and 'ai' doesn't match inside 'maintain'.
+# '.', '+' and '#' are part of names like node.js, c++ and c#.
+_BEFORE = r'(?<![\w.+#])'
+_AFTER = r'(?![\w+#]|\.\w)'
+# Ambiguous terms ('go', 'ai', 'ml') are ordinary words too, so they only count
+# as a whole item of a list: 'Skills: Python, Go' or a '- Go' bullet line.
+_LIST_BEFORE = r'(?:^|[,;|/:(\u2022])[ \t]*(?:[-*\u2022\u00b7][ \t]+)?'
+_LIST_AFTER = r'[ \t]*(?=$|[,;|/)\u2022])'
+
+
+def normalize_skill(term):
+    return ' '.join(term.lower().split())
+
+
+def _escape(char):
+    return r'\s+' if char == ' ' else re.escape(char)
+
+
+def _trie_pattern(node):
+    terminal = '' in node
+    alternatives = [_escape(char) + _trie_pattern(node[char]) for char in sorted(node) if char]
+    if not alternatives:
+        return ''
+    if len(alternatives) == 1 and not terminal:
+        return alternatives[0]
+    group = '(?:' + '|'.join(alternatives) + ')'
+    return group + '?' if terminal else group
+
+
+class SkillMatcher:
+    """
+    Finds every taxonomy skill in a text in a single pass. All names and synonyms
+    are compiled into one prefix-factored regex, and each match is mapped back to
+    its canonical skill name. Terms an entry lists as ambiguous still
+    canonicalize, but only match as a list item (see _LIST_BEFORE).
+    """
+
+    def __init__(self, taxonomy):
+        self.canonical = {}
+        self.categories = {}
+        trie = {}
+        ambiguous_trie = {}
+
+        for entry in taxonomy.get('skills', []):
+            name = normalize_skill(entry['name'])
+            self.categories[name] = entry.get('category')
+            ambiguous = {normalize_skill(term) for term in entry.get('ambiguous', [])}
+            for term in [entry['name']] + entry.get('synonyms', []) + entry.get('ambiguous', []):
+                term = normalize_skill(term)
+                if not term:
+                    continue
+                self.canonical.setdefault(term, name)
+                node = ambiguous_trie if term in ambiguous else trie
+                for char in term:
+                    node = node.setdefault(char, {})
+                node[''] = True
+
+        self.pattern = re.compile(_BEFORE + _trie_pattern(trie) + _AFTER) if trie else None
+        self.list_pattern = re.compile(
+            _LIST_BEFORE + '(' + _trie_pattern(ambiguous_trie) + ')' + _LIST_AFTER, re.MULTILINE
+        ) if ambiguous_trie else None
+        self.version = hashlib.sha1(json.dumps(taxonomy, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, 'r', encoding='utf-8') as file:
+            return cls(json.load(file))
+
+    def find_skills(self, text_lower):
+        """Return the canonical skills mentioned in text_lower, which must already be lowercased."""
+        skills = set()
+        if self.pattern is not None:
+            skills.update(self.canonical[normalize_skill(match.group())] for match in self.pattern.finditer(text_lower))
+        if self.list_pattern is not None:
+            skills.update(
+                self.canonical[normalize_skill(match.group(1))] for match in self.list_pattern.finditer(text_lower)
+            )
+        return skills
+
+    def knows(self, skill):
+        """Whether skill is a taxonomy skill or one of its synonyms."""
+        return normalize_skill(skill) in self.canonical
+
+    def canonicalize(self, skill):
+        """Map a skill name or synonym to its canonical name; unknown skills are returned normalised."""
+        term = normalize_skill(skill)
+        return self.canonical.get(term, term)
+
+
+_matchers = {}
+_matchers_lock = threading.Lock()
+
+
+def get_skill_matcher(path=None):
+    """Return the process-wide SkillMatcher for a taxonomy file, compiling it on first use."""
+    path = path or DEFAULT_TAXONOMY_PATH
+    matcher = _matchers.get(path)
+    if matcher is None:
+        with _matchers_lock:
+            matcher = _matchers.get(path)
+            if matcher is None:
+                matcher = SkillMatcher.from_file(path)
+                _matchers[path] = matcher
+    return matcher
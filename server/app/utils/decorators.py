@@ -1,8 +1,18 @@
 from functools import wraps
-from flask import jsonify
+from flask import current_app, g, has_app_context, jsonify
 from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from app.models import User
 
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    if has_app_context() and g.get('query_count') is not None:
+        g.query_count += 1
+
 def role_required(*roles):
     def decorator(f):
         @wraps(f)
@@ -24,4 +34,28 @@ def recruiter_required(f):
     return role_required('recruiter', 'admin')(f)
 
 def hiring_manager_required(f):
-    return role_required('hiring_manager', 'admin')(f)
\ No newline at end of file
+    return role_required('hiring_manager', 'admin')(f)
+
+def query_budget(limit):
+    """
+    Cap the SQL statements an endpoint may issue, however large the page, to
+    catch N+1 regressions. Over budget it raises QueryBudgetExceeded when
+    QUERY_BUDGET_STRICT is set (tests, CI) and logs a warning otherwise.
+    Put it directly under @app.route so authentication queries count too.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            g.query_count = 0
+            try:
+                response = f(*args, **kwargs)
+            finally:
+                count = g.pop('query_count')
+            if count > limit:
+                message = f'{f.__name__} issued {count} queries (budget {limit})'
+                if current_app.config.get('QUERY_BUDGET_STRICT'):
+                    raise QueryBudgetExceeded(message)
+                current_app.logger.warning(message)
+            return response
+        return decorated_function
+    return decorator
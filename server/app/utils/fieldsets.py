@@ -0,0 +1,31 @@
+from flask import request
+from sqlalchemy.orm import load_only
+
+
+class InvalidFields(ValueError):
+    pass
+
+
+def requested_fields(model, param='fields', default=None):
+    """
+    Attributes named in ?fields=a,b (checked against model.FIELDS, id always
+    included), or default when the client names none (None: everything).
+    """
+    value = request.args.get(param, '')
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    if not names:
+        return default
+    unknown = sorted(set(names) - set(model.FIELDS))
+    if unknown:
+        raise InvalidFields(f"Unknown {param}: {', '.join(unknown)}")
+    return tuple(dict.fromkeys(['id'] + names))
+
+
+def field_columns(model, fields, *extra):
+    """The columns behind fields (all of model.FIELDS for None) plus extra, for load_only."""
+    return [getattr(model, name) for name in fields or model.FIELDS] + list(extra)
+
+
+def load_fields(model, fields, *extra):
+    """Loader option selecting only what to_dict(fields) reads, leaving deferred columns like cv_text unloaded."""
+    return load_only(*field_columns(model, fields, *extra))
@@ -1,8 +1,9 @@
 import re
 from datetime import datetime, timedelta
-from flask import request
 from app import db
 from app.models import AssessmentPack, Requisition
+from app.services.skill_dictionary import register_requisition_skills
+from app.utils.pagination import paginate
 
 # ---------- Existing helpers ----------
 
@@ -21,16 +22,9 @@ def format_date(date_string, format='%Y-%m-%d'):
         return None
 
 def paginate_query(query, model):
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 10, type=int)
-    paginated = query.paginate(page=page, per_page=per_page, error_out=False)
-    return {
-        'items': [item.to_dict() for item in paginated.items],
-        'total': paginated.total,
-        'pages': paginated.pages,
-        'current_page': page,
-        'per_page': per_page
-    }
+    result = paginate(query, [(model.id, False)])
+    result['items'] = [item.to_dict() for item in result['items']]
+    return result
 
 def generate_time_slots(start_time, end_time, duration_minutes):
     slots = []
@@ -132,5 +126,6 @@ def create_requisition_helper(
         assessment_pack_id=assessment_pack.id
     )
     db.session.add(requisition)
+    register_requisition_skills(requisition)
     db.session.commit()
     return requisition
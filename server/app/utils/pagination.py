@@ -0,0 +1,213 @@
+import base64
+import binascii
+import hashlib
+import json
+import logging
+import math
+from datetime import datetime
+from flask import current_app, request
+from redis.exceptions import RedisError
+from sqlalchemy import and_, false, inspect, or_, tuple_
+from app.extensions import db, redis_client
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 100
+TOTAL_MODES = ('exact', 'estimate', 'cached')
+COUNT_KEY = 'row_count:{}'
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+# ---------- Cursors ----------
+def _dump(value):
+    return {'dt': value.isoformat()} if isinstance(value, datetime) else value
+
+
+def _load(value):
+    return datetime.fromisoformat(value['dt']) if isinstance(value, dict) else value
+
+
+def encode_cursor(values):
+    """Opaque token for the sort-key values of the last row on a page."""
+    payload = json.dumps([_dump(value) for value in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token, size):
+    try:
+        payload = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        values = [_load(value) for value in json.loads(payload)]
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise InvalidCursor('Invalid cursor')
+    if len(values) != size:
+        raise InvalidCursor('Invalid cursor')
+    return values
+
+
+# ---------- Sort keys ----------
+def _nullable(expression):
+    return getattr(getattr(expression, 'expression', expression), 'nullable', True)
+
+
+def order_clauses(keys):
+    """ORDER BY for (expression, descending) keys; nullable keys sort NULLs last on every database."""
+    clauses = []
+    for expression, descending in keys:
+        clause = expression.desc() if descending else expression.asc()
+        clauses.append(clause.nullslast() if _nullable(expression) else clause)
+    return clauses
+
+
+def after_clause(keys, values):
+    """WHERE clause for the rows that come after values in the keys' order."""
+    directions = {descending for _, descending in keys}
+    if len(directions) == 1 and not any(_nullable(expression) for expression, _ in keys):
+        # One direction and no NULLs: a row-value comparison the index can range-scan
+        row = tuple_(*[expression for expression, _ in keys])
+        return row < tuple_(*values) if directions.pop() else row > tuple_(*values)
+
+    clauses = []
+    equal = []
+    for (expression, descending), value in zip(keys, values):
+        if value is None:
+            # NULLs sort last, so only the later keys can move past a NULL
+            equal.append(expression.is_(None))
+            continue
+        after = expression < value if descending else expression > value
+        if _nullable(expression):
+            after = or_(after, expression.is_(None))
+        clauses.append(and_(*equal, after))
+        equal.append(expression == value)
+    return or_(*clauses) if clauses else false()
+
+
+def keyset_page(query, keys, limit, values=None):
+    """
+    Up to limit rows of a single-entity query after the sort-key values of
+    a previous page. Returns (items, next values, or None on the last page).
+    """
+    if values is not None:
+        query = query.filter(after_clause(keys, values))
+    rows = (
+        query.add_columns(*[expression.label(f'sort_key_{i}') for i, (expression, _) in enumerate(keys)])
+        .order_by(*order_clauses(keys))
+        .limit(limit + 1)
+        .all()
+    )
+    next_values = list(rows[limit - 1][1:]) if len(rows) > limit else None
+    return [row[0] for row in rows[:limit]], next_values
+
+
+# ---------- Totals ----------
+def _countable(query):
+    """The query narrowed to its primary key, so COUNT(*) does not drag wide columns like cv_text along."""
+    entity = query.column_descriptions[0]['entity']
+    return query.with_entities(*inspect(entity).primary_key).order_by(None)
+
+
+def _estimate_count(query):
+    """Row estimate from the PostgreSQL planner; exact count elsewhere."""
+    if db.engine.dialect.name != 'postgresql':
+        return query.count()
+    compiled = query.statement.compile(dialect=db.engine.dialect)
+    plan = db.session.connection().exec_driver_sql(f'EXPLAIN (FORMAT JSON) {compiled}', compiled.params).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def _cached_count(query):
+    compiled = query.statement.compile(dialect=db.engine.dialect)
+    digest = hashlib.sha1(f'{compiled}|{sorted(compiled.params.items())}'.encode('utf-8')).hexdigest()
+    key = COUNT_KEY.format(digest)
+    try:
+        cached = redis_client.get(key)
+        if cached is not None:
+            return int(cached)
+    except RedisError:
+        logging.warning('Row count cache unavailable', exc_info=True)
+        return query.count()
+
+    total = query.count()
+    try:
+        redis_client.setex(key, current_app.config['PAGINATION_COUNT_TTL'], total)
+    except RedisError:
+        logging.warning('Row count cache store failed', exc_info=True)
+    return total
+
+
+def count_rows(query, mode):
+    """Total rows for a query: 'exact' (COUNT(*)), 'estimate' (planner statistics) or 'cached' (COUNT(*) kept in Redis)."""
+    query = _countable(query)
+    if mode == 'estimate':
+        return _estimate_count(query)
+    if mode == 'cached':
+        return _cached_count(query)
+    return query.count()
+
+
+def page_count(total, per_page):
+    return math.ceil(total / per_page) if per_page else 0
+
+
+# ---------- Request handling ----------
+def pagination_args(keys_count):
+    """
+    Read paging parameters. Requests with cursor or limit (and no page or
+    per_page) use keyset paging; anything else keeps the page/per_page
+    contract. Raises InvalidCursor for bad input.
+    """
+    args = request.args
+    total = args.get('total') or None
+    if total is not None and total not in TOTAL_MODES:
+        raise InvalidCursor(f"total must be one of {', '.join(TOTAL_MODES)}")
+
+    if ('cursor' in args or 'limit' in args) and not ('page' in args or 'per_page' in args):
+        limit = max(1, min(args.get('limit', DEFAULT_LIMIT, type=int), MAX_LIMIT))
+        cursor = args.get('cursor')
+        return {
+            'keyset': True,
+            'limit': limit,
+            'after': decode_cursor(cursor, keys_count) if cursor else None,
+            'total': total
+        }
+    return {
+        'keyset': False,
+        'page': args.get('page', 1, type=int),
+        'per_page': args.get('per_page', 10, type=int),
+        'total': total or 'exact'
+    }
+
+
+def paginate(query, keys):
+    """
+    Page a single-entity query ordered by keys ((expression, descending)
+    pairs ending with a unique column). Returns a dict with the page's
+    'items' plus either next_cursor/limit (and total/total_type when asked
+    for) or the classic total/pages/current_page/per_page.
+    """
+    params = pagination_args(len(keys))
+    if params['keyset']:
+        items, next_values = keyset_page(query, keys, params['limit'], params['after'])
+        result = {
+            'items': items,
+            'next_cursor': encode_cursor(next_values) if next_values is not None else None,
+            'limit': params['limit']
+        }
+        if params['total']:
+            result['total'] = count_rows(query, params['total'])
+            result['total_type'] = params['total']
+        return result
+
+    page, per_page = params['page'], params['per_page']
+    paginated = query.order_by(*order_clauses(keys)).paginate(page=page, per_page=per_page, error_out=False, count=False)
+    total = count_rows(query, params['total'])
+    return {
+        'items': paginated.items,
+        'total': total,
+        'pages': page_count(total, per_page),
+        'current_page': page,
+        'per_page': per_page
+    }
@@ -0,0 +1,61 @@
+"""
+Recall and latency of the IVF candidate index against exact search, on
+synthetic CVs embedded the same way the app embeds real ones.
+
+    python -m benchmarks.ann_recall --docs 10000 100000 --nprobe 1 4 8 16 32
+"""
+import argparse
+import tempfile
+import time
+import numpy as np
+from app.services.ann_index import ANNIndex
+from benchmarks.corpus import make_cv
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--docs', type=int, nargs='+', default=[10000, 50000])
+    arg_parser.add_argument('--queries', type=int, default=200)
+    arg_parser.add_argument('--k', type=int, default=10)
+    arg_parser.add_argument('--nprobe', type=int, nargs='+', default=[1, 4, 8, 16, 32])
+    arg_parser.add_argument('--dim', type=int, default=256)
+    args = arg_parser.parse_args()
+
+    for count in args.docs:
+        with tempfile.TemporaryDirectory() as path:
+            index = ANNIndex(path, dim=args.dim, background_train=False)
+            started = time.perf_counter()
+            vectors = index.embedder.embed(['\n'.join(make_cv(seed, 30)[0]) for seed in range(count)])
+            embed_s = time.perf_counter() - started
+
+            started = time.perf_counter()
+            index.insert_vectors(np.arange(count), vectors)
+            index.train()
+            build_s = time.perf_counter() - started
+            nlist = index._refresh()['meta']['nlist']
+            print(f'\n{count} docs: embed {embed_s:.1f}s, insert + train {build_s:.1f}s, {nlist} lists')
+
+            rng = np.random.default_rng(0)
+            probes = rng.choice(count, min(args.queries, count), replace=False)
+
+            def run(nprobe):
+                results = []
+                started = time.perf_counter()
+                for candidate_id in probes:
+                    results.append({
+                        similar_id for similar_id, _ in
+                        index.search(vectors[candidate_id], args.k, nprobe, exclude=int(candidate_id))
+                    })
+                return results, (time.perf_counter() - started) * 1000 / len(probes)
+
+            exact, exact_ms = run(0)
+            print(f"{'nprobe':>8} {'recall@' + str(args.k):>10} {'ms/query':>10} {'speedup':>8}")
+            print(f"{'exact':>8} {1:>10.3f} {exact_ms:>10.2f} {1:>7.1f}x")
+            for nprobe in args.nprobe:
+                found, ms = run(nprobe)
+                recall = np.mean([len(a & e) / len(e) for a, e in zip(found, exact) if e])
+                print(f'{nprobe:>8} {recall:>10.3f} {ms:>10.2f} {exact_ms / ms:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
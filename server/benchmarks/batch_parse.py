@@ -0,0 +1,54 @@
+"""
+CV parsing throughput one document at a time (parse_cv, as the upload
+endpoint does) versus batched through nlp.pipe (parse_many, as batch
+ingestion does) on the synthetic corpus texts, per corpus size. Also checks
+both give the same parse results.
+
+    python -m benchmarks.batch_parse --per-size 40 --batch-size 8 32 128
+"""
+import argparse
+import os
+import time
+from benchmarks.corpus import SIZES, make_cv
+from app.services.cv_parser import get_cv_parser, DEFAULT_SPACY_MODEL
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--model', default=os.getenv('SPACY_MODEL', DEFAULT_SPACY_MODEL))
+    arg_parser.add_argument('--profile', default=os.getenv('SPACY_PIPELINE_PROFILE', 'full'))
+    arg_parser.add_argument('--per-size', type=int, default=40, help='CVs per corpus size')
+    arg_parser.add_argument('--batch-size', type=int, nargs='+', default=[8, 32, 128])
+    arg_parser.add_argument('--n-process', type=int, default=1)
+    args = arg_parser.parse_args()
+
+    parser = get_cv_parser(args.model, args.profile)
+    parser.parse_cv('\n'.join(make_cv(0, 30)[0]))  # warm-up
+
+    print(f"{'size':<8} {'chars':>7} {'mode':<22} {'docs/s':>8} {'speedup':>8}")
+    seed = 0
+    for size, lines in SIZES.items():
+        texts = []
+        for _ in range(args.per_size):
+            texts.append('\n'.join(make_cv(seed, lines)[0]))
+            seed += 1
+        chars = sum(map(len, texts)) // len(texts)
+
+        start = time.perf_counter()
+        expected = [parser.parse_cv(text) for text in texts]
+        single_s = time.perf_counter() - start
+        print(f"{size:<8} {chars:>7} {'parse_cv per CV':<22} {len(texts) / single_s:>8.1f} {1:>8.2f}")
+
+        for batch_size in args.batch_size:
+            start = time.perf_counter()
+            parsed = [
+                parsed_data for parsed_data, _ in
+                parser.parse_many(((text, None) for text in texts), batch_size=batch_size, n_process=args.n_process)
+            ]
+            batch_s = time.perf_counter() - start
+            assert parsed == expected, 'parse_many results differ from parse_cv'
+            print(f"{size:<8} {chars:>7} {f'parse_many batch {batch_size}':<22} {len(texts) / batch_s:>8.1f} "
+                  f"{single_s / batch_s:>8.2f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+Candidate search on PostgreSQL: the old four-column ILIKE scan against the
+tsvector + trigram search, ranking every match and ranking only the newest
+--rank-limit matches (CANDIDATE_SEARCH_RANK_LIMIT), on a generated
+candidates table.
+
+    DATABASE_URL=postgresql://... python -m benchmarks.candidate_search --rows 1000000
+
+Rows are generated server-side with generate_series into the candidates
+table of that database (use a scratch database). --keep skips regenerating
+when the table already holds --rows rows.
+"""
+import argparse
+import os
+import statistics
+import time
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.orm import Session
+from app.models import Candidate
+from app.services import candidate_search
+from app.services.candidate_search import install_candidate_search, search_candidates
+from app.utils.pagination import order_clauses
+
+GENERATE_SQL = """
+INSERT INTO candidates (first_name, last_name, email, current_company, current_title, summary, cv_text,
+                        consent_given, created_at, updated_at)
+SELECT
+    (ARRAY['John','Thandiwe','Maria','Sipho','Emily','Ahmed','Lerato','David','Priya','Johan'])[1 + i % 10],
+    (ARRAY['Smith','Nkosi','Garcia','Dlamini','Johnson','Khan','Mokoena','Merwe','Patel','Brown'])[1 + (i / 10) % 10]
+        || (i % 997)::text,
+    'user' || i || '@example.com',
+    (ARRAY['Acme Corp','Globex','Initech','Umbrella Holdings','Stark Industries','Wayne Enterprises'])[1 + i % 6],
+    (ARRAY['software engineer','data analyst','project manager','devops engineer','team lead'])[1 + i % 5],
+    'Experienced professional with ' || (i % 15) || ' years in '
+        || (ARRAY['python','java','sql','kubernetes','accounting','nursing','marketing'])[1 + i % 7],
+    repeat('Worked on ' || (ARRAY['payments','logistics','analytics','healthcare','retail'])[1 + i % 5]
+        || ' platforms using ' || (ARRAY['python','java','go','react','excel'])[1 + (i / 7) % 5] || '. ', 20),
+    false, now(), now()
+FROM generate_series(1, :rows) AS i
+"""
+
+# Common and rare words, prefixes, a partial email and name typos (the trigram half)
+TERMS = [
+    'smith', 'Jane Smi', 'user4242', 'globex', 'kubernetes', 'nkosi12', 'healthcare python', 'devops',
+    'user4242@exa', 'Jhon Smith42', 'Thandiwe Nkos'
+]
+
+
+def legacy_search(query, term):
+    return query.filter(
+        (Candidate.first_name.ilike(f'%{term}%')) |
+        (Candidate.last_name.ilike(f'%{term}%')) |
+        (Candidate.email.ilike(f'%{term}%')) |
+        (Candidate.current_company.ilike(f'%{term}%'))
+    )
+
+
+def ranked_search(rank_limit):
+    def build(query, term):
+        query, keys = search_candidates(query, term, rank_limit)
+        return query.order_by(*order_clauses(keys))
+    return build
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--database-url', default=os.getenv('DATABASE_URL'))
+    arg_parser.add_argument('--rows', type=int, default=1000000)
+    arg_parser.add_argument('--limit', type=int, default=10)
+    arg_parser.add_argument('--repeat', type=int, default=5)
+    arg_parser.add_argument('--rank-limit', type=int, default=1000)
+    arg_parser.add_argument('--keep', action='store_true')
+    args = arg_parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    if engine.dialect.name != 'postgresql':
+        raise SystemExit('The search benchmark needs a PostgreSQL DATABASE_URL')
+    Candidate.__table__.create(engine, checkfirst=True)
+
+    with engine.begin() as connection:
+        count = connection.execute(select(func.count()).select_from(Candidate.__table__)).scalar()
+        if not (args.keep and count >= args.rows):
+            started = time.perf_counter()
+            connection.exec_driver_sql('TRUNCATE candidates RESTART IDENTITY CASCADE')
+            connection.execute(text(GENERATE_SQL), {'rows': args.rows})
+            print(f'Generated {args.rows} candidates in {time.perf_counter() - started:.1f}s')
+    started = time.perf_counter()
+    install_candidate_search(engine)
+    with engine.begin() as connection:
+        connection.exec_driver_sql('ANALYZE candidates')
+        print(f'Search column and indexes ready in {time.perf_counter() - started:.1f}s')
+
+    # search_candidates looks the column up through the Flask-SQLAlchemy engine; this script has its own
+    candidate_search.search_enabled = lambda: True
+
+    searches = (('legacy', legacy_search), ('all', ranked_search(0)), ('capped', ranked_search(args.rank_limit)))
+    print(f"{'term':>20} {'ILIKE ms':>10} {'rank all ms':>12} {'capped ms':>10} {'hits':>8}")
+    with Session(engine) as session:
+        for term in TERMS:
+            timings = {}
+            for name, build in searches:
+                query = build(session.query(Candidate.id), term).limit(args.limit)
+                samples = []
+                for _ in range(args.repeat):
+                    started = time.perf_counter()
+                    query.all()
+                    samples.append((time.perf_counter() - started) * 1000)
+                timings[name] = statistics.median(samples)
+            hits = search_candidates(session.query(Candidate.id), term, 0)[0].count()
+            print(f"{term:>20} {timings['legacy']:>10.1f} {timings['all']:>12.1f} {timings['capped']:>10.1f} {hits:>8}")
+
+if __name__ == '__main__':
+    main()
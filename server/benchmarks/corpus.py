@@ -0,0 +1,163 @@
+"""
+Synthetic, labelled CV corpus for the parser benchmarks. Every CV is written as
+PDF, DOCX and TXT in several sizes, next to a labels.json holding the expected
+name, email, phone and skills.
+
+    python -m benchmarks.corpus --out benchmarks/corpus
+"""
+import argparse
+import json
+import os
+import random
+import docx
+from app.services.skill_matcher import get_skill_matcher
+
+SIZES = {
+    'small': 30,
+    'medium': 200,
+    'large': 2000
+}
+FORMATS = ('txt', 'docx', 'pdf')
+
+FIRST_NAMES = ['John', 'Thandiwe', 'Maria', 'Sipho', 'Emily', 'Ahmed', 'Lerato', 'David', 'Priya', 'Johan']
+LAST_NAMES = ['Smith', 'Nkosi', 'Garcia', 'Dlamini', 'Johnson', 'Khan', 'Mokoena', 'van der Merwe', 'Patel', 'Brown']
+COMPANIES = ['Acme Corp', 'Globex', 'Initech', 'Umbrella Holdings', 'Stark Industries', 'Wayne Enterprises']
+FILLER = [
+    'I worked as a {title} at {company} for {years} years.',
+    'Held the position of {title} with {years}+ years of experience.',
+    'Bachelor of Science in Computer Science from the University of Cape Town.',
+    'Completed a diploma in public administration at the Institute of Technology.',
+    'Responsible for onboarding junior colleagues and running weekly planning sessions.',
+    'Improved reporting turnaround by automating manual spreadsheet processes.',
+    'Volunteers at the local library and enjoys long-distance running.',
+    'Presented quarterly results to senior stakeholders and the executive team.'
+]
+TITLES = ['software engineer', 'data analyst', 'project manager', 'devops engineer', 'team lead']
+PHONE_FORMATS = ['{a}-{b}-{c}', '({a}) {b}-{c}', '+1 {a} {b} {c}', '{a}.{b}.{c}']
+
+
+def _skill_terms():
+    """(term as written in the CV, canonical skill) pairs taken from the taxonomy."""
+    matcher = get_skill_matcher()
+    return sorted(matcher.canonical.items())
+
+
+def make_cv(seed, lines):
+    rng = random.Random(seed)
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    email = f'{first}.{last}{seed}'.lower().replace(' ', '') + '@example.com'
+    phone = rng.choice(PHONE_FORMATS).format(
+        a=rng.randint(200, 999), b=rng.randint(200, 999), c=rng.randint(1000, 9999)
+    )
+    terms = rng.sample(_skill_terms(), 6)
+
+    body = [
+        f'{first} {last}',
+        f'Email: {email}',
+        f'Phone: {phone}',
+        'Skills: ' + ', '.join(term for term, _ in terms),
+        ''
+    ]
+    while len(body) < lines:
+        body.append(rng.choice(FILLER).format(
+            title=rng.choice(TITLES), company=rng.choice(COMPANIES), years=rng.randint(1, 15)
+        ))
+
+    labels = {
+        'name': f'{first} {last}',
+        'email': email,
+        'phone': phone,
+        'skills': sorted({canonical for _, canonical in terms})
+    }
+    return body, labels
+
+
+def write_txt(path, lines):
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write('\n'.join(lines) + '\n')
+
+
+def write_docx(path, lines):
+    document = docx.Document()
+    for line in lines:
+        document.add_paragraph(line)
+    document.save(path)
+
+
+def _pdf_escape(line):
+    return line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def write_pdf(path, lines, lines_per_page=60):
+    """Minimal text-only PDF writer (Helvetica, one line per text row)."""
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+    font_id = 3 + 2 * len(pages)
+    objects = [
+        '<< /Type /Catalog /Pages 2 0 R >>',
+        '<< /Type /Pages /Kids [{}] /Count {} >>'.format(
+            ' '.join(f'{3 + 2 * i} 0 R' for i in range(len(pages))), len(pages)
+        )
+    ]
+    for i, page_lines in enumerate(pages):
+        content = 'BT /F1 10 Tf 40 800 Td 12 TL ' + ' '.join(
+            f"({_pdf_escape(line)}) '" for line in page_lines
+        ) + ' ET'
+        objects.append(
+            f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] '
+            f'/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {4 + 2 * i} 0 R >>'
+        )
+        objects.append(f'<< /Length {len(content)} >>\nstream\n{content}\nendstream')
+    objects.append('<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>')
+
+    output = '%PDF-1.4\n'
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(output.encode('latin-1')))
+        output += f'{number} 0 obj\n{obj}\nendobj\n'
+    xref = len(output.encode('latin-1'))
+    output += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'
+    output += ''.join(f'{offset:010d} 00000 n \n' for offset in offsets)
+    output += f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n'
+
+    with open(path, 'wb') as file:
+        file.write(output.encode('latin-1'))
+
+
+WRITERS = {'txt': write_txt, 'docx': write_docx, 'pdf': write_pdf}
+
+
+def generate(out_dir, per_size=5):
+    """Write the corpus to out_dir and return its labels, keyed by file name."""
+    os.makedirs(out_dir, exist_ok=True)
+    labels = {}
+    seed = 0
+    for size, lines in SIZES.items():
+        for _ in range(per_size):
+            body, cv_labels = make_cv(seed, lines)
+            for file_format in FORMATS:
+                filename = f'cv_{size}_{seed:03d}.{file_format}'
+                WRITERS[file_format](os.path.join(out_dir, filename), body)
+                labels[filename] = dict(cv_labels, size=size, format=file_format)
+            seed += 1
+
+    with open(os.path.join(out_dir, 'labels.json'), 'w', encoding='utf-8') as file:
+        json.dump(labels, file, indent=2, sort_keys=True)
+    return labels
+
+
+def load(out_dir):
+    with open(os.path.join(out_dir, 'labels.json'), encoding='utf-8') as file:
+        return json.load(file)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--out', default=os.path.join(os.path.dirname(__file__), 'corpus'))
+    arg_parser.add_argument('--per-size', type=int, default=5)
+    args = arg_parser.parse_args()
+    labels = generate(args.out, args.per_size)
+    print(f'Wrote {len(labels)} CVs to {args.out}')
+
+
+if __name__ == '__main__':
+    main()
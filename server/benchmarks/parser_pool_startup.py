@@ -0,0 +1,69 @@
+"""
+First-upload latency and memory of the CV parser pool, built lazily inside
+the first request versus warmed at app start (CV_PARSER_WARM_ON_START). Every
+worker count runs in a fresh process so nothing is loaded beforehand.
+
+    python -m benchmarks.parser_pool_startup --workers 0 2 --cvs 20
+"""
+import argparse
+import multiprocessing
+import os
+import time
+from benchmarks.corpus import make_cv
+from app.services.cv_parser import DEFAULT_SPACY_MODEL
+from app.services.cv_parser_pool import CVParserPool, current_rss_kb
+
+
+def run_pool(model_name, profile, workers, cvs, results):
+    documents = ['\n'.join(make_cv(seed, 40)[0]).encode('utf-8') for seed in range(cvs + 1)]
+    base_rss = current_rss_kb()
+
+    # What the first request used to pay: building the pool, then its own parse
+    start = time.perf_counter()
+    pool = CVParserPool(workers=workers, parser_options={'model_name': model_name, 'profile': profile})
+    build_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    pool.parse_bytes(documents[0], 'txt')
+    first_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    for document in documents[1:]:
+        pool.parse_bytes(document, 'txt')
+    steady_ms = (time.perf_counter() - start) / cvs * 1000
+
+    worker_rss = [worker['rss_kb'] for worker in pool.stats()['workers']]
+    results.put({
+        'build_ms': build_ms,
+        'first_ms': first_ms,
+        'steady_ms': steady_ms,
+        'main_rss_mb': (current_rss_kb() - base_rss) / 1024,
+        'worker_rss_mb': max(worker_rss) / 1024 if workers else 0.0
+    })
+    pool.shutdown()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--model', default=os.getenv('SPACY_MODEL', DEFAULT_SPACY_MODEL))
+    arg_parser.add_argument('--profile', default=os.getenv('SPACY_PIPELINE_PROFILE', 'full'))
+    arg_parser.add_argument('--workers', type=int, nargs='+', default=[0, 2])
+    arg_parser.add_argument('--cvs', type=int, default=20)
+    args = arg_parser.parse_args()
+
+    context = multiprocessing.get_context('spawn')
+    print(f"{'workers':>7} {'lazy 1st ms':>12} {'warm 1st ms':>12} {'warm-up ms':>11} {'ms/CV':>7} "
+          f"{'main +MB':>9} {'worker MB':>10}")
+    for workers in args.workers:
+        results = context.Queue()
+        process = context.Process(target=run_pool, args=(args.model, args.profile, workers, args.cvs, results))
+        process.start()
+        result = results.get()
+        process.join()
+        print(f"{workers:>7} {result['build_ms'] + result['first_ms']:>12.0f} {result['first_ms']:>12.0f} "
+              f"{result['build_ms']:>11.0f} {result['steady_ms']:>7.1f} {result['main_rss_mb']:>9.1f} "
+              f"{result['worker_rss_mb']:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+"""
+CV parser benchmark and regression harness. Times text extraction, parse_cv and
+each extractor on the synthetic corpus, reports throughput, peak memory and
+accuracy against the corpus labels, and compares the run with a stored baseline.
+
+    python -m benchmarks.parser_regression --save-baseline   # record a baseline
+    python -m benchmarks.parser_regression                   # fail on regressions
+"""
+import argparse
+import json
+import os
+import re
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+from app.services.cv_parser import get_cv_parser, detect_file_type, DEFAULT_SPACY_MODEL
+from benchmarks import corpus
+
+HERE = os.path.dirname(__file__)
+DEFAULT_CORPUS = os.path.join(HERE, 'corpus')
+DEFAULT_BASELINE = os.path.join(HERE, 'baseline.json')
+
+# Metrics where a larger value is better; everything else is a cost
+HIGHER_IS_BETTER = ('throughput', 'accuracy')
+
+
+def median_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def _digits(value):
+    return re.sub(r'\D', '', value or '')[-10:]
+
+
+def score(parsed, labels):
+    expected_skills = set(labels['skills'])
+    found_skills = set(parsed['skills'])
+    true_positives = len(expected_skills & found_skills)
+    precision = true_positives / len(found_skills) if found_skills else 0.0
+    recall = true_positives / len(expected_skills) if expected_skills else 1.0
+    return {
+        'name': float(parsed['name'].strip().lower() == labels['name'].lower()),
+        'email': float(parsed['email'].lower() == labels['email'].lower()),
+        'phone': float(_digits(parsed['phone']) == _digits(labels['phone'])),
+        'skills_precision': precision,
+        'skills_recall': recall,
+        'skills_f1': 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    }
+
+
+def run(parser, corpus_dir, labels, repeat):
+    timings = {}
+    accuracy = {}
+
+    def record(key, value):
+        timings.setdefault(key, []).append(value)
+
+    start = time.perf_counter()
+    for filename, cv_labels in sorted(labels.items()):
+        path = os.path.join(corpus_dir, filename)
+        file_type = detect_file_type(filename)
+        size = cv_labels['size']
+
+        cv_text = parser.extract_text_from_file(path, file_type)
+        parsed = parser.parse_cv(cv_text)
+        for metric, value in score(parsed, cv_labels).items():
+            accuracy.setdefault(metric, []).append(value)
+
+        record(f'extract_text.{file_type}.{size}', median_ms(
+            lambda: parser.extract_text_from_file(path, file_type), repeat))
+
+        # Extractor timings only depend on the text, so measure them once per CV (on the TXT copy)
+        if file_type != 'txt':
+            continue
+        record(f'parse_cv.{size}', median_ms(lambda: parser.parse_cv(cv_text), repeat))
+
+        doc = parser.make_doc(cv_text)
+        text_lower = cv_text.lower()
+        sections = parser.classify_sentences(doc, text_lower)
+        extractors = {
+            'nlp': lambda: parser.make_doc(cv_text),
+            'classify_sentences': lambda: parser.classify_sentences(doc, text_lower),
+            'extract_name': lambda: parser.extract_name(doc),
+            'extract_email': lambda: parser.extract_email(cv_text),
+            'extract_phone': lambda: parser.extract_phone(cv_text),
+            'extract_skills': lambda: parser.extract_skills(doc, text_lower),
+            'extract_experience': lambda: parser.extract_experience(doc, text_lower, sections),
+            'extract_education': lambda: parser.extract_education(doc, sections)
+        }
+        for name, fn in extractors.items():
+            record(f'{name}.{size}', median_ms(fn, repeat))
+
+    elapsed = time.perf_counter() - start
+
+    def end_to_end():
+        for filename in labels:
+            cv_text = parser.extract_text_from_file(os.path.join(corpus_dir, filename), detect_file_type(filename))
+            parser.parse_cv(cv_text)
+
+    # Throughput and memory are separate end-to-end passes (extract + parse once per file);
+    # tracemalloc slows Python down, so it never wraps a timed section
+    start = time.perf_counter()
+    end_to_end()
+    throughput = len(labels) / (time.perf_counter() - start)
+
+    tracemalloc.start()
+    end_to_end()
+    _, peak_python = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    metrics = {f'{key}.ms': round(statistics.mean(values), 4) for key, values in sorted(timings.items())}
+    metrics.update({f'accuracy.{key}': round(statistics.mean(values), 4) for key, values in sorted(accuracy.items())})
+    metrics['throughput.cvs_per_second'] = round(throughput, 2)
+    metrics['memory.peak_python_mb'] = round(peak_python / 1024 / 1024, 2)
+    metrics['memory.peak_rss_mb'] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 2)
+    metrics['run.seconds'] = round(elapsed, 2)
+    return metrics
+
+
+def compare(metrics, baseline, threshold, accuracy_tolerance):
+    """Return a list of human-readable regressions of metrics against baseline."""
+    regressions = []
+    for key, base in baseline.items():
+        current = metrics.get(key)
+        if current is None or key.startswith('run.') or key.startswith('memory.peak_rss'):
+            continue
+        if key.startswith('accuracy.'):
+            if current < base - accuracy_tolerance:
+                regressions.append(f'{key}: {current} < baseline {base}')
+        elif key.startswith(HIGHER_IS_BETTER):
+            if current < base * (1 - threshold):
+                regressions.append(f'{key}: {current} < baseline {base} by more than {threshold:.0%}')
+        elif base > 0 and current > base * (1 + threshold):
+            regressions.append(f'{key}: {current} > baseline {base} by more than {threshold:.0%}')
+    return regressions
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--model', default=os.getenv('SPACY_MODEL', DEFAULT_SPACY_MODEL))
+    arg_parser.add_argument('--profile', default=os.getenv('SPACY_PIPELINE_PROFILE', 'full'))
+    arg_parser.add_argument('--corpus', default=DEFAULT_CORPUS)
+    arg_parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    arg_parser.add_argument('--per-size', type=int, default=5, help='CVs per size when generating the corpus')
+    arg_parser.add_argument('--repeat', type=int, default=5, help='timing repetitions per measurement')
+    arg_parser.add_argument('--threshold', type=float, default=0.2, help='allowed relative slowdown')
+    arg_parser.add_argument('--accuracy-tolerance', type=float, default=0.01, help='allowed absolute accuracy drop')
+    arg_parser.add_argument('--save-baseline', action='store_true')
+    args = arg_parser.parse_args()
+
+    if os.path.exists(os.path.join(args.corpus, 'labels.json')):
+        labels = corpus.load(args.corpus)
+    else:
+        labels = corpus.generate(args.corpus, args.per_size)
+
+    parser = get_cv_parser(args.model, args.profile)
+    metrics = run(parser, args.corpus, labels, args.repeat)
+    for key, value in metrics.items():
+        print(f'{key:<45} {value}')
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as file:
+            json.dump(metrics, file, indent=2, sort_keys=True)
+        print(f'Baseline written to {args.baseline}')
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print('No baseline found; run with --save-baseline first')
+        return 0
+
+    with open(args.baseline, encoding='utf-8') as file:
+        baseline = json.load(file)
+    regressions = compare(metrics, baseline, args.threshold, args.accuracy_tolerance)
+    for regression in regressions:
+        print(f'REGRESSION {regression}')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
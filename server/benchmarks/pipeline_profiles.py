@@ -0,0 +1,73 @@
+"""
+Latency and memory per CV for each spaCy pipeline profile. Every profile runs
+in a fresh process so model load size and peak RSS are not shared.
+
+    python -m benchmarks.pipeline_profiles --cvs 50 --sentences 300 3000
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import time
+from benchmarks.sentence_classifier import synthetic_cv
+from app.services.cv_parser import get_cv_parser, DEFAULT_SPACY_MODEL
+from app.services.cv_parser_pool import current_rss_kb
+
+PROFILES = [
+    ('full', 'full', 0),
+    ('fast', 'fast', 0),
+    ('full+chunked', 'full', 20000),
+    ('fast+chunked', 'fast', 20000)
+]
+
+
+def run_profile(model_name, profile, chunk_chars, sentences, cvs, results):
+    base_rss = current_rss_kb()
+    start = time.perf_counter()
+    parser = get_cv_parser(model_name, profile, chunk_chars)
+    load_ms = (time.perf_counter() - start) * 1000
+    loaded_rss = current_rss_kb()
+
+    texts = [synthetic_cv(sentences, seed) for seed in range(cvs)]
+    parser.nlp.max_length = max(parser.nlp.max_length, max(len(text) for text in texts) + 1)
+    parser.parse_cv(texts[0])  # warm-up
+
+    start = time.perf_counter()
+    for text in texts:
+        parser.parse_cv(text)
+    per_cv_ms = (time.perf_counter() - start) / cvs * 1000
+
+    results.put({
+        'pipes': list(parser.nlp.pipe_names),
+        'load_ms': load_ms,
+        'model_rss_mb': (loaded_rss - base_rss) / 1024,
+        'per_cv_ms': per_cv_ms,
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    })
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--model', default=os.getenv('SPACY_MODEL', DEFAULT_SPACY_MODEL))
+    arg_parser.add_argument('--sentences', type=int, nargs='+', default=[300, 3000])
+    arg_parser.add_argument('--cvs', type=int, default=20)
+    args = arg_parser.parse_args()
+
+    context = multiprocessing.get_context('spawn')
+    print(f"{'profile':<14} {'sentences':>9} {'load ms':>9} {'model MB':>9} {'ms/CV':>9} {'peak MB':>9}  pipes")
+    for sentences in args.sentences:
+        for label, profile, chunk_chars in PROFILES:
+            results = context.Queue()
+            process = context.Process(
+                target=run_profile,
+                args=(args.model, profile, chunk_chars, sentences, args.cvs, results)
+            )
+            process.start()
+            result = results.get()
+            process.join()
+            print(f"{label:<14} {sentences:>9} {result['load_ms']:>9.0f} {result['model_rss_mb']:>9.1f} "
+                  f"{result['per_cv_ms']:>9.2f} {result['peak_rss_mb']:>9.1f}  {','.join(result['pipes'])}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Micro-benchmark: the old per-extractor sentence walks against the single-pass
+classify_sentences path, on long synthetic CVs. The spaCy doc is built once per
+CV so only the extraction step is timed.
+
+    python -m benchmarks.sentence_classifier --sentences 2000 --repeat 20
+"""
+import argparse
+import os
+import random
+import re
+import time
+from app.services.cv_parser import CVParser, DEFAULT_SPACY_MODEL
+
+SENTENCES = [
+    'I worked as a software engineer at Acme Corp for {n} years.',
+    'Bachelor of Science in Computer Science from the University of Cape Town.',
+    'Led a team of {n} developers building payment services in Python and Go.',
+    'Held the position of senior data analyst with {n}+ years of SQL experience.',
+    'Completed a diploma in project management at the Institute of Technology.',
+    'Enjoys hiking, chess and volunteering at the local animal shelter.',
+    'Migrated {n} microservices to Kubernetes and Docker on AWS.',
+    'Master degree in Statistics, graduated with distinction.'
+]
+
+
+def legacy_extract(doc):
+    """The extraction code as it was before the single-pass classifier."""
+    text = doc.text.lower()
+    total_experience = 0
+    for pattern in [
+        r'(\d+)\s*(?:years?|yrs?)\s*(?:of)?\s*experience',
+        r'experience.*?(\d+)\s*(?:years?|yrs?)',
+        r'(\d+)\s*\+?\s*years?'
+    ]:
+        for match in re.findall(pattern, text):
+            years = float(match)
+            if years > total_experience:
+                total_experience = years
+
+    experience = []
+    for sent in doc.sents:
+        if any(word in sent.text.lower() for word in ['worked', 'experience', 'job', 'position', 'role']):
+            experience.append(sent.text)
+
+    education = []
+    education_keywords = ['university', 'college', 'institute', 'bachelor', 'master', 'phd', 'degree', 'diploma']
+    for sent in doc.sents:
+        if any(keyword in sent.text.lower() for keyword in education_keywords):
+            education.append(sent.text)
+
+    skills_text = doc.text.lower()
+    return {'total_years': total_experience, 'details': experience[:5]}, education, skills_text
+
+
+def single_pass_extract(parser, doc):
+    text_lower = doc.text.lower()
+    sections = parser.classify_sentences(doc, text_lower)
+    return parser.extract_experience(doc, text_lower, sections), parser.extract_education(doc, sections)
+
+
+def synthetic_cv(sentences, seed=0):
+    rng = random.Random(seed)
+    return ' '.join(rng.choice(SENTENCES).format(n=rng.randint(1, 15)) for _ in range(sentences))
+
+
+def time_it(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--model', default=os.getenv('SPACY_MODEL', DEFAULT_SPACY_MODEL))
+    arg_parser.add_argument('--sentences', type=int, nargs='+', default=[200, 1000, 4000])
+    arg_parser.add_argument('--repeat', type=int, default=10)
+    args = arg_parser.parse_args()
+
+    parser = CVParser(args.model)
+    print(f"{'sentences':>10} {'legacy ms':>12} {'single-pass ms':>15} {'saved ms/CV':>12} {'speedup':>8}")
+    for count in args.sentences:
+        cv_text = synthetic_cv(count)
+        parser.nlp.max_length = max(parser.nlp.max_length, len(cv_text) + 1)
+        doc = parser.nlp(cv_text)
+
+        legacy_experience, legacy_education, _ = legacy_extract(doc)
+        experience, education = single_pass_extract(parser, doc)
+        assert (legacy_experience, legacy_education) == (experience, education), 'outputs differ'
+
+        legacy_ms = time_it(lambda: legacy_extract(doc), args.repeat)
+        single_ms = time_it(lambda: single_pass_extract(parser, doc), args.repeat)
+        print(f'{count:>10} {legacy_ms:>12.2f} {single_ms:>15.2f} {legacy_ms - single_ms:>12.2f} '
+              f'{legacy_ms / single_ms:>7.2f}x')
+
+
+if __name__ == '__main__':
+    main()
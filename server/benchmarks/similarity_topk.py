@@ -0,0 +1,61 @@
+"""
+Micro-benchmark: the old similar-candidates scoring (dense cosine_similarity
+row, full argsort) against SimilarityIndex.query and the batched
+SimilarityIndex.query_many, on synthetic CVs. Checks all three return the
+same neighbours.
+
+    python -m benchmarks.similarity_topk --docs 1000 10000 100000 --probes 50
+"""
+import argparse
+import time
+import numpy as np
+from sklearn.metrics.pairwise import cosine_similarity
+from app.services.similarity_index import SimilarityIndex
+from benchmarks.corpus import make_cv
+
+
+def legacy_query(matrix, ids, row, limit):
+    """The scoring code as it was: dense similarity row, fully sorted, tail kept."""
+    similarity = cosine_similarity(matrix[row], matrix)[0]
+    similarity[row] = -1
+    order = similarity.argsort()[::-1][:limit]
+    return [(int(ids[i]), float(similarity[i])) for i in order if similarity[i] >= 0]
+
+
+def _same(a, b):
+    return [round(score, 5) for _, score in a] == [round(score, 5) for _, score in b]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--docs', type=int, nargs='+', default=[1000, 10000, 100000])
+    arg_parser.add_argument('--probes', type=int, default=50)
+    arg_parser.add_argument('--limit', type=int, default=5)
+    args = arg_parser.parse_args()
+
+    print(f"{'docs':>8} {'legacy ms':>10} {'query ms':>10} {'batched ms':>11} {'speedup':>8} {'same':>5}")
+    for count in args.docs:
+        index = SimilarityIndex()
+        index.update((seed, '\n'.join(make_cv(seed, 30)[0]), 0.0) for seed in range(count))
+        index._refit()
+        probes = np.random.default_rng(0).choice(count, min(args.probes, count), replace=False).tolist()
+
+        started = time.perf_counter()
+        legacy = {c: legacy_query(index.matrix, index.ids, index.rows[c], args.limit) for c in probes}
+        legacy_ms = (time.perf_counter() - started) * 1000 / len(probes)
+
+        started = time.perf_counter()
+        single = {c: index.query(c, limit=args.limit) for c in probes}
+        single_ms = (time.perf_counter() - started) * 1000 / len(probes)
+
+        started = time.perf_counter()
+        batched = index.query_many(probes, limit=args.limit)
+        batched_ms = (time.perf_counter() - started) * 1000 / len(probes)
+
+        same = all(_same(legacy[c], single[c]) and _same(legacy[c], batched[c]) for c in probes)
+        print(f'{count:>8} {legacy_ms:>10.2f} {single_ms:>10.2f} {batched_ms:>11.2f} '
+              f'{legacy_ms / batched_ms:>7.1f}x {str(same):>5}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""skill ids, parsing status and listing indexes
+
+Brings a database created from the original models up to date:
+
+- skills and skill_aliases (integer skill ids, which double as bit positions)
+- candidates.skill_bits and candidate_skills.skill_id, filled by `flask backfill-skills`
+- candidates.parsing_status for asynchronous CV ingestion
+- indexes on the foreign keys that listings, rescoring and exports filter by
+
+Revision ID: 3c9a1e7d5b20
+Revises:
+Create Date: 2026-10-18 17:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c9a1e7d5b20'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'skills',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('category', sa.String(length=50), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name')
+    )
+    op.create_table(
+        'skill_aliases',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('alias', sa.String(length=100), nullable=False),
+        sa.Column('skill_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['skill_id'], ['skills.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('alias')
+    )
+    op.create_index('ix_skill_aliases_skill_id', 'skill_aliases', ['skill_id'])
+
+    with op.batch_alter_table('candidates') as batch_op:
+        batch_op.add_column(sa.Column('parsing_status', sa.String(length=20), nullable=True))
+        batch_op.add_column(sa.Column('skill_bits', sa.LargeBinary(), nullable=True))
+
+    with op.batch_alter_table('candidate_skills') as batch_op:
+        batch_op.add_column(sa.Column('skill_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_candidate_skills_skill_id', 'skills', ['skill_id'], ['id'])
+        batch_op.create_index('ix_candidate_skills_skill_id', ['skill_id'])
+        batch_op.create_index('ix_candidate_skills_candidate_id', ['candidate_id'])
+
+    op.create_index('ix_applications_requisition_id', 'applications', ['requisition_id'])
+    op.create_index('ix_assessment_results_application_id', 'assessment_results', ['application_id'])
+
+
+def downgrade():
+    op.drop_index('ix_assessment_results_application_id', table_name='assessment_results')
+    op.drop_index('ix_applications_requisition_id', table_name='applications')
+
+    with op.batch_alter_table('candidate_skills') as batch_op:
+        batch_op.drop_index('ix_candidate_skills_candidate_id')
+        batch_op.drop_index('ix_candidate_skills_skill_id')
+        batch_op.drop_constraint('fk_candidate_skills_skill_id', type_='foreignkey')
+        batch_op.drop_column('skill_id')
+
+    with op.batch_alter_table('candidates') as batch_op:
+        batch_op.drop_column('skill_bits')
+        batch_op.drop_column('parsing_status')
+
+    op.drop_index('ix_skill_aliases_skill_id', table_name='skill_aliases')
+    op.drop_table('skill_aliases')
+    op.drop_table('skills')
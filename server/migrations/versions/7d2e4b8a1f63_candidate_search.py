@@ -0,0 +1,64 @@
+"""candidate search column and indexes
+
+On PostgreSQL only: the weighted full-text search column and the trigram
+indexes behind candidate search. Other databases keep the ILIKE search and
+this revision does nothing there.
+
+Adding the generated column rewrites candidates under an exclusive lock, so
+run it in a quiet window on a large table. The indexes are then built
+CONCURRENTLY outside a transaction, so writes carry on while they build. If
+a concurrent build fails it leaves an invalid index behind; drop it (or run
+`flask install-candidate-search`, which rebuilds invalid ones) and upgrade again.
+
+Revision ID: 7d2e4b8a1f63
+Revises: 3c9a1e7d5b20
+Create Date: 2026-10-18 21:40:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '7d2e4b8a1f63'
+down_revision = '3c9a1e7d5b20'
+branch_labels = None
+depends_on = None
+
+# Frozen copy of app.services.candidate_search.SEARCH_COLUMN_DDL and SEARCH_INDEXES at this revision
+SEARCH_COLUMN_DDL = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    """
+    ALTER TABLE candidates ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(first_name, '') || ' ' || coalesce(last_name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(email, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(current_title, '') || ' ' || coalesce(current_company, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(summary, '')), 'C') ||
+        setweight(to_tsvector('english', left(coalesce(cv_text, ''), 100000)), 'D')
+    ) STORED
+    """
+]
+SEARCH_INDEXES = {
+    'ix_candidates_search_vector': 'USING gin (search_vector)',
+    'ix_candidates_name_trgm': "USING gin ((lower(first_name || ' ' || last_name)) gin_trgm_ops)",
+    'ix_candidates_email_trgm': 'USING gin ((lower(email)) gin_trgm_ops)'
+}
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for statement in SEARCH_COLUMN_DDL:
+        op.execute(statement)
+    with op.get_context().autocommit_block():
+        for name, definition in SEARCH_INDEXES.items():
+            op.execute(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON candidates {definition}')
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    with op.get_context().autocommit_block():
+        for name in reversed(list(SEARCH_INDEXES)):
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+    op.execute('ALTER TABLE candidates DROP COLUMN IF EXISTS search_vector')
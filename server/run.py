@@ -1,4 +1,5 @@
 from app import create_app
+from app.services.cv_parser_pool import warm_parser_pool
 import os
 
 app = create_app()
@@ -7,6 +8,10 @@ if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     debug = os.environ.get('FLASK_DEBUG', 'False') == 'True'
 
+    if app.config['CV_PARSER_WARM_ON_START']:
+        # Load spaCy and start the parser workers before the first upload arrives
+        warm_parser_pool(app)
+
     if debug:
         # Dev server (Flask)
         app.run(
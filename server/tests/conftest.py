@@ -0,0 +1,61 @@
+"""
+Test fixtures: an in-memory SQLite database and fakeredis in place of the
+PostgreSQL and Redis servers, so the suite runs without any services.
+
+    pip install -r requirements-dev.txt && python -m pytest
+"""
+import os
+
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+import fakeredis
+import pytest
+import app.extensions as extensions
+
+# Before the app modules import it by name
+extensions.redis_client = fakeredis.FakeRedis()
+
+from flask_jwt_extended import create_access_token
+from app import create_app
+from app.extensions import db, redis_client
+from app.models import User
+from app.services import candidate_search, scoring_profile, similarity_index, skill_dictionary
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app()
+    app.config.update(
+        TESTING=True,
+        QUERY_BUDGET_STRICT=True,
+        SIMILARITY_INDEX_DIR=str(tmp_path / 'similarity'),
+        ANN_INDEX_DIR=str(tmp_path / 'ann')
+    )
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+    redis_client.flushall()
+    # Process-wide caches hold ids from the dropped database
+    scoring_profile._profiles.clear()
+    skill_dictionary._dictionary = None
+    candidate_search.invalidate_search_enabled()
+    similarity_index._indexes.clear()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def admin_headers():
+    user = User(email='admin@example.com', password_hash='x', first_name='Ada', last_name='Admin', role='admin')
+    db.session.add(user)
+    db.session.commit()
+    return {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+
+
+@pytest.fixture
+def auth_headers(app):
+    return admin_headers()
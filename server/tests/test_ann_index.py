@@ -0,0 +1,43 @@
+import numpy as np
+from app.services.ann_index import ANNIndex
+
+
+def make_index(path, **kwargs):
+    return ANNIndex(str(path), dim=32, n_features=2 ** 10, train_min=64, **kwargs)
+
+
+def random_vectors(count, seed=0):
+    vectors = np.random.default_rng(seed).normal(size=(count, 32)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_insert_does_not_train_inline(tmp_path):
+    index = make_index(tmp_path, background_train=False)
+    index.insert_vectors(np.arange(100), random_vectors(100))
+    meta = index._refresh()['meta']
+    assert meta['live'] == 100 and meta['nlist'] == 0
+
+    assert index.train()
+    meta = index._refresh()['meta']
+    assert meta['nlist'] == 10 and meta['trained_count'] == 100 and meta['quantizer'] == 1
+
+    # Later inserts join the nearest existing list
+    vectors = random_vectors(5, seed=1)
+    index.insert_vectors(np.arange(100, 105), vectors)
+    assert index._refresh()['meta']['nlist'] == 10
+    for candidate_id, vector in zip(range(100, 105), vectors):
+        assert index.search(vector, 1)[0][0] == candidate_id
+
+
+def test_background_training_swaps_quantizer(tmp_path):
+    index = make_index(tmp_path)
+    vectors = random_vectors(200)
+    index.insert_vectors(np.arange(200), vectors)
+    index._trainer.join(timeout=30)
+    index.remove([0])
+
+    meta = index._refresh()['meta']
+    assert meta['nlist'] and meta['live'] == 199
+    assert index.search(vectors[0], 5, nprobe=0)[0][0] != 0
+    assert index.search(vectors[1], 1, nprobe=meta['nlist'])[0][0] == 1
+    assert sorted(path.name for path in tmp_path.iterdir() if path.name.startswith('lists')) == ['lists-0.1']
@@ -0,0 +1,42 @@
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.extensions import db
+from app.models import AssessmentPack
+
+
+def seed_pack():
+    pack = AssessmentPack(name='Python', type='technical', questions=[{'q': 'What is a generator?'}] * 50)
+    db.session.add(pack)
+    db.session.commit()
+    return pack.id
+
+
+def selected_sql(client, url, headers):
+    statements = []
+
+    def _record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(Engine, 'before_cursor_execute', _record)
+    try:
+        response = client.get(url, headers=headers)
+    finally:
+        event.remove(Engine, 'before_cursor_execute', _record)
+    return response, ' '.join(statement for statement in statements if 'assessment_packs' in statement)
+
+
+def test_listing_leaves_questions_out(client, auth_headers):
+    seed_pack()
+    response, sql = selected_sql(client, '/api/assessment-packs', auth_headers)
+    assert response.status_code == 200
+    assert 'questions' not in response.json['assessment_packs'][0]
+    assert 'assessment_packs.questions' not in sql
+
+
+def test_questions_on_request_and_in_detail(client, auth_headers):
+    pack_id = seed_pack()
+    response = client.get('/api/assessment-packs?fields=name,questions', headers=auth_headers)
+    assert set(response.json['assessment_packs'][0]) == {'id', 'name', 'questions'}
+
+    response = client.get(f'/api/assessment-packs/{pack_id}', headers=auth_headers)
+    assert len(response.json['assessment_pack']['questions']) == 50
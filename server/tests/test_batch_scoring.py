@@ -0,0 +1,32 @@
+from app.extensions import db
+from app.models import Application, AuditLog, Candidate, CandidateSkill, Requisition
+from app.services.batch_scoring import rescore_requisition
+from app.services.skill_dictionary import refresh_candidate_skill_bits, register_requisition_skills
+
+
+def test_requisition_rescore_skips_closed_applications(app):
+    requisition = Requisition(title='Engineer', status='open', created_by=1, required_skills=[{'name': 'python'}])
+    db.session.add(requisition)
+    register_requisition_skills(requisition)
+    applications = {}
+    for status in ('applied', 'hired', 'rejected', 'withdrawn'):
+        candidate = Candidate(first_name=status, last_name='Doe', email=f'{status}@example.com', total_experience=5)
+        candidate.skills = [CandidateSkill(skill='Python')]
+        db.session.add(candidate)
+        db.session.flush()
+        refresh_candidate_skill_bits([candidate.id])
+        applications[status] = Application(
+            candidate=candidate, requisition_id=requisition.id, status=status,
+            cv_match_score=0.0, recommendation='proceed'
+        )
+        db.session.add(applications[status])
+    db.session.commit()
+
+    assert rescore_requisition(requisition) == 1
+    db.session.commit()
+
+    assert applications['applied'].cv_match_score > 0
+    for status in ('hired', 'rejected', 'withdrawn'):
+        assert applications[status].cv_match_score == 0.0
+        assert applications[status].recommendation == 'proceed'
+    assert [log.application_id for log in AuditLog.query] == [applications['applied'].id]
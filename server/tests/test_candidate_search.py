@@ -0,0 +1,37 @@
+from sqlalchemy.dialects import postgresql
+from app.models import Candidate
+from app.services import candidate_search
+from app.services.candidate_search import invalidate_search_enabled, search_enabled
+
+
+def test_search_enabled_is_rechecked_after_ttl(app, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(candidate_search.time, 'monotonic', lambda: now[0])
+    invalidate_search_enabled()
+    assert search_enabled() is False
+
+    # Pretend the column was installed by another process
+    monkeypatch.setattr(candidate_search, 'inspect', lambda engine: FakeInspector())
+    monkeypatch.setattr(candidate_search.db.engine.dialect, 'name', 'postgresql')
+    assert search_enabled() is False
+    now[0] += app.config['CANDIDATE_SEARCH_CHECK_TTL'] + 1
+    assert search_enabled() is True
+
+
+class FakeInspector:
+    def get_columns(self, table):
+        return [{'name': 'id'}, {'name': candidate_search.SEARCH_COLUMN}]
+
+
+def test_ranking_is_bounded_to_rank_limit_matches(app, monkeypatch):
+    monkeypatch.setattr(candidate_search, 'search_enabled', lambda: True)
+    app.config['CANDIDATE_SEARCH_RANK_LIMIT'] = 250
+    query, keys = candidate_search.search_candidates(Candidate.query, 'smith')
+    compiled = query.statement.compile(dialect=postgresql.dialect())
+    inner = str(compiled)[str(compiled).index('IN (SELECT'):]
+    assert 'LIMIT' in inner and 'ORDER BY' not in inner
+    assert 250 in compiled.params.values()
+    assert len(keys) == 2
+
+    query, _ = candidate_search.search_candidates(Candidate.query, 'smith', rank_limit=0)
+    assert 'LIMIT' not in str(query.statement.compile(dialect=postgresql.dialect()))
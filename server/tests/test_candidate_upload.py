@@ -0,0 +1,107 @@
+import io
+import os
+from datetime import datetime, timedelta
+import pytest
+import app.routes.candidates as candidate_routes
+import app.services.cv_jobs as cv_jobs
+from app.extensions import db, redis_client
+from app.models import Candidate
+
+
+class FakeQueue:
+    def __init__(self, error=None):
+        self.error = error
+        self.jobs = []
+
+    def enqueue(self, candidate_id, file_path, file_type):
+        if self.error:
+            raise self.error
+        self.jobs.append(file_path)
+        return {'id': 'job1', 'candidate_id': candidate_id}
+
+
+@pytest.fixture
+def upload_dir(app, tmp_path):
+    app.config.update(
+        CV_STORAGE_BACKEND='local',
+        CV_STORAGE_PATH=str(tmp_path / 'store'),
+        CV_UPLOAD_FOLDER=str(tmp_path / 'cvs')
+    )
+    return tmp_path / 'cvs'
+
+
+def post_cv(client, email='jane@example.com'):
+    return client.post('/api/candidates?async=true', data={
+        'first_name': 'Jane', 'last_name': 'Doe', 'email': email,
+        'cv': (io.BytesIO(b'Jane Doe\nSkills: Python, SQL\n'), 'jane.txt')
+    }, content_type='multipart/form-data')
+
+
+def test_queued_job_keeps_the_file(client, upload_dir, monkeypatch):
+    queue = FakeQueue()
+    monkeypatch.setattr(candidate_routes, 'get_cv_job_queue', lambda: queue)
+    response = post_cv(client)
+    assert response.status_code == 202
+    assert len(queue.jobs) == 1 and os.path.exists(queue.jobs[0])
+
+
+def test_failed_enqueue_removes_the_file(client, upload_dir, monkeypatch):
+    monkeypatch.setattr(candidate_routes, 'get_cv_job_queue', lambda: FakeQueue(ConnectionError('redis down')))
+    response = post_cv(client)
+    assert response.status_code == 201
+    assert response.json['candidate']['parsing_status'] == 'failed'
+    assert Candidate.query.one().parsing_status == 'failed'
+    assert os.listdir(upload_dir) == []
+
+
+def test_failed_commit_removes_the_file(client, upload_dir, monkeypatch):
+    def fail(*args):
+        raise RuntimeError('database unavailable')
+
+    monkeypatch.setattr(candidate_routes, 'candidate_fields_from_parsed', fail)
+    monkeypatch.setattr(candidate_routes, 'get_cv_job_queue', lambda: FakeQueue())
+    response = post_cv(client)
+    assert response.status_code == 500
+    assert Candidate.query.count() == 0
+    assert os.listdir(upload_dir) == []
+
+
+class FailingPool:
+    def parse_file(self, file_path, file_type):
+        raise ValueError('corrupt PDF')
+
+
+def test_failed_parse_marks_the_candidate(app, upload_dir, monkeypatch):
+    candidate = Candidate(first_name='Jane', last_name='Doe', email='jane@example.com', parsing_status='parsing')
+    db.session.add(candidate)
+    db.session.commit()
+    upload_dir.mkdir()
+    file_path = upload_dir / 'jane.pdf'
+    file_path.write_bytes(b'not a pdf')
+
+    monkeypatch.setattr(cv_jobs, 'get_parser_pool', lambda: FailingPool())
+    job_queue = cv_jobs.CVJobQueue(app, cv_jobs.RedisJobBackend(redis_client, 60, 900), workers=0)
+    job = job_queue.enqueue(candidate.id, str(file_path), 'pdf')
+    job_queue._process(job['id'])
+
+    assert job_queue.get(job['id'])['status'] == 'failed'
+    assert db.session.get(Candidate, candidate.id).parsing_status == 'failed'
+    assert not file_path.exists()
+
+
+def test_interrupted_jobs_are_requeued(app):
+    backend = cv_jobs.RedisJobBackend(redis_client, 60, 900)
+    job_queue = cv_jobs.CVJobQueue(app, backend, workers=0)
+    stale = job_queue.enqueue(1, 'a.pdf', 'pdf')
+    live = job_queue.enqueue(2, 'b.pdf', 'pdf')
+    assert backend.pop(timeout=1) == stale['id']
+    assert backend.pop(timeout=1) == live['id']
+
+    # The first worker died an hour ago; the second is still parsing
+    stale['updated_at'] = (datetime.utcnow() - timedelta(hours=1)).isoformat()
+    backend.save(stale)
+
+    assert backend.recover() == 1
+    assert backend.pop(timeout=1) == stale['id']
+    backend.ack(stale['id'])
+    assert redis_client.lrange(cv_jobs.PROCESSING_KEY, 0, -1) == [live['id'].encode('utf-8')]
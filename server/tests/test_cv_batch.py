@@ -0,0 +1,78 @@
+import io
+import re
+import zipfile
+import pytest
+from app.models import Candidate
+from app.services import cv_batch
+from app.services.cv_batch import InvalidArchive, iter_zip_members
+
+
+class FakeParser:
+    """Stands in for the spaCy parser: the email is the only field the batch needs."""
+
+    def __init__(self):
+        self.n_process = []
+
+    def extract_text_from_file(self, path, file_type):
+        with open(path, encoding='utf-8') as f:
+            return f.read()
+
+    def parse_many(self, items, batch_size=32, n_process=1):
+        self.n_process.append(n_process)
+        for cv_text, context in items:
+            email = re.search(r'\S+@\S+', cv_text).group()
+            yield {'email': email, 'name': 'Jane Doe', 'raw_text': cv_text, 'skills': []}, context
+
+
+def make_zip(files):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, data in files.items():
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+def test_zip_limits_are_checked_before_extracting(tmp_path):
+    archive = make_zip({f'cv{i}.txt': 'x' * 600 for i in range(3)})
+    for limits in ({'max_members': 2}, {'max_member_bytes': 500}, {'max_total_bytes': 1000}):
+        with pytest.raises(InvalidArchive):
+            list(iter_zip_members(io.BytesIO(archive), str(tmp_path), **limits))
+        assert list(tmp_path.iterdir()) == []
+
+    extracted = list(iter_zip_members(io.BytesIO(archive), str(tmp_path), 3, 600, 1800))
+    assert [filename for filename, _ in extracted] == ['cv0.txt', 'cv1.txt', 'cv2.txt']
+
+
+def test_corrupt_archive_returns_the_partial_result(client, auth_headers, monkeypatch):
+    parser = FakeParser()
+    monkeypatch.setattr(cv_batch, 'get_cv_parser', lambda **options: parser)
+    archive = bytearray(make_zip({
+        'jane.txt': 'Jane Doe jane@example.com',
+        'john.txt': 'John Doe john@example.com ' + 'filler ' * 200
+    }))
+    # Flip bytes in the middle of the second member's compressed data
+    offset = archive.index(b'john.txt') + len('john.txt') + 10
+    archive[offset:offset + 8] = bytes(8)
+
+    response = client.post(
+        '/api/candidates/batch?n_process=8',
+        data={'cvs': (io.BytesIO(bytes(archive)), 'cvs.zip')},
+        headers=auth_headers, content_type='multipart/form-data'
+    )
+    assert response.status_code == 201
+    assert [row['email'] for row in response.json['created']] == ['jane@example.com']
+    assert 'not a valid ZIP' in response.json['error']
+    assert Candidate.query.count() == 1
+    # The query string cannot start spaCy worker processes
+    assert parser.n_process == [1]
+
+
+def test_bad_archive_with_nothing_created_is_rejected(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(cv_batch, 'get_cv_parser', lambda **options: FakeParser())
+    response = client.post(
+        '/api/candidates/batch',
+        data={'archive': (io.BytesIO(b'not a zip'), 'cvs.zip')},
+        headers=auth_headers, content_type='multipart/form-data'
+    )
+    assert response.status_code == 400
+    assert response.json['error'] == 'Archive is not a valid ZIP file'
@@ -0,0 +1,58 @@
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.extensions import db, redis_client
+from app.models import Application, Candidate, Requisition
+from app.services import leaderboard
+from app.services.leaderboard import get_leaderboard
+
+
+def seed(scores):
+    requisition = Requisition(title='Engineer', status='open', created_by=1)
+    db.session.add(requisition)
+    db.session.flush()
+    applications = []
+    for i, score in enumerate(scores):
+        candidate = Candidate(first_name=f'C{i}', last_name='Doe', email=f'c{i}@example.com')
+        applications.append(Application(candidate=candidate, requisition_id=requisition.id, overall_score=score))
+    db.session.add_all(applications)
+    db.session.commit()
+    return requisition.id, [application.id for application in applications]
+
+
+def test_rebuild_replaces_stale_buckets(app):
+    requisition_id, ids = seed([10.0, 30.0, 20.0])
+    redis_client.zadd(leaderboard.STATUS_KEY.format(requisition_id, 'gone'), {'000000000999': 1})
+
+    assert get_leaderboard().rebuild(requisition_id) == 3
+    assert get_leaderboard().page(requisition_id) == ([ids[1], ids[2], ids[0]], 3)
+    assert not redis_client.exists(leaderboard.STATUS_KEY.format(requisition_id, 'gone'))
+    assert redis_client.ttl(leaderboard.ALL_KEY.format(requisition_id)) == -1
+    assert not list(redis_client.scan_iter('leaderboard_tmp:*'))
+
+
+def test_rebuild_keeps_a_score_written_while_it_ran(app):
+    requisition_id, ids = seed([10.0, 30.0, 20.0])
+    selects = []
+
+    def before(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith('SELECT applications.id') and len(selects) == 1:
+            # The concurrent commit is visible to the retry's read
+            selects.append('updated')
+            conn.exec_driver_sql('UPDATE applications SET overall_score = 99 WHERE id = ?', (ids[0],))
+
+    def after(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith('SELECT applications.id') and not selects:
+            # Another worker commits a new score after the rebuild read its snapshot
+            selects.append('read')
+            get_leaderboard().write([(ids[0], requisition_id, 99.0, 'applied', None, False)])
+
+    event.listen(Engine, 'before_cursor_execute', before)
+    event.listen(Engine, 'after_cursor_execute', after)
+    try:
+        assert get_leaderboard().rebuild(requisition_id) == 3
+    finally:
+        event.remove(Engine, 'before_cursor_execute', before)
+        event.remove(Engine, 'after_cursor_execute', after)
+
+    assert selects == ['read', 'updated']
+    assert get_leaderboard().page(requisition_id)[0] == [ids[0], ids[1], ids[2]]
@@ -0,0 +1,88 @@
+"""
+The listing endpoints eager-load their related rows, so the number of SQL
+statements they issue must not grow with the page size. Each endpoint runs
+against 5 and 200 applications under QUERY_BUDGET_STRICT (an over-budget
+request raises QueryBudgetExceeded) and must issue the same number of
+statements for both.
+"""
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.extensions import db, redis_client
+from app.models import Application, Candidate, CandidateSkill, Interview, Requisition, User
+from conftest import admin_headers
+
+SIZES = (5, 200)
+
+ENDPOINTS = [
+    ('/api/requisitions/{req}/candidates', 'candidates'),
+    ('/api/requisitions/{req}/shortlist', 'shortlist'),
+    ('/api/requisitions/{req}/applications?per_page=200', 'applications'),
+    ('/api/requisitions/{req}/applications?limit=100', 'applications'),
+    ('/api/interviews?per_page=200', 'interviews'),
+    ('/api/interviews?limit=100', 'interviews'),
+]
+
+
+def seed(rows):
+    interviewers = [
+        User(email=f'interviewer{i}@example.com', password_hash='x', first_name='I', last_name=str(i), role='recruiter')
+        for i in range(3)
+    ]
+    requisition = Requisition(title='Engineer', status='open', created_by=1, required_skills=[{'name': 'python'}])
+    db.session.add_all(interviewers + [requisition])
+    db.session.flush()
+    for i in range(rows):
+        candidate = Candidate(first_name='Cand', last_name=str(i), email=f'candidate{i}@example.com', total_experience=3)
+        db.session.add(candidate)
+        db.session.flush()
+        db.session.add_all([
+            CandidateSkill(candidate_id=candidate.id, skill='python'),
+            CandidateSkill(candidate_id=candidate.id, skill='sql')
+        ])
+        application = Application(
+            candidate_id=candidate.id, requisition_id=requisition.id, overall_score=i % 100, recommendation='proceed'
+        )
+        db.session.add(application)
+        db.session.flush()
+        db.session.add(Interview(
+            application_id=application.id, scheduled_date=datetime(2026, 1, 1) + timedelta(hours=i),
+            interviewers=[interviewers[i % 3].id, interviewers[(i + 1) % 3].id], status='scheduled'
+        ))
+    db.session.commit()
+    return requisition.id
+
+
+def count_queries(client, url, headers):
+    count = 0
+
+    def _count(*args):
+        nonlocal count
+        count += 1
+
+    event.listen(Engine, 'before_cursor_execute', _count)
+    try:
+        response = client.get(url, headers=headers)
+    finally:
+        event.remove(Engine, 'before_cursor_execute', _count)
+    return response, count
+
+
+@pytest.mark.parametrize('url, key', ENDPOINTS)
+def test_query_count_is_independent_of_page_size(app, client, auth_headers, url, key):
+    counts = []
+    for rows in SIZES:
+        if rows != SIZES[0]:
+            db.session.remove()
+            db.drop_all()
+            db.create_all()
+            redis_client.flushall()
+            auth_headers = admin_headers()
+        requisition_id = seed(rows)
+        response, count = count_queries(client, url.format(req=requisition_id), auth_headers)
+        assert response.status_code == 200, response.json
+        assert len(response.json[key]) == (min(rows, 100) if 'limit=' in url else rows)
+        counts.append(count)
+    assert counts[0] == counts[1], f'{url}: {counts[0]} queries for {SIZES[0]} rows, {counts[1]} for {SIZES[1]}'
+
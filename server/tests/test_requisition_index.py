@@ -0,0 +1,57 @@
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.extensions import db, redis_client
+from app.models import Requisition
+from app.services import scoring_profile
+from app.services.requisition_index import get_requisition_index, matching_requisitions
+from app.services.skill_dictionary import get_skill_dictionary, register_requisition_skills
+
+
+def seed(count):
+    for i in range(count):
+        requisition = Requisition(
+            title=f'Engineer {i}', status='open', created_by=1, min_experience=i % 5,
+            required_skills=[{'name': 'python'}, {'name': 'sql'}, {'name': f'skill{i}'}]
+        )
+        db.session.add(requisition)
+        register_requisition_skills(requisition)
+    db.session.commit()
+    get_requisition_index().rebuild()
+    # Cold profile caches: every requisition has to be compiled again
+    scoring_profile._profiles.clear()
+    for key in redis_client.scan_iter('scoring_profile:*'):
+        redis_client.delete(key)
+
+
+def statements(fn):
+    count = 0
+
+    def _count(*args):
+        nonlocal count
+        count += 1
+
+    event.listen(Engine, 'before_cursor_execute', _count)
+    try:
+        result = fn()
+    finally:
+        event.remove(Engine, 'before_cursor_execute', _count)
+    return result, count
+
+
+def test_cold_requisitions_are_loaded_in_one_query(app):
+    counts = []
+    for size in (5, 50):
+        db.session.remove()
+        db.drop_all()
+        db.create_all()
+        redis_client.flushall()
+        seed(size)
+        bits = 0
+        for skill_id in get_skill_dictionary().resolve(['python', 'sql']).values():
+            bits |= 1 << skill_id
+        matches, count = statements(lambda: matching_requisitions(bits, 3, limit=10))
+        assert len(matches) == min(size, 10)
+        scores = [score for score, _, _ in matches]
+        assert scores == sorted(scores, reverse=True)
+        counts.append(count)
+    assert counts[0] == counts[1]
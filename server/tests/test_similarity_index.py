@@ -0,0 +1,25 @@
+import numpy as np
+from app.services import similarity_index
+from app.services.similarity_index import SimilarityIndex, get_similarity_index, top_k
+
+
+def test_indexes_are_evicted_least_recently_used_first(app):
+    app.config['SIMILARITY_MAX_INDEXES'] = 2
+    first = get_similarity_index('requisition-1')
+    get_similarity_index('requisition-2')
+    assert get_similarity_index('requisition-1') is first
+    get_similarity_index('requisition-3')
+    assert list(similarity_index._indexes) == ['requisition-1', 'requisition-3']
+
+
+def test_non_positive_limits_return_nothing():
+    scores = np.array([[0.2, 0.9, 0.5]])
+    assert top_k(scores, 0).shape == (1, 0)
+    assert top_k(scores, -3).shape == (1, 0)
+    assert top_k(scores, 2).tolist() == [[1, 2]]
+
+    index = SimilarityIndex(n_features=2 ** 10)
+    index.update([(1, 'python developer', 1.0), (2, 'python engineer', 1.0)])
+    assert index.query(1, limit=0) == []
+    assert index.query(1, limit=-1) == []
+    assert [candidate_id for candidate_id, _ in index.query(1, limit=1)] == [2]
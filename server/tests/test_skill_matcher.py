@@ -0,0 +1,76 @@
+import pytest
+from app.extensions import db
+from app.models import Candidate, CandidateSkill, Requisition, Skill, SkillAlias
+from app.services.skill_dictionary import (
+    bytes_to_bits, get_skill_dictionary, refresh_candidate_skill_bits, register_requisition_skills
+)
+from app.services.skill_matcher import get_skill_matcher
+
+
+@pytest.fixture
+def matcher():
+    return get_skill_matcher()
+
+
+@pytest.mark.parametrize('text', [
+    "I'm ready to go the extra mile and happy to go on site.",
+    'Our AI assistant Ai-Lin reviewed 250 ml samples; TS Eliot is my favourite poet.',
+    'Lets go. The team said ai, not ml, and ts is short for timestamp.',
+    'I would like to express my interest in the role and take the helm of the team.'
+])
+def test_ambiguous_words_in_prose_do_not_match(matcher, text):
+    assert matcher.find_skills(text.lower()) == set()
+
+
+def test_ambiguous_terms_match_as_list_items(matcher):
+    text = 'Skills: Python, Go, SQL\nLanguages: C | R\n- AI\n• ML\n(Go)'
+    assert matcher.find_skills(text.lower()) == {'python', 'go', 'sql', 'c', 'r', 'ai', 'ml'}
+
+
+def test_unambiguous_synonyms_still_match(matcher):
+    text = 'Built golang services and machine learning models with typescript, mongodb and pytorch'
+    assert matcher.find_skills(text.lower()) == {'go', 'ml', 'typescript', 'mongodb', 'pytorch'}
+
+
+def test_dropped_aliases(matcher):
+    assert matcher.find_skills('github and gitlab, torch, mongo and ts'.lower()) == {'github', 'gitlab'}
+    assert matcher.canonicalize('GitHub') == 'github'
+    assert matcher.canonicalize('go') == 'go'
+
+
+def test_seed_moves_aliases_to_their_new_skill(app):
+    git = Skill(name='git', category='devops')
+    db.session.add(git)
+    db.session.flush()
+    db.session.add_all([SkillAlias(alias='git', skill_id=git.id), SkillAlias(alias='github', skill_id=git.id)])
+    db.session.commit()
+
+    get_skill_dictionary().seed_from_taxonomy()
+    db.session.commit()
+
+    github = SkillAlias.query.filter_by(alias='github').one()
+    assert github.skill.name == 'github'
+    assert get_skill_dictionary().resolve(['github'])['github'] == github.skill_id
+
+
+def test_free_text_skills_get_ids_only_once_a_requisition_uses_them(app):
+    candidate = Candidate(first_name='Jane', last_name='Doe', email='jane@example.com')
+    candidate.skills = [CandidateSkill(skill='Python'), CandidateSkill(skill='Basket Weaving')]
+    db.session.add(candidate)
+    db.session.flush()
+    refresh_candidate_skill_bits([candidate.id])
+    db.session.commit()
+
+    assert {skill.skill: skill.skill_id is not None for skill in candidate.skills} == {
+        'Python': True, 'Basket Weaving': False
+    }
+    assert Skill.query.filter_by(name='basket weaving').count() == 0
+
+    requisition = Requisition(title='Weaver', status='open', created_by=1, required_skills=[{'name': 'basket weaving'}])
+    db.session.add(requisition)
+    register_requisition_skills(requisition)
+    db.session.commit()
+
+    skill_id = get_skill_dictionary().skill_id('basket weaving')
+    db.session.refresh(candidate)
+    assert bytes_to_bits(candidate.skill_bits) >> skill_id & 1